@@ -236,8 +236,8 @@ if [[ "$DEPLOY_MINIO" == "Deploy" ]]; then
 
 
     kubectl port-forward -n ${OC_PROJECT} svc/minio 9000:9000 >> studio-pf.log 2>&1 &
-    sleep 5
 
+    # create_buckets.py retries until MinIO answers through the port-forward
     python deployment-scripts/create_buckets.py --env-path workspace/${DEPLOYMENT_ENV}/env/.env
 
     sed -i -e "s|endpoint=.*|endpoint=https://minio.$OC_PROJECT.svc.cluster.local:9000|g" workspace/${DEPLOYMENT_ENV}/env/.env
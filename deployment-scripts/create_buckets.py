@@ -1,11 +1,31 @@
 # © Copyright IBM Corporation 2025
 # SPDX-License-Identifier: Apache-2.0
 
+"""
+Create the Studio buckets (<deployment_name>-<suffix>) and apply their settings.
+
+Existing buckets are discovered with a single list_buckets call, which is
+retried until the object store answers (--wait-timeout), so callers don't
+need to sleep on MinIO readiness.  Only the missing buckets are created, all
+at once through one pooled client; the client's standard retry mode handles
+throttling and transient errors per request.  Per-bucket settings
+(versioning, lifecycle) are applied to new and existing buckets in the same
+pass.
+
+Settings come from BUCKET_SETTINGS below, overridden per bucket suffix by an
+optional JSON file (--settings or BUCKET_SETTINGS_FILE), e.g.
+
+    {"temp-upload": {"expire_days": 7, "abort_multipart_days": 1},
+     "gfm-mlflow": {"versioning": true}}
+"""
 
 import ibm_boto3
 from ibm_botocore.client import Config, ClientError
 import os
 import argparse
+import concurrent.futures
+import json
+import sys
 import warnings
 import time
 
@@ -17,6 +37,12 @@ warnings.filterwarnings('ignore', message='Unverified HTTPS request')
 parser = argparse.ArgumentParser(description="Run create bucket with a specified .env file.")
 parser.add_argument('--env-path', type=str, default=None,
                     help="Path to the .env file.")
+parser.add_argument('--settings', type=str, default=os.getenv("BUCKET_SETTINGS_FILE"),
+                    help="JSON file of per-bucket settings keyed by bucket suffix.")
+parser.add_argument('--wait-timeout', type=float, default=float(os.getenv("BUCKET_WAIT_TIMEOUT_S", "120")),
+                    help="Seconds to wait for the object store to answer (default: 120).")
+parser.add_argument('--max-attempts', type=int, default=int(os.getenv("BUCKET_MAX_ATTEMPTS", "5")),
+                    help="Attempts per request, including retries (default: 5).")
 args = parser.parse_args()
 
 if args.env_path:
@@ -25,6 +51,27 @@ if args.env_path:
 else:
     dotenv.load_dotenv()
 
+buckets = [
+    "fine-tuning",
+    "fine-tuning-models",
+    "inference",
+    "dataset-factory",
+    "amo-input-bucket",
+    "gfm-mlflow",
+    "geoserver",
+    "temp-upload",
+    "inference-auxdata",
+    "generic-python-processor"
+]
+
+# Per-bucket settings by suffix:
+#   versioning           - True enables, False suspends versioning
+#   expire_days          - delete objects this many days after creation
+#   abort_multipart_days - abort incomplete multipart uploads after this many days
+BUCKET_SETTINGS = {
+    "temp-upload": {"abort_multipart_days": 1},
+}
+
 
 def get_s3_client():
     cos = ibm_boto3.client(
@@ -34,63 +81,109 @@ def get_s3_client():
         endpoint_url=os.getenv(
             "endpoint", "https://s3.us-east.cloud-object-storage.appdomain.cloud"
         ),
-        config=Config(signature_version="s3v4"),
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=len(buckets),
+            retries={"max_attempts": args.max_attempts, "mode": "standard"},
+            connect_timeout=5,
+        ),
         verify=False
     )
     return cos
 
 
-cos = get_s3_client()
+def load_settings(path):
+    settings = {suffix: dict(values) for suffix, values in BUCKET_SETTINGS.items()}
+    if path:
+        with open(path) as f:
+            for suffix, values in json.load(f).items():
+                settings.setdefault(suffix, {}).update(values)
+    return settings
 
-deployment_name = os.getenv("deployment_name")
 
-buckets = [
-    "fine-tuning",
-    "fine-tuning-models",
-    "inference",
-    "dataset-factory",
-    "amo-input-bucket",
-    "gfm-mlflow",
-    "geoserver",
-    "temp-upload",
-    "inference-auxdata",
-    "generic-python-processor"
-]
+def list_existing_buckets(cos, timeout):
+    """Names of the existing buckets; retries until the object store answers or *timeout* passes."""
+    deadline = time.monotonic() + timeout
+    delay = 1
+    while True:
+        try:
+            return {b["Name"] for b in cos.list_buckets().get("Buckets", [])}
+        except Exception as e:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise
+            print(f"Object store not ready ({e}); retrying in {min(delay, remaining):.0f} seconds...")
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, 10)
+
 
+def lifecycle_rules(settings):
+    rules = []
+    if settings.get("expire_days"):
+        rules.append({"ID": "expire-objects", "Filter": {"Prefix": ""}, "Status": "Enabled",
+                      "Expiration": {"Days": int(settings["expire_days"])}})
+    if settings.get("abort_multipart_days"):
+        rules.append({"ID": "abort-incomplete-multipart", "Filter": {"Prefix": ""}, "Status": "Enabled",
+                      "AbortIncompleteMultipartUpload": {"DaysAfterInitiation": int(settings["abort_multipart_days"])}})
+    return rules
 
-for b in buckets:
-    bucket_name = f"{deployment_name}-{b}"
-    max_retries = 3
-    retry_delay = 5  # seconds
-    
-    for attempt in range(max_retries):
+
+def provision_bucket(cos, bucket_name, exists, settings):
+    """Create *bucket_name* unless it *exists*, then apply its settings; returns a status line."""
+    if exists:
+        status = f"Bucket {bucket_name} already exists ✔"
+    else:
         try:
-            response = cos.create_bucket(
-                Bucket=bucket_name,
-            )
-            if response["ResponseMetadata"]["HTTPStatusCode"] == 200:
-                print(f"Bucket {bucket_name} created successfully \u2714")
-                break
-            else:
-                print(f"Potential error creating bucket {bucket_name} please check")
-                break
+            cos.create_bucket(Bucket=bucket_name)
+            status = f"Bucket {bucket_name} created successfully ✔"
         except ClientError as e:
             error_code = e.response.get('Error', {}).get('Code', '')
-            if error_code == 'BucketAlreadyOwnedByYou' or error_code == 'BucketAlreadyExists':
-                print(f"Bucket {bucket_name} already exists \u2714")
-                break
-            elif attempt < max_retries - 1:
-                print(f"Creating bucket {bucket_name} failed (attempt {attempt + 1}/{max_retries}): {e}")
-                print(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-            else:
-                print(f"Creating bucket {bucket_name} failed after {max_retries} attempts: {e}")
+            if error_code not in ('BucketAlreadyOwnedByYou', 'BucketAlreadyExists'):
+                raise
+            status = f"Bucket {bucket_name} already exists ✔"
+
+    applied = []
+    if "versioning" in settings:
+        cos.put_bucket_versioning(
+            Bucket=bucket_name,
+            VersioningConfiguration={"Status": "Enabled" if settings["versioning"] else "Suspended"},
+        )
+        applied.append(f"versioning {'enabled' if settings['versioning'] else 'suspended'}")
+    rules = lifecycle_rules(settings)
+    if rules:
+        cos.put_bucket_lifecycle_configuration(Bucket=bucket_name, LifecycleConfiguration={"Rules": rules})
+        applied.append("lifecycle " + ", ".join(r["ID"] for r in rules))
+    return status + (f" ({'; '.join(applied)})" if applied else "")
+
+
+cos = get_s3_client()
+
+deployment_name = os.getenv("deployment_name")
+settings = load_settings(args.settings)
+
+start = time.monotonic()
+try:
+    existing = list_existing_buckets(cos, args.wait_timeout)
+except Exception as e:
+    print(f"Listing buckets failed after waiting {args.wait_timeout:.0f} seconds: {e}")
+    sys.exit(1)
+
+failed = []
+with concurrent.futures.ThreadPoolExecutor(max_workers=len(buckets)) as pool:
+    futures = {}
+    for b in buckets:
+        bucket_name = f"{deployment_name}-{b}"
+        futures[pool.submit(provision_bucket, cos, bucket_name, bucket_name in existing, settings.get(b, {}))] = bucket_name
+    for future in concurrent.futures.as_completed(futures):
+        bucket_name = futures[future]
+        try:
+            print(future.result())
         except Exception as e:
-            if attempt < max_retries - 1:
-                print(f"Creating bucket {bucket_name} failed (attempt {attempt + 1}/{max_retries}): {e}")
-                print(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Exponential backoff
-            else:
-                print(f"Creating bucket {bucket_name} failed after {max_retries} attempts: {e}")
+            print(f"Provisioning bucket {bucket_name} failed: {e}")
+            failed.append(bucket_name)
+
+created = sum(1 for b in buckets if f"{deployment_name}-{b}" not in existing)
+print(f"{len(buckets)} buckets checked, {created} missing, {len(failed)} failed "
+      f"in {time.monotonic() - start:.1f}s")
+if failed:
+    sys.exit(1)
@@ -1,24 +1,105 @@
 # © Copyright IBM Corporation 2025
 # SPDX-License-Identifier: Apache-2.0
 
+"""
+List the contents of a bucket, streaming, with constant memory.
+
+The bucket (or --prefix) is sharded by its delimiter-based "directories":
+the common prefixes --shard-depth levels down are discovered first, then
+every shard is listed concurrently with list_objects_v2 pages of
+--page-size keys.  Pages are handed to the writer through a bounded queue,
+so memory stays flat however many objects the bucket holds; keys are
+written in shard order as pages arrive, not globally sorted.
+
+Output formats (--format):
+    text     "- <key>" lines (default)
+    jsonl    one {"key", "size", "etag", "last_modified", "storage_class"} object per line
+    csv      the same fields as CSV
+    summary  object count and total bytes per shard prefix
+
+--max-keys stops the listing (and all shards) after that many objects.
+
+Inventory mode (--inventory DB) records key, size, ETag, LastModified and
+storage class in a local SQLite index instead of printing the listing.  A
+re-scan of the same bucket (or of a --prefix of it) diffs the listing
+against the index set-wise and writes only what was added, modified or
+deleted, together with the LastModified watermark of the scan.  S3 cannot
+filter a listing by LastModified, so the prefix is still listed in full,
+but unchanged objects cost no index writes.  Per-prefix (--stats-depth
+levels) and per-day totals are kept up to date from the same deltas, so
+--query answers from the index in milliseconds without touching S3:
+
+    diff          changes recorded by the latest (or --scan-id) scan
+    top-prefixes  the --top largest prefixes --shard-depth levels below --prefix
+    growth        objects and bytes per LastModified day
+    scans         scan history
+
+Usage:
+    python deployment-scripts/list_bucket_contents.py --env-path workspace/<env>/env/.env \
+        --bkt <deployment>-inference --format summary
+    python deployment-scripts/list_bucket_contents.py --bkt <bucket> --prefix tunes/ \
+        --format jsonl --out tunes.jsonl --max-keys 100000
+    python deployment-scripts/list_bucket_contents.py --bkt <deployment>-inference --inventory inventory.db
+    python deployment-scripts/list_bucket_contents.py --bkt <deployment>-fine-tuning-models \
+        --inventory inventory.db --query top-prefixes --top 20
+"""
 
 import ibm_boto3
-from ibm_botocore.client import Config, ClientError
+from ibm_botocore.client import Config
 import os
 import argparse
+import concurrent.futures
+import csv
+import json
+import queue
+import sqlite3
+import sys
+import threading
+import time
 
 import dotenv
 
+FIELDS = ["key", "size", "etag", "last_modified", "storage_class"]
+
 parser = argparse.ArgumentParser(description="Run list bucket content with a specified .env file.")
 parser.add_argument('--env-path', type=str, default=None,
                     help="Path to the .env file.")
 parser.add_argument('--bkt', type=str, default=None,
                     help="Bucket name")
+parser.add_argument('--prefix', type=str, default="",
+                    help="Only list keys under this prefix.")
+parser.add_argument('--delimiter', type=str, default="/",
+                    help="Delimiter that separates key 'directories' (default: /).")
+parser.add_argument('--shard-depth', type=int, default=1,
+                    help="Directory levels below --prefix to shard the listing by (default: 1, 0 disables).")
+parser.add_argument('--workers', type=int, default=8,
+                    help="Shards listed concurrently (default: 8).")
+parser.add_argument('--page-size', type=int, default=1000,
+                    help="Keys per list request (default: 1000, the S3 maximum).")
+parser.add_argument('--max-keys', type=int, default=None,
+                    help="Stop after this many objects.")
+parser.add_argument('--format', choices=["text", "jsonl", "csv", "summary"], default="text",
+                    help="Output format (default: text).")
+parser.add_argument('--out', type=str, default=None,
+                    help="Write the listing to this file instead of stdout.")
+parser.add_argument('--inventory', type=str, default=os.getenv("BUCKET_INVENTORY_DB"),
+                    help="SQLite inventory index to update (or query with --query) instead of printing the listing.")
+parser.add_argument('--query', choices=["diff", "top-prefixes", "growth", "scans"], default=None,
+                    help="Answer from the --inventory index without listing the bucket.")
+parser.add_argument('--top', type=int, default=20,
+                    help="Rows shown by inventory queries and diffs (default: 20).")
+parser.add_argument('--scan-id', type=int, default=None,
+                    help="Scan shown by --query diff (default: the latest scan of the bucket).")
+parser.add_argument('--stats-depth', type=int, default=4,
+                    help="Directory levels the inventory keeps per-prefix totals for (default: 4).")
 args = parser.parse_args()
-print(args)
 
 if not args.bkt:
-    raise "A bucket name must be provided"
+    parser.error("A bucket name must be provided with --bkt")
+if args.query and not args.inventory:
+    parser.error("--query needs --inventory")
+if args.inventory and not args.query and args.max_keys is not None:
+    parser.error("--max-keys cannot be used when updating an inventory (deletions would be wrong)")
 
 if args.env_path:
     env_file_path = os.path.abspath(args.env_path)
@@ -28,32 +109,413 @@ else:
 
 
 def get_s3_client():
-    cos = ibm_boto3.resource(
+    cos = ibm_boto3.client(
         "s3",
         aws_access_key_id=os.getenv("access_key_id"),
         aws_secret_access_key=os.getenv("secret_access_key"),
         endpoint_url=os.getenv(
             "endpoint", "https://s3.us-east.cloud-object-storage.appdomain.cloud"
         ),
-        config=Config(signature_version="s3v4"),
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=args.workers + 1,
+            retries={"max_attempts": 5, "mode": "standard"},
+        ),
     )
     return cos
 
 
-cos = get_s3_client()
+def _pages(cos, bucket_name, prefix, delimiter=None, page_size=1000):
+    params = {"Bucket": bucket_name, "Prefix": prefix, "PaginationConfig": {"PageSize": page_size}}
+    if delimiter:
+        params["Delimiter"] = delimiter
+    return cos.get_paginator("list_objects_v2").paginate(**params)
 
-bucket_name = args.bkt
-bucket = cos.Bucket(bucket_name)
 
-try:
-    response = bucket.objects.all()
+def discover_shards(cos, bucket_name, prefix, delimiter, depth, workers):
+    """
+    Return [(prefix, recursive)] covering every key under *prefix*: the common
+    prefixes *depth* levels down are listed recursively, and levels above
+    them that also hold objects directly get a non-recursive shard.
+    """
+    if depth <= 0 or not delimiter:
+        return [(prefix, True)]
+
+    def _children(level_prefix):
+        children, loose = [], False
+        for page in _pages(cos, bucket_name, level_prefix, delimiter):
+            children += [p["Prefix"] for p in page.get("CommonPrefixes", [])]
+            loose = loose or bool(page.get("Contents"))
+        return level_prefix, children, loose
+
+    shards, level = [], [prefix]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        for _ in range(depth):
+            next_level = []
+            for level_prefix, children, loose in pool.map(_children, level):
+                if loose:
+                    shards.append((level_prefix, False))
+                next_level += children
+            level = next_level
+    return shards + [(p, True) for p in level]
+
+
+def iter_objects(cos, bucket_name, shards, delimiter, workers, page_size, max_keys=None):
+    """
+    Yield the objects of all *shards* (listed concurrently) as they arrive.
+    At most a few pages per worker are buffered; closing the generator or
+    reaching *max_keys* stops every shard.
+    """
+    pages = queue.Queue(maxsize=workers * 2)
+    stop = threading.Event()
+    done = object()
+
+    def _put(item):
+        while not stop.is_set():
+            try:
+                pages.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _list(shard):
+        shard_prefix, recursive = shard
+        try:
+            for page in _pages(cos, bucket_name, shard_prefix, None if recursive else delimiter, page_size):
+                if stop.is_set() or not _put(page.get("Contents", [])):
+                    return
+        except Exception as e:
+            _put(e)
+
+    def _run():
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_list, shards))
+        _put(done)
+
+    threading.Thread(target=_run, name="bucket-lister", daemon=True).start()
+    count = 0
+    try:
+        while True:
+            item = pages.get()
+            if item is done:
+                return
+            if isinstance(item, Exception):
+                raise item
+            for obj in item:
+                yield obj
+                count += 1
+                if max_keys is not None and count >= max_keys:
+                    return
+    finally:
+        stop.set()
+
+
+def object_record(obj):
+    return {
+        "key": obj["Key"],
+        "size": obj.get("Size", 0),
+        "etag": obj.get("ETag", "").strip('"'),
+        "last_modified": obj["LastModified"].isoformat() if obj.get("LastModified") else None,
+        "storage_class": obj.get("StorageClass"),
+    }
+
+
+def summary_prefix(key, prefix, delimiter, depth):
+    """The shard prefix *key* is summarised under: up to *depth* directory levels below *prefix*."""
+    if not delimiter or depth <= 0:
+        return prefix
+    levels = key[len(prefix):].split(delimiter)[:-1][:depth]
+    return prefix + "".join(level + delimiter for level in levels)
+
+
+def write_listing(objects, out, fmt, prefix, delimiter, depth):
+    """Write *objects* to *out* in *fmt*; returns the number of objects."""
+    count, summary = 0, {}
+    writer = csv.DictWriter(out, fieldnames=FIELDS) if fmt == "csv" else None
+    if writer:
+        writer.writeheader()
+    for obj in objects:
+        count += 1
+        if fmt == "text":
+            out.write(f"- {obj['Key']}\n")
+        elif fmt == "jsonl":
+            out.write(json.dumps(object_record(obj)) + "\n")
+        elif fmt == "csv":
+            writer.writerow(object_record(obj))
+        else:
+            group = summary.setdefault(summary_prefix(obj["Key"], prefix, delimiter, depth), [0, 0])
+            group[0] += 1
+            group[1] += obj.get("Size", 0)
+    if fmt == "summary":
+        out.write(f"{'Prefix':<60} {'Objects':>12} {'Bytes':>18}\n")
+        for group_prefix in sorted(summary):
+            objects_n, size = summary[group_prefix]
+            out.write(f"{group_prefix or '(root)':<60} {objects_n:>12} {size:>18}\n")
+        out.write(f"{'Total':<60} {count:>12} {sum(s for _, s in summary.values()):>18}\n")
+    return count
+
+
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    bucket TEXT NOT NULL, key TEXT NOT NULL, size INTEGER, etag TEXT, last_modified TEXT, storage_class TEXT,
+    PRIMARY KEY (bucket, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY, bucket TEXT NOT NULL, prefix TEXT NOT NULL, started_at TEXT, finished_at TEXT,
+    objects INTEGER, bytes INTEGER, watermark TEXT, added INTEGER, modified INTEGER, deleted INTEGER,
+    baseline INTEGER
+);
+CREATE TABLE IF NOT EXISTS changes (
+    scan_id INTEGER NOT NULL, key TEXT NOT NULL, change TEXT NOT NULL, size INTEGER, old_size INTEGER,
+    last_modified TEXT
+);
+CREATE INDEX IF NOT EXISTS changes_scan ON changes (scan_id, change);
+CREATE TABLE IF NOT EXISTS prefix_stats (
+    bucket TEXT NOT NULL, prefix TEXT NOT NULL, depth INTEGER NOT NULL, objects INTEGER, bytes INTEGER,
+    PRIMARY KEY (bucket, prefix)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS prefix_stats_depth ON prefix_stats (bucket, depth, bytes);
+CREATE TABLE IF NOT EXISTS daily_stats (
+    bucket TEXT NOT NULL, day TEXT NOT NULL, objects INTEGER, bytes INTEGER,
+    PRIMARY KEY (bucket, day)
+) WITHOUT ROWID;
+"""
+
 
-    if not response:
-        print(f"No files found in bucket: {bucket_name}")
+def open_inventory(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.execute("PRAGMA temp_store=FILE")  # the scan's key table can be larger than memory
+    db.executescript(INVENTORY_SCHEMA)
+    return db
+
+
+def key_range(prefix):
+    """SQL condition and parameters selecting the keys under *prefix*."""
+    if not prefix:
+        return "1", []
+    return "key >= ? AND key < ?", [prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)]
+
+
+def key_prefixes(key, delimiter, depth):
+    """[(prefix, level)] of *key*: the bucket root and up to *depth* directory levels."""
+    prefixes, current = [("", 0)], ""
+    for level, part in enumerate(key.split(delimiter)[:-1][:depth], start=1):
+        current += part + delimiter
+        prefixes.append((current, level))
+    return prefixes
+
+
+def inventory_scan(db, bucket_name, prefix, objects, delimiter, stats_depth):
+    """
+    Load the listing *objects* into a temporary table, diff it against the
+    index under *prefix*, and apply only the differences (objects, changes,
+    per-prefix and per-day totals) in one transaction.  Returns the scan row.
+    """
+    started = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    condition, params = key_range(prefix)
+    baseline = db.execute(
+        f"SELECT NOT EXISTS (SELECT 1 FROM objects WHERE bucket = ? AND {condition})", [bucket_name] + params
+    ).fetchone()[0]
+
+    db.execute("DROP TABLE IF EXISTS temp.scan_keys")
+    db.execute("CREATE TEMP TABLE scan_keys (key TEXT PRIMARY KEY, size INTEGER, etag TEXT, "
+               "last_modified TEXT, storage_class TEXT) WITHOUT ROWID")
+    batch = []
+    for obj in objects:
+        r = object_record(obj)
+        batch.append((r["key"], r["size"], r["etag"], r["last_modified"], r["storage_class"]))
+        if len(batch) >= 5000:
+            db.executemany("INSERT OR REPLACE INTO scan_keys VALUES (?, ?, ?, ?, ?)", batch)
+            batch = []
+    db.executemany("INSERT OR REPLACE INTO scan_keys VALUES (?, ?, ?, ?, ?)", batch)
+
+    with db:
+        scan_id = db.execute("INSERT INTO scans (bucket, prefix, started_at, baseline) VALUES (?, ?, ?, ?)",
+                             (bucket_name, prefix, started, baseline)).lastrowid
+        diff_queries = {
+            "added": ("SELECT s.key, s.size, NULL, s.last_modified, NULL FROM scan_keys s "
+                      "WHERE NOT EXISTS (SELECT 1 FROM objects o WHERE o.bucket = ? AND o.key = s.key)",
+                      [bucket_name]),
+            "modified": ("SELECT s.key, s.size, o.size, s.last_modified, o.last_modified FROM scan_keys s "
+                         "JOIN objects o ON o.bucket = ? AND o.key = s.key "
+                         "WHERE o.etag IS NOT s.etag OR o.size IS NOT s.size "
+                         "OR o.last_modified IS NOT s.last_modified",
+                         [bucket_name]),
+            "deleted": ("SELECT o.key, NULL, o.size, NULL, o.last_modified FROM objects o "
+                        f"WHERE o.bucket = ? AND {condition} "
+                        "AND NOT EXISTS (SELECT 1 FROM scan_keys s WHERE s.key = o.key)",
+                        [bucket_name] + params),
+        }
+        counts, prefix_delta, day_delta, changes = {}, {}, {}, []
+        for change, (sql, sql_params) in diff_queries.items():
+            counts[change] = 0
+            for key, size, old_size, last_modified, old_last_modified in db.execute(sql, sql_params):
+                counts[change] += 1
+                deltas = []
+                if old_size is not None:
+                    deltas.append((-1, -old_size, old_last_modified))
+                if size is not None:
+                    deltas.append((1, size, last_modified))
+                for n, nbytes, modified_at in deltas:
+                    for p in key_prefixes(key, delimiter, stats_depth):
+                        d = prefix_delta.setdefault(p, [0, 0])
+                        d[0] += n
+                        d[1] += nbytes
+                    d = day_delta.setdefault((modified_at or "")[:10], [0, 0])
+                    d[0] += n
+                    d[1] += nbytes
+                if not baseline:
+                    changes.append((scan_id, key, change, size, old_size, last_modified))
+                    if len(changes) >= 5000:
+                        db.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?)", changes)
+                        changes = []
+        db.executemany("INSERT INTO changes VALUES (?, ?, ?, ?, ?, ?)", changes)
+
+        db.execute(f"DELETE FROM objects WHERE bucket = ? AND {condition} "
+                   "AND NOT EXISTS (SELECT 1 FROM scan_keys s WHERE s.key = objects.key)", [bucket_name] + params)
+        db.execute("INSERT OR REPLACE INTO objects SELECT ?, s.key, s.size, s.etag, s.last_modified, s.storage_class "
+                   "FROM scan_keys s LEFT JOIN objects o ON o.bucket = ? AND o.key = s.key "
+                   "WHERE o.key IS NULL OR o.etag IS NOT s.etag OR o.size IS NOT s.size "
+                   "OR o.last_modified IS NOT s.last_modified", (bucket_name, bucket_name))
+        db.executemany(
+            "INSERT INTO prefix_stats VALUES (?, ?, ?, ?, ?) ON CONFLICT (bucket, prefix) DO UPDATE SET "
+            "objects = objects + excluded.objects, bytes = bytes + excluded.bytes",
+            [(bucket_name, p, level, n, nbytes) for (p, level), (n, nbytes) in prefix_delta.items()],
+        )
+        db.executemany(
+            "INSERT INTO daily_stats VALUES (?, ?, ?, ?) ON CONFLICT (bucket, day) DO UPDATE SET "
+            "objects = objects + excluded.objects, bytes = bytes + excluded.bytes",
+            [(bucket_name, day, n, nbytes) for day, (n, nbytes) in day_delta.items()],
+        )
+        db.execute("DELETE FROM prefix_stats WHERE bucket = ? AND objects <= 0", (bucket_name,))
+        db.execute("DELETE FROM daily_stats WHERE bucket = ? AND objects <= 0", (bucket_name,))
+
+        objects_n, nbytes, watermark = db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0), MAX(last_modified) FROM scan_keys").fetchone()
+        db.execute("UPDATE scans SET finished_at = ?, objects = ?, bytes = ?, watermark = ?, added = ?, "
+                   "modified = ?, deleted = ? WHERE id = ?",
+                   (time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()), objects_n, nbytes, watermark,
+                    counts["added"], counts["modified"], counts["deleted"], scan_id))
+    db.execute("DROP TABLE temp.scan_keys")
+    return scan_row(db, scan_id)
+
+
+SCAN_COLUMNS = ["id", "bucket", "prefix", "started_at", "finished_at", "objects", "bytes", "watermark",
+                "added", "modified", "deleted", "baseline"]
+
+
+def scan_row(db, scan_id):
+    row = db.execute(f"SELECT {', '.join(SCAN_COLUMNS)} FROM scans WHERE id = ?", (scan_id,)).fetchone()
+    return dict(zip(SCAN_COLUMNS, row)) if row else None
+
+
+def query_inventory(db, bucket_name, query, prefix, delimiter, depth, top, scan_id=None):
+    """Return (columns, rows) answering *query* from the index."""
+    if query == "scans":
+        rows = db.execute(f"SELECT {', '.join(SCAN_COLUMNS)} FROM scans WHERE bucket = ? ORDER BY id DESC LIMIT ?",
+                          (bucket_name, top)).fetchall()
+        return SCAN_COLUMNS, rows
+    if query == "top-prefixes":
+        level = len(key_prefixes(prefix + "x", delimiter, 1000)) - 1 + depth
+        condition, params = key_range(prefix)
+        rows = db.execute(
+            f"SELECT prefix, objects, bytes FROM prefix_stats WHERE bucket = ? AND depth = ? AND "
+            f"{condition.replace('key', 'prefix')} ORDER BY bytes DESC LIMIT ?",
+            [bucket_name, level] + params + [top],
+        ).fetchall()
+        return ["prefix", "objects", "bytes"], rows
+    if query == "growth":
+        if not prefix:
+            rows = db.execute("SELECT day, objects, bytes FROM daily_stats WHERE bucket = ? "
+                              "ORDER BY day DESC LIMIT ?", (bucket_name, top)).fetchall()
+        else:
+            condition, params = key_range(prefix)
+            rows = db.execute(
+                f"SELECT substr(last_modified, 1, 10) AS day, COUNT(*), SUM(size) FROM objects "
+                f"WHERE bucket = ? AND {condition} GROUP BY day ORDER BY day DESC LIMIT ?",
+                [bucket_name] + params + [top],
+            ).fetchall()
+        return ["day", "objects", "bytes"], rows
+    # diff
+    if scan_id is None:
+        latest = db.execute("SELECT MAX(id) FROM scans WHERE bucket = ? AND finished_at IS NOT NULL",
+                            (bucket_name,)).fetchone()
+        scan_id = latest[0] if latest else None
+    rows = db.execute(
+        "SELECT change, key, size, old_size, last_modified FROM changes WHERE scan_id = ? "
+        "ORDER BY change, ABS(COALESCE(size, 0) - COALESCE(old_size, 0)) DESC LIMIT ?",
+        (scan_id, top),
+    ).fetchall()
+    return ["change", "key", "size", "old_size", "last_modified"], rows
+
+
+def write_rows(out, fmt, columns, rows):
+    if fmt == "jsonl":
+        for row in rows:
+            out.write(json.dumps(dict(zip(columns, row))) + "\n")
+    elif fmt == "csv":
+        writer = csv.writer(out)
+        writer.writerow(columns)
+        writer.writerows(rows)
     else:
-        print(f"Bucket {bucket_name} has the following files: \u2714")
-        for file in response:
-            print(f"- {file.key}")
-except:
-    print(f"Unable to retrieve bucket {bucket_name} files")
+        widths = [max([len(str(c))] + [len(str(r[i])) for r in rows]) for i, c in enumerate(columns)]
+        out.write("  ".join(str(c).ljust(w) for c, w in zip(columns, widths)) + "\n")
+        for row in rows:
+            out.write("  ".join(str(v).ljust(w) for v, w in zip(row, widths)) + "\n")
+
+
+bucket_name = args.bkt
+out = open(args.out, "w", newline="") if args.out else sys.stdout
+
+if args.inventory:
+    db = open_inventory(args.inventory)
+    try:
+        if not args.query:
+            cos = get_s3_client()
+            start = time.monotonic()
+            shards = discover_shards(cos, bucket_name, args.prefix, args.delimiter, args.shard_depth, args.workers)
+            objects = iter_objects(cos, bucket_name, shards, args.delimiter, args.workers, args.page_size)
+            scan = inventory_scan(db, bucket_name, args.prefix, objects, args.delimiter, args.stats_depth)
+            kind = "baseline scan" if scan["baseline"] else "re-scan"
+            print(f"Inventory {kind} #{scan['id']} of {bucket_name}/{args.prefix}: {scan['objects']} objects, "
+                  f"{scan['bytes']} bytes, watermark {scan['watermark']}; added {scan['added']}, "
+                  f"modified {scan['modified']}, deleted {scan['deleted']} "
+                  f"in {time.monotonic() - start:.1f}s", file=sys.stderr)
+            if scan["baseline"]:
+                sys.exit(0)
+            args.query, args.scan_id = "diff", scan["id"]
+        start = time.monotonic()
+        columns, rows = query_inventory(db, bucket_name, args.query, args.prefix, args.delimiter,
+                                        args.shard_depth, args.top, args.scan_id)
+        write_rows(out, args.format, columns, rows)
+        print(f"{len(rows)} rows in {(time.monotonic() - start) * 1000:.1f} ms", file=sys.stderr)
+    finally:
+        db.close()
+        if args.out:
+            out.close()
+    sys.exit(0)
+
+cos = get_s3_client()
+
+try:
+    shards = discover_shards(cos, bucket_name, args.prefix, args.delimiter, args.shard_depth, args.workers)
+    if args.format == "text":
+        print(f"Bucket {bucket_name} has the following files: ✔")
+    objects = iter_objects(cos, bucket_name, shards, args.delimiter, args.workers, args.page_size, args.max_keys)
+    count = write_listing(objects, out, args.format, args.prefix, args.delimiter, args.shard_depth)
+except Exception:
+    print(f"Unable to retrieve bucket {bucket_name} files", file=sys.stderr)
     raise
+finally:
+    if args.out:
+        out.close()
+
+if count == 0:
+    print(f"No files found in bucket: {bucket_name}", file=sys.stderr)
+else:
+    stopped = " (stopped at --max-keys)" if args.max_keys is not None and count >= args.max_keys else ""
+    print(f"Listed {count} objects from {len(shards)} shards{stopped}", file=sys.stderr)
@@ -0,0 +1,442 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Mirror the example data the payloads download into the deployment's own
+object store, and write payloads that point at the in-cluster copies.
+
+1. Every JSON payload under --payloads (default: populate-studio/payloads and
+   tests/api-data) is scanned for URLs matching --source (by default the
+   public geospatial-studio-example-data bucket).  The URLs in the variables
+   named by --env-var (LULC_TILE_ROOT, LAND_POLYGON_PATH), which the
+   populate-buckets-with-initial-data job downloads, are mirrored too; they
+   are read from env.sh (--env-sh), falling back to the environment.
+2. Each URL is downloaded once into a local content-addressed cache
+   (--cache-dir, objects stored by sha256).  Large files are fetched with
+   parallel ranged GETs.  On later runs a HEAD request (same ETag and size)
+   is enough to reuse the cached copy, and with --offline or when the source
+   is unreachable the cache is used as is.
+3. Cached files are uploaded with multipart transfers to
+   <bucket>/<prefix><sha256>/<file name>, skipping objects already there.
+   Uploads go to --upload-endpoint: after a deploy the .env endpoint names
+   the in-cluster service (minio.<namespace>.svc.cluster.local), which this
+   host cannot reach, so the port-forwarded https://localhost:9000 is used
+   instead.
+4. Rewritten payloads (same tree under --out-dir), a manifest of
+   source URL -> copy, and mirror.env.sh with the rewritten environment
+   variables are written.  populate-buckets-with-auxiliary-data.sh sources
+   mirror.env.sh after env.sh, so the job downloads the mirrored copies.
+   Copy URLs are plain <url-endpoint>/<bucket>/<key> URLs (--url-style path,
+   the default), where --url-endpoint defaults to the .env endpoint the
+   in-cluster consumers reach; the mirrored prefix must be readable without
+   credentials (for MinIO: mc anonymous set download
+   <alias>/<bucket>/example-data).  --url-style presigned writes presigned GET URLs instead, valid
+   for --expires seconds and at most 7 days, including inside gateway
+   records that fetch them again later; re-run the tool and re-onboard
+   before they expire.
+
+Onboard from the mirror with
+    python populate-studio/populate-studio.py all \
+        --payloads-dir workspace/${DEPLOYMENT_ENV}/mirrored-payloads/populate-studio/payloads
+
+Usage:
+    python deployment-scripts/mirror_example_data.py --env-path workspace/${DEPLOYMENT_ENV}/env/.env \
+        [--upload-endpoint https://localhost:9000] \
+        [--url-endpoint https://minio.<namespace>.svc.cluster.local:9000] [--offline]
+"""
+
+import ibm_boto3
+from ibm_boto3.s3.transfer import TransferConfig
+from ibm_botocore.client import Config, ClientError
+import os
+import argparse
+import concurrent.futures
+import datetime
+import hashlib
+import json
+import re
+import shlex
+import shutil
+import sys
+import threading
+import uuid
+import warnings
+from urllib.parse import unquote, urlparse
+
+import dotenv
+import requests
+
+# Suppress SSL warnings for self-signed certificates (e.g., CRC OpenShift Local)
+warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+
+DEFAULT_SOURCES = [r"^https?://([^/]*\.)?geospatial-studio-example-data\.", r"^https?://[^/]+/geospatial-studio-example-data/"]
+REPO_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_PAYLOAD_DIRS = [os.path.join(REPO_ROOT, "populate-studio", "payloads"), os.path.join(REPO_ROOT, "tests", "api-data")]
+DEFAULT_ENV_VARS = ["LULC_TILE_ROOT", "LAND_POLYGON_PATH"]
+# MinIO as port-forwarded by the deploy scripts
+PORT_FORWARDED_ENDPOINT = "https://localhost:9000"
+MiB = 1024 * 1024
+
+parser = argparse.ArgumentParser(description="Mirror example data into the deployment object store.")
+parser.add_argument('--env-path', type=str, default=None,
+                    help="Path to the .env file.")
+parser.add_argument('--env-sh', type=str, default=None,
+                    help="env.sh holding the --env-var values (default: env.sh next to --env-path, "
+                         "else workspace/<DEPLOYMENT_ENV>/env/env.sh).")
+parser.add_argument('--payloads', type=str, nargs='+', default=DEFAULT_PAYLOAD_DIRS,
+                    help="Payload files or directories to scan (default: populate-studio/payloads tests/api-data).")
+parser.add_argument('--source', type=str, action='append', default=None,
+                    help="Regex of URLs to mirror (repeatable; default: the geospatial-studio-example-data bucket).")
+parser.add_argument('--env-var', type=str, action='append', default=None,
+                    help="Environment variable holding a URL to mirror (repeatable; default: LULC_TILE_ROOT, "
+                         "LAND_POLYGON_PATH).")
+parser.add_argument('--cache-dir', type=str,
+                    default=os.getenv("MIRROR_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache",
+                                                                      "geospatial-studio-mirror")),
+                    help="Content-addressed download cache, shared by all deployments.")
+parser.add_argument('--bucket', type=str, default=None,
+                    help="Destination bucket (default: <deployment_name>-dataset-factory).")
+parser.add_argument('--prefix', type=str, default="example-data/",
+                    help="Key prefix of the mirrored objects (default: example-data/).")
+parser.add_argument('--out-dir', type=str, default=None,
+                    help="Where rewritten payloads are written (default: workspace/<DEPLOYMENT_ENV>/mirrored-payloads).")
+parser.add_argument('--upload-endpoint', type=str, default=os.getenv("MIRROR_UPLOAD_ENDPOINT"),
+                    help=f"Object store endpoint uploads go to (or set MIRROR_UPLOAD_ENDPOINT; default: "
+                         f"{PORT_FORWARDED_ENDPOINT} when the .env endpoint is an in-cluster service, "
+                         f"else the .env endpoint).")
+parser.add_argument('--url-style', choices=["path", "presigned"], default="path",
+                    help="Form of the rewritten URLs: plain <url-endpoint>/<bucket>/<key> URLs for in-cluster "
+                         "consumers, or presigned URLs that expire after --expires (default: path).")
+parser.add_argument('--url-endpoint', type=str, default=None,
+                    help="Object store endpoint used in rewritten URLs (default: the .env endpoint, i.e. the "
+                         "in-cluster service after a deploy).")
+parser.add_argument('--expires', type=int, default=7 * 24 * 3600,
+                    help="Validity of --url-style presigned URLs in seconds (default and SigV4 maximum: 7 days).")
+parser.add_argument('--part-size-mb', type=int, default=16,
+                    help="Ranged GET and multipart upload part size in MiB (default: 16).")
+parser.add_argument('--connections', type=int, default=8,
+                    help="Parallel ranged GETs / upload parts per file (default: 8).")
+parser.add_argument('--workers', type=int, default=4,
+                    help="Files mirrored concurrently (default: 4).")
+parser.add_argument('--offline', action='store_true',
+                    help="Never contact the sources; mirror only what is already cached.")
+args = parser.parse_args()
+
+if args.env_path:
+    env_file_path = os.path.abspath(args.env_path)
+    dotenv.load_dotenv(dotenv_path=env_file_path)
+else:
+    dotenv.load_dotenv()
+
+deployment_name = os.getenv("deployment_name")
+workspace_dir = os.path.join(REPO_ROOT, "workspace")
+env_sh_path = args.env_sh or (
+    os.path.join(os.path.dirname(os.path.abspath(args.env_path)), "env.sh") if args.env_path
+    else os.path.join(workspace_dir, os.getenv("DEPLOYMENT_ENV", "local"), "env", "env.sh")
+)
+bucket_name = args.bucket or f"{deployment_name}-dataset-factory"
+out_dir = args.out_dir or os.path.join(workspace_dir, os.getenv("DEPLOYMENT_ENV", "local"), "mirrored-payloads")
+sources = [re.compile(s) for s in (args.source or DEFAULT_SOURCES)]
+part_size = args.part_size_mb * MiB
+env_endpoint = os.getenv("endpoint", "https://s3.us-east.cloud-object-storage.appdomain.cloud")
+upload_endpoint = args.upload_endpoint or (
+    PORT_FORWARDED_ENDPOINT if (urlparse(env_endpoint).hostname or "").endswith(".svc.cluster.local") else env_endpoint
+)
+url_endpoint = (args.url_endpoint or env_endpoint).rstrip("/")
+
+
+def get_s3_client(endpoint):
+    cos = ibm_boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("access_key_id"),
+        aws_secret_access_key=os.getenv("secret_access_key"),
+        endpoint_url=endpoint,
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=args.workers * args.connections,
+            retries={"max_attempts": 5, "mode": "standard"},
+        ),
+        verify=False
+    )
+    return cos
+
+
+# --- scanning and rewriting ---
+
+def read_env_sh(path):
+    """NAME -> value for the plain `export NAME=value` lines of an env.sh file."""
+    values = {}
+    if not os.path.exists(path):
+        return values
+    with open(path) as f:
+        for line in f:
+            match = re.match(r"^\s*export\s+([A-Za-z_][A-Za-z0-9_]*)=(.*)$", line)
+            if match:
+                try:
+                    words = shlex.split(match.group(2), comments=True)
+                except ValueError:
+                    continue
+                values[match.group(1)] = words[0] if words else ""
+    return values
+
+
+def payload_files(paths):
+    for path in paths:
+        if os.path.isfile(path):
+            yield path
+        for root, _, files in os.walk(path):
+            for name in sorted(files):
+                if name.endswith(".json"):
+                    yield os.path.join(root, name)
+
+
+def find_urls(value):
+    """Every mirrored-source URL string in a JSON value."""
+    if isinstance(value, dict):
+        for item in value.values():
+            yield from find_urls(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from find_urls(item)
+    elif isinstance(value, str) and any(s.search(value) for s in sources):
+        yield value
+
+
+def rewrite(value, mapping):
+    if isinstance(value, dict):
+        return {k: rewrite(v, mapping) for k, v in value.items()}
+    if isinstance(value, list):
+        return [rewrite(v, mapping) for v in value]
+    if isinstance(value, str):
+        return mapping.get(value, value)
+    return value
+
+
+# --- content-addressed cache ---
+
+class Cache:
+    """Files stored as objects/<sha[:2]>/<sha>; index.json maps source URL -> sha256, size and ETag."""
+
+    def __init__(self, root):
+        self.root = root
+        self.index_path = os.path.join(root, "index.json")
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+        try:
+            with open(self.index_path) as f:
+                self.index = json.load(f)
+        except (OSError, ValueError):
+            self.index = {}
+
+    def path(self, sha256):
+        return os.path.join(self.root, "objects", sha256[:2], sha256)
+
+    def lookup(self, url):
+        entry = self.index.get(url)
+        if entry and os.path.exists(self.path(entry["sha256"])):
+            return entry
+        return None
+
+    def add(self, url, tmp_path, etag):
+        digest = hashlib.sha256()
+        with open(tmp_path, "rb") as f:
+            for chunk in iter(lambda: f.read(MiB), b""):
+                digest.update(chunk)
+        sha256 = digest.hexdigest()
+        final = self.path(sha256)
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        os.replace(tmp_path, final)
+        entry = {"sha256": sha256, "size": os.path.getsize(final), "etag": etag}
+        with self.lock:
+            self.index[url] = entry
+            tmp_index = f"{self.index_path}.{uuid.uuid4().hex}.tmp"
+            with open(tmp_index, "w") as f:
+                json.dump(self.index, f, indent=2)
+            os.replace(tmp_index, self.index_path)
+        return entry
+
+    def tmp_file(self):
+        return os.path.join(self.root, "tmp", uuid.uuid4().hex)
+
+
+def _get_range(session, url, path, start, end):
+    for attempt in range(3):
+        try:
+            resp = session.get(url, headers={"Range": f"bytes={start}-{end}"}, stream=True, timeout=(10, 300))
+            resp.raise_for_status()
+            if resp.status_code != 206:
+                raise IOError(f"server ignored the range request ({resp.status_code})")
+            written = 0
+            with open(path, "r+b") as f:
+                f.seek(start)
+                for chunk in resp.iter_content(MiB):
+                    f.write(chunk)
+                    written += len(chunk)
+            if written != end - start + 1:
+                raise IOError(f"short read for bytes {start}-{end}: {written}")
+            return
+        except (requests.exceptions.RequestException, IOError):
+            if attempt == 2:
+                raise
+
+
+def download(session, cache, url):
+    """Fetch *url* into the cache (parallel ranged GETs when possible); returns (entry, how)."""
+    cached = cache.lookup(url)
+    if args.offline:
+        if not cached:
+            raise IOError("not in the cache and --offline is set")
+        return cached, "cached"
+    try:
+        head = session.head(url, allow_redirects=True, timeout=30)
+        head.raise_for_status()
+    except requests.exceptions.RequestException as e:
+        if cached:
+            return cached, "cached (source unreachable)"
+        raise IOError(f"source unreachable: {e}")
+    size = int(head.headers.get("Content-Length") or 0)
+    etag = head.headers.get("ETag", "").strip('"')
+    if cached and cached["size"] == size and (not etag or cached["etag"] == etag):
+        return cached, "cached"
+
+    tmp = cache.tmp_file()
+    try:
+        if head.headers.get("Accept-Ranges") == "bytes" and size > part_size:
+            with open(tmp, "wb") as f:
+                f.truncate(size)
+            ranges = [(start, min(start + part_size, size) - 1) for start in range(0, size, part_size)]
+            with concurrent.futures.ThreadPoolExecutor(max_workers=args.connections) as pool:
+                list(pool.map(lambda r: _get_range(session, url, tmp, *r), ranges))
+            how = f"downloaded in {len(ranges)} ranges"
+        else:
+            with session.get(url, stream=True, timeout=(10, 300)) as resp:
+                resp.raise_for_status()
+                with open(tmp, "wb") as f:
+                    for chunk in resp.iter_content(MiB):
+                        f.write(chunk)
+            how = "downloaded"
+        if size and os.path.getsize(tmp) != size:
+            raise IOError(f"downloaded {os.path.getsize(tmp)} bytes, expected {size}")
+        return cache.add(url, tmp, etag), how
+    finally:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+
+
+def upload(cos, cache, entry, url):
+    """Upload the cached file unless the object already exists; returns (key, uploaded)."""
+    name = os.path.basename(unquote(urlparse(url).path)) or "data"
+    key = f"{args.prefix}{entry['sha256']}/{name}"
+    try:
+        existing = cos.head_object(Bucket=bucket_name, Key=key)
+        if existing.get("ContentLength") == entry["size"]:
+            return key, False
+    except ClientError as e:
+        if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+            raise
+    cos.upload_file(
+        cache.path(entry["sha256"]), bucket_name, key,
+        ExtraArgs={"Metadata": {"sha256": entry["sha256"], "source-url": url[:1024]}},
+        Config=TransferConfig(multipart_threshold=part_size, multipart_chunksize=part_size,
+                              max_concurrency=args.connections),
+    )
+    return key, True
+
+
+def copy_url(signer, key):
+    if args.url_style == "path":
+        return f"{url_endpoint}/{bucket_name}/{key}"
+    return signer.generate_presigned_url("get_object", Params={"Bucket": bucket_name, "Key": key},
+                                         ExpiresIn=args.expires)
+
+
+# --- main ---
+
+payloads = {}
+urls = set()
+for path in payload_files(args.payloads):
+    try:
+        with open(path) as f:
+            payloads[path] = json.load(f)
+    except ValueError as e:
+        print(f"Skipping {path}: not valid JSON ({e})")
+        continue
+    urls.update(find_urls(payloads[path]))
+env_urls = {}
+env_sh = read_env_sh(env_sh_path)
+for name in args.env_var or DEFAULT_ENV_VARS:
+    # env.sh wins, as it is sourced last by populate-buckets-with-auxiliary-data.sh
+    value = env_sh.get(name) or os.getenv(name, "")
+    if value.startswith(("http://", "https://")):
+        env_urls[name] = value
+        urls.add(value)
+print(f"Found {len(urls)} URLs to mirror in {len(payloads)} payloads and {len(env_urls)} environment variables")
+
+cache = Cache(args.cache_dir)
+session = requests.Session()
+session.mount("https://", requests.adapters.HTTPAdapter(pool_maxsize=args.workers * args.connections))
+cos = get_s3_client(upload_endpoint)
+signer = get_s3_client(url_endpoint)
+print(f"Uploading to {upload_endpoint}; rewritten URLs use {url_endpoint} ({args.url_style})")
+
+manifest, failed = {}, []
+expires_at = None
+if args.url_style == "presigned":
+    expires_at = (datetime.datetime.now(datetime.timezone.utc)
+                  + datetime.timedelta(seconds=args.expires)).isoformat(timespec="seconds")
+
+
+def mirror(url):
+    entry, how = download(session, cache, url)
+    key, uploaded = upload(cos, cache, entry, url)
+    return entry, how, key, uploaded
+
+
+with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+    futures = {pool.submit(mirror, url): url for url in sorted(urls)}
+    for future in concurrent.futures.as_completed(futures):
+        url = futures[future]
+        try:
+            entry, how, key, uploaded = future.result()
+        except Exception as e:
+            print(f"Mirroring {url} failed: {e}")
+            failed.append(url)
+            continue
+        manifest[url] = {"sha256": entry["sha256"], "size": entry["size"], "bucket": bucket_name, "key": key,
+                         "url": copy_url(signer, key), "expires_at": expires_at}
+        print(f"{url}\n  -> {bucket_name}/{key} ({entry['size']} bytes, {how}, "
+              f"{'uploaded' if uploaded else 'already in the bucket'}) ✔")
+
+mapping = {url: m["url"] for url, m in manifest.items()}
+rewritten = 0
+os.makedirs(out_dir, exist_ok=True)
+for path, payload in payloads.items():
+    # keep the tree as seen from the repository root, e.g. populate-studio/payloads/...
+    rel = os.path.relpath(os.path.abspath(path), REPO_ROOT)
+    target = os.path.join(out_dir, os.path.abspath(path).lstrip(os.sep) if rel.startswith(os.pardir) else rel)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    new_payload = rewrite(payload, mapping)
+    if new_payload != payload:
+        rewritten += 1
+        with open(target, "w") as f:
+            json.dump(new_payload, f, indent=2)
+    else:
+        shutil.copyfile(path, target)
+with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+    json.dump(manifest, f, indent=2)
+with open(os.path.join(out_dir, "mirror.env.sh"), "w") as f:
+    for name, value in env_urls.items():
+        if value in mapping:
+            f.write(f"export {name}={shlex.quote(mapping[value])}\n")
+
+print(f"{len(manifest)} URLs mirrored, {len(failed)} failed; {rewritten} payloads rewritten into {out_dir}")
+if expires_at:
+    print(f"The rewritten URLs are presigned and expire at {expires_at}; re-run this tool to refresh them.")
+else:
+    print(f"The rewritten URLs are unsigned; {bucket_name}/{args.prefix} must be readable without credentials, "
+          f"e.g. mc anonymous set download <alias>/{bucket_name}/{args.prefix.rstrip('/')}")
+mirrored_payloads = os.path.join(out_dir, "populate-studio", "payloads")
+if os.path.isdir(mirrored_payloads):
+    print(f"Onboard with: python populate-studio/populate-studio.py all --payloads-dir {mirrored_payloads}")
+if failed:
+    sys.exit(1)
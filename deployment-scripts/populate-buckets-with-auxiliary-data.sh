@@ -16,6 +16,11 @@ set +a
 
 source workspace/$DEPLOYMENT_ENV/env/env.sh
 
+# Download from the copies made by deployment-scripts/mirror_example_data.py, if any
+if [[ -f workspace/$DEPLOYMENT_ENV/mirrored-payloads/mirror.env.sh ]]; then
+    source workspace/$DEPLOYMENT_ENV/mirrored-payloads/mirror.env.sh
+fi
+
 if [[ "$ENVIRONMENT" == "local" ]]; then
     envsubst < deployment-scripts/template/populate-buckets-minio-pvc.yaml > workspace/$DEPLOYMENT_ENV/initialisation/populate-buckets-minio-pvc.yaml
     kubectl apply -f workspace/$DEPLOYMENT_ENV/initialisation/populate-buckets-minio-pvc.yaml -n $OC_PROJECT
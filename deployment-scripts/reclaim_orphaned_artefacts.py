@@ -0,0 +1,358 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+
+"""
+Find and delete artefacts left behind by deleted inferences and tunes.
+
+For the <deployment_name>-inference and -fine-tuning-models buckets, the
+common prefixes --depth levels down are enumerated and every prefix whose
+last segment is an ID (a UUID or geotune-<id>) is cross-referenced with the
+live IDs from every gateway list endpoint that can own objects in those
+buckets (LIVE_ENDPOINTS).  Prefixes whose ID is unknown to the gateway are
+orphans; prefixes whose last segment is not an ID are reported but never
+touched.  In <deployment_name>-temp-upload, nothing refers to objects by ID,
+so objects older than --temp-max-age-days are orphans.
+
+The gateway filters its listings by caller (created_by, shared), so IDs the
+API key cannot see look orphaned.  --delete therefore also requires
+--all-users, confirming that the key is one whose listings are not scoped to
+a single user, and refuses to run if the live ID listing looks incomplete.
+
+Objects modified within the last --min-age-hours are always kept, so jobs
+submitted while the tool runs are safe.  Without --delete the tool only
+reports (a dry run); with --delete the orphans are removed with concurrent
+delete_objects calls of up to 1000 keys each, streamed from the listing.
+
+Usage:
+    python deployment-scripts/reclaim_orphaned_artefacts.py --env-path workspace/<env>/env/.env \
+        [--report orphans.json]
+    python deployment-scripts/reclaim_orphaned_artefacts.py --env-path workspace/<env>/env/.env \
+        --delete --all-users
+
+Environment variables (alternative to flags):
+    STUDIO_API_KEY  - API key for authentication
+    UI_ROUTE_URL    - Studio UI base URL (e.g. https://localhost:4180)
+"""
+
+import ibm_boto3
+from ibm_botocore.client import Config
+import os
+import argparse
+import concurrent.futures
+import datetime
+import json
+import re
+import sys
+import threading
+import warnings
+
+import dotenv
+import requests
+import urllib3
+
+# Suppress SSL warnings for self-signed certificates (e.g., CRC OpenShift Local)
+warnings.filterwarnings('ignore', message='Unverified HTTPS request')
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# bucket suffix -> how orphans are recognised
+BUCKETS = {
+    "inference": "ids",
+    "fine-tuning-models": "ids",
+    "temp-upload": "age",
+}
+
+# gateway list endpoints whose records can own objects in the ID buckets
+LIVE_ENDPOINTS = [
+    "v2/inference",
+    "v2/tunes",
+    "v2/tunes-and-models",
+    "v2/base-models",
+    "v2/models",
+    "v2/tune-templates",
+    "v2/datasets",
+]
+
+# inference, model and dataset IDs are UUIDs, tune IDs geotune-<lowercase alphanumerics>
+ID_PATTERN = re.compile(
+    r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}|geotune-[0-9a-z]+", re.IGNORECASE
+)
+
+DELETE_BATCH = 1000  # delete_objects limit
+
+parser = argparse.ArgumentParser(description="Report (and optionally delete) orphaned inference and tune artefacts.")
+parser.add_argument('--env-path', type=str, default=None,
+                    help="Path to the .env file.")
+parser.add_argument('--buckets', type=str, default=",".join(BUCKETS),
+                    help=f"Comma-separated bucket suffixes to check (default: {','.join(BUCKETS)}).")
+parser.add_argument('--depth', type=int, default=1,
+                    help="Directory levels to enumerate prefixes at in the ID buckets (default: 1).")
+parser.add_argument('--min-age-hours', type=float, default=24,
+                    help="Never touch objects modified more recently than this (default: 24).")
+parser.add_argument('--temp-max-age-days', type=float, default=7,
+                    help="Age after which temp-upload objects are orphans (default: 7).")
+parser.add_argument('--workers', type=int, default=8,
+                    help="Concurrent list and delete requests (default: 8).")
+parser.add_argument('--delete', action='store_true',
+                    help="Delete the orphans. Without it only a dry-run report is produced.")
+parser.add_argument('--all-users', action='store_true',
+                    help="Confirm the API key sees every user's records (not only its own or shared ones). "
+                         "Required with --delete.")
+parser.add_argument('--report', type=str, default=None,
+                    help="Write the report to this JSON file.")
+parser.add_argument('--api-key', type=str, default=os.getenv("STUDIO_API_KEY", ""),
+                    help="Studio API key (or set STUDIO_API_KEY).")
+parser.add_argument('--studio-url', type=str, default=os.getenv("UI_ROUTE_URL", ""),
+                    help="Studio UI base URL (or set UI_ROUTE_URL).")
+args = parser.parse_args()
+
+if args.env_path:
+    env_file_path = os.path.abspath(args.env_path)
+    dotenv.load_dotenv(dotenv_path=env_file_path)
+else:
+    dotenv.load_dotenv()
+
+args.api_key = args.api_key or os.getenv("STUDIO_API_KEY", "")
+args.studio_url = args.studio_url or os.getenv("UI_ROUTE_URL", "")
+if not args.api_key or not args.studio_url:
+    parser.error("Provide --api-key/--studio-url or set STUDIO_API_KEY/UI_ROUTE_URL.")
+if args.delete and not args.all_users:
+    parser.error("--delete requires --all-users: the gateway scopes listings to the caller, so artefacts of "
+                 "other users would look orphaned to a per-user API key.")
+
+
+def get_s3_client():
+    cos = ibm_boto3.client(
+        "s3",
+        aws_access_key_id=os.getenv("access_key_id"),
+        aws_secret_access_key=os.getenv("secret_access_key"),
+        endpoint_url=os.getenv(
+            "endpoint", "https://s3.us-east.cloud-object-storage.appdomain.cloud"
+        ),
+        config=Config(
+            signature_version="s3v4",
+            max_pool_connections=args.workers + 1,
+            retries={"max_attempts": 5, "mode": "standard"},
+        ),
+        verify=False
+    )
+    return cos
+
+
+def fetch_live_ids(session, api_url, page_size=100):
+    """
+    All IDs the gateway knows about across LIVE_ENDPOINTS, the set of
+    created_by values seen, and a list of problems that make the listing
+    untrustworthy for deletion.  Pages are read until an empty one comes
+    back, since total_records may be null.
+    """
+    ids, owners, problems = set(), set(), []
+    for endpoint in LIVE_ENDPOINTS:
+        skip, found, total = 0, set(), None
+        while True:
+            resp = session.get(f"{api_url}/{endpoint}", params={"limit": page_size, "skip": skip}, timeout=60)
+            resp.raise_for_status()
+            body = resp.json()
+            page = body.get("results") or []
+            if body.get("total_records") is not None:
+                total = body["total_records"]
+            new = {str(r["id"]).lower() for r in page if r.get("id")} - found
+            if not page:
+                break
+            if not new:
+                problems.append(f"{endpoint} returned the same records again at skip={skip}")
+                break
+            found |= new
+            owners |= {r["created_by"] for r in page if r.get("created_by")}
+            skip += len(page)
+        if total is not None and total != len(found):
+            problems.append(f"{endpoint} reports {total} records but {len(found)} IDs were listed")
+        ids |= found
+    return ids, owners, problems
+
+
+def _pages(cos, bucket_name, prefix, delimiter=None):
+    params = {"Bucket": bucket_name, "Prefix": prefix}
+    if delimiter:
+        params["Delimiter"] = delimiter
+    return cos.get_paginator("list_objects_v2").paginate(**params)
+
+
+def list_prefixes(cos, bucket_name, depth):
+    """Common prefixes *depth* levels down, plus "" if objects sit above that level."""
+    level, loose = [""], False
+    for _ in range(depth):
+        next_level = []
+        for prefix in level:
+            for page in _pages(cos, bucket_name, prefix, "/"):
+                next_level += [p["Prefix"] for p in page.get("CommonPrefixes", [])]
+                loose = loose or bool(page.get("Contents"))
+        level = next_level
+    return level, loose
+
+
+def scan_prefix(cos, bucket_name, prefix, cutoff):
+    """(objects, bytes, reclaimable objects, reclaimable bytes) under *prefix*; reclaimable = older than *cutoff*."""
+    n = size = old_n = old_size = 0
+    for page in _pages(cos, bucket_name, prefix):
+        for obj in page.get("Contents", []):
+            n += 1
+            size += obj.get("Size", 0)
+            if obj["LastModified"] < cutoff:
+                old_n += 1
+                old_size += obj.get("Size", 0)
+    return n, size, old_n, old_size
+
+
+def delete_prefix(cos, bucket_name, prefix, cutoff, pool, in_flight):
+    """
+    Stream the keys under *prefix* older than *cutoff* into delete_objects
+    batches submitted to *pool*; *in_flight* bounds queued batches.
+    Returns the batch futures.
+    """
+    futures, batch = [], []
+
+    def _submit(keys):
+        in_flight.acquire()
+        future = pool.submit(
+            cos.delete_objects, Bucket=bucket_name,
+            Delete={"Objects": [{"Key": k} for k in keys], "Quiet": True},
+        )
+        future.add_done_callback(lambda _: in_flight.release())
+        futures.append((future, len(keys)))
+
+    for page in _pages(cos, bucket_name, prefix):
+        for obj in page.get("Contents", []):
+            if obj["LastModified"] < cutoff:
+                batch.append(obj["Key"])
+                if len(batch) == DELETE_BATCH:
+                    _submit(batch)
+                    batch = []
+    if batch:
+        _submit(batch)
+    return futures
+
+
+def human(nbytes):
+    size = float(nbytes)
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if size < 1024 or unit == "TiB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+
+
+def find_orphans(cos, bucket_name, mode, live_ids, now):
+    """Return the bucket report: orphan targets [(prefix, cutoff)] with sizes, and skipped prefixes."""
+    report = {"bucket": bucket_name, "mode": mode, "orphans": [], "kept_recent": [], "without_id": [], "live": 0}
+    min_age_cutoff = now - datetime.timedelta(hours=args.min_age_hours)
+    if mode == "age":
+        cutoff = min(min_age_cutoff, now - datetime.timedelta(days=args.temp_max_age_days))
+        candidates = [("", cutoff)]
+    else:
+        prefixes, loose = list_prefixes(cos, bucket_name, args.depth)
+        if loose:
+            report["without_id"].append("(objects above --depth)")
+        candidates = []
+        for prefix in prefixes:
+            segment = prefix.rstrip("/").rsplit("/", 1)[-1].lower()
+            if not ID_PATTERN.fullmatch(segment) and segment not in live_ids:
+                report["without_id"].append(prefix)
+            elif segment in live_ids:
+                report["live"] += 1
+            else:
+                candidates.append((prefix, min_age_cutoff))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+        scans = pool.map(lambda c: scan_prefix(cos, bucket_name, c[0], c[1]), candidates)
+        for (prefix, cutoff), (n, size, old_n, old_size) in zip(candidates, scans):
+            entry = {"prefix": prefix, "objects": old_n, "bytes": old_size, "cutoff": cutoff.isoformat()}
+            if old_n:
+                report["orphans"].append(entry)
+            if old_n < n:
+                report["kept_recent"].append(dict(entry, objects=n - old_n, bytes=size - old_size))
+    report["orphans"].sort(key=lambda e: e["bytes"], reverse=True)
+    return report
+
+
+def print_report(report):
+    orphans = report["orphans"]
+    total_n = sum(e["objects"] for e in orphans)
+    total_bytes = sum(e["bytes"] for e in orphans)
+    print(f"\n{report['bucket']}: {len(orphans)} orphaned prefixes, {total_n} objects, {human(total_bytes)}"
+          f" ({report['live']} live prefixes, {len(report['without_id'])} without an ID,"
+          f" {sum(e['objects'] for e in report['kept_recent'])} recent objects kept)")
+    for entry in orphans[:20]:
+        print(f"  {entry['prefix'] or '(bucket)':<70} {entry['objects']:>10} {human(entry['bytes']):>12}")
+    if len(orphans) > 20:
+        print(f"  ... {len(orphans) - 20} more")
+
+
+session = requests.Session()
+session.headers.update({"X-API-Key": args.api_key})
+session.verify = False
+api_url = f"{args.studio_url.rstrip('/')}/studio-gateway"
+
+try:
+    live_ids, owners, live_id_problems = fetch_live_ids(session, api_url)
+except (requests.exceptions.RequestException, ValueError) as e:
+    print(f"Fetching live IDs failed: {e}")
+    sys.exit(1)
+print(f"Gateway knows {len(live_ids)} IDs across {len(LIVE_ENDPOINTS)} endpoints, created by {len(owners)} users")
+if not args.all_users:
+    print("  ⚠️  Without --all-users the listing is assumed to be scoped to this API key; "
+          "prefixes of other users' records are reported as orphans.")
+for problem in live_id_problems:
+    print(f"  ⚠️  {problem}")
+
+cos = get_s3_client()
+deployment_name = os.getenv("deployment_name")
+now = datetime.datetime.now(datetime.timezone.utc)
+
+reports = []
+for suffix in [b.strip() for b in args.buckets.split(",") if b.strip()]:
+    bucket_name = f"{deployment_name}-{suffix}"
+    mode = BUCKETS.get(suffix, "ids")
+    try:
+        report = find_orphans(cos, bucket_name, mode, live_ids, now)
+    except Exception as e:
+        print(f"\nScanning bucket {bucket_name} failed: {e}")
+        continue
+    if mode == "ids" and not live_ids and report["orphans"]:
+        print(f"\n{bucket_name}: the gateway returned no live IDs; refusing to treat every prefix as orphaned")
+        report["orphans"] = []
+    print_report(report)
+    reports.append(report)
+
+if args.report:
+    with open(args.report, "w") as f:
+        json.dump({"generated_at": now.isoformat(), "deleted": args.delete, "buckets": reports}, f, indent=2)
+    print(f"\nReport written to {args.report}")
+
+if not args.delete:
+    print("\nDry run: nothing was deleted. Re-run with --delete to reclaim the orphans above.")
+    sys.exit(0)
+
+if live_id_problems and any(r["mode"] == "ids" and r["orphans"] for r in reports):
+    print("\nThe live ID listing is incomplete (see above); refusing to delete ID-based orphans.")
+    sys.exit(1)
+
+failed = 0
+with concurrent.futures.ThreadPoolExecutor(max_workers=args.workers) as pool:
+    in_flight = threading.BoundedSemaphore(args.workers * 2)
+    for report in reports:
+        deleted = 0
+        for entry in report["orphans"]:
+            cutoff = datetime.datetime.fromisoformat(entry["cutoff"])
+            for future, n in delete_prefix(cos, report["bucket"], entry["prefix"], cutoff, pool, in_flight):
+                try:
+                    errors = future.result().get("Errors", [])
+                except Exception as e:
+                    errors = [{"Key": "(batch)", "Message": str(e)}] * n
+                for error in errors[:3]:
+                    print(f"  Deleting {report['bucket']}/{error.get('Key')} failed: {error.get('Message')}")
+                failed += len(errors)
+                deleted += n - len(errors)
+        print(f"{report['bucket']}: deleted {deleted} objects")
+
+if failed:
+    print(f"{failed} objects could not be deleted")
+    sys.exit(1)
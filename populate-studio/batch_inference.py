@@ -0,0 +1,403 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+batch_inference.py - Submit many inferences from a GeoJSON or CSV file of
+areas of interest (AOIs) and date ranges.
+
+Every AOI bounding box larger than --max-tile-area-km2 is split client-side
+into a grid of roughly square tiles (the same area-threshold idea as the
+inference-planner's bbox_to_tile_threshold_area), and each tile is submitted
+as its own inference so large areas spread across pipeline workers instead
+of landing as one giant serial job.  At most --max-in-flight inferences are
+running at any time; the next tile is submitted as soon as one finishes.
+Submissions and status checks run concurrently over one asyncio
+connection pool (studio_async.AsyncStudioClient).
+
+Input formats:
+  GeoJSON  - a FeatureCollection (or a single Feature); the bbox of each
+             feature geometry is used.  Optional feature properties:
+             start_date, end_date (or date), location, description, tune_id.
+  CSV      - columns min_lon, min_lat, max_lon, max_lat (or a single "bbox"
+             column "min_lon,min_lat,max_lon,max_lat") plus the same
+             optional columns as the GeoJSON properties.
+
+AOIs without dates use --start-date / --end-date.  Fields such as
+model_input_data_spec, pipeline_steps, post_processing or geoserver_push can
+be taken from an existing payload with --template.
+
+Usage:
+    python populate-studio/batch_inference.py \
+        --aois aois.geojson \
+        --tune-id <TUNE_ID> \
+        [--template populate-studio/payloads/inferences/inference-<name>.json] \
+        [--start-date 2024-08-01 --end-date 2024-08-15] \
+        [--max-tile-area-km2 2500] [--max-in-flight 8] \
+        [--plan] [--no-wait] [--results-out results.json]
+
+Environment variables (alternative to flags):
+    STUDIO_API_KEY  - API key for authentication
+    UI_ROUTE_URL    - Studio UI base URL (e.g. https://localhost:4180)
+"""
+
+import argparse
+import asyncio
+import copy
+import csv
+import json
+import math
+import os
+import sys
+import time
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import List, Optional
+
+import aiohttp
+
+from studio_async import AsyncStudioClient, StudioAPIError
+from studio_metrics import RequestMetrics
+
+# Tiles larger than this (km²) are split further
+DEFAULT_MAX_TILE_AREA_KM2 = float(os.environ.get("BATCH_MAX_TILE_AREA_KM2", "2500"))
+
+# Maximum number of submitted inferences not yet finished
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("BATCH_MAX_IN_FLIGHT", "8"))
+
+DEFAULT_POLL_INTERVAL_S = 30
+
+# Give up tracking a job after this many consecutive failed status refreshes
+MAX_POLL_ERRORS = int(os.environ.get("BATCH_MAX_POLL_ERRORS", "10"))
+
+KM_PER_DEG_LAT = 110.574
+KM_PER_DEG_LON_EQUATOR = 111.320
+
+TERMINAL_MARKERS = ("COMPLETED", "FAILED", "ERROR", "STOPPED", "CANCELLED", "CANCELED")
+
+
+@dataclass
+class AOI:
+    bbox: List[float]
+    start_date: str
+    end_date: str
+    location: str = ""
+    description: str = ""
+    tune_id: Optional[str] = None
+
+
+@dataclass
+class TileJob:
+    name: str
+    payload: dict
+    inference_id: Optional[str] = None
+    status: str = "PLANNED"
+    error: Optional[str] = None
+    submitted_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    poll_errors: int = 0  # consecutive failed status refreshes
+
+
+# ---------------------------------------------------------------------------
+# AOI loading and tiling
+# ---------------------------------------------------------------------------
+
+def _flatten_coords(coords):
+    if coords and isinstance(coords[0], (int, float)):
+        yield coords
+        return
+    for c in coords:
+        yield from _flatten_coords(c)
+
+
+def geometry_bbox(geometry: dict) -> List[float]:
+    """Return [min_lon, min_lat, max_lon, max_lat] of a GeoJSON geometry."""
+    if geometry.get("type") == "GeometryCollection":
+        boxes = [geometry_bbox(g) for g in geometry.get("geometries", [])]
+        return [min(b[0] for b in boxes), min(b[1] for b in boxes), max(b[2] for b in boxes), max(b[3] for b in boxes)]
+    points = list(_flatten_coords(geometry["coordinates"]))
+    lons = [p[0] for p in points]
+    lats = [p[1] for p in points]
+    return [min(lons), min(lats), max(lons), max(lats)]
+
+
+def _aoi_from_properties(bbox, props: dict, default_start: str, default_end: str) -> AOI:
+    start = props.get("start_date") or props.get("date") or default_start
+    end = props.get("end_date") or props.get("date") or default_end or start
+    if not start:
+        raise ValueError(f"AOI {bbox} has no start_date/date and no --start-date was given")
+    return AOI(
+        bbox=[float(v) for v in bbox],
+        start_date=str(start),
+        end_date=str(end),
+        location=props.get("location") or "",
+        description=props.get("description") or "",
+        tune_id=props.get("tune_id") or None,
+    )
+
+
+def load_aois(path: str, default_start: str = "", default_end: str = "") -> List[AOI]:
+    """Load AOIs from a .geojson/.json or .csv file."""
+    aois = []
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as fh:
+            for row in csv.DictReader(fh):
+                row = {k.strip(): (v or "").strip() for k, v in row.items() if k}
+                if row.get("bbox"):
+                    bbox = [v for v in row["bbox"].replace(";", ",").split(",")]
+                else:
+                    bbox = [row["min_lon"], row["min_lat"], row["max_lon"], row["max_lat"]]
+                aois.append(_aoi_from_properties(bbox, row, default_start, default_end))
+        return aois
+
+    with open(path, "r") as fh:
+        data = json.load(fh)
+    features = data.get("features") if data.get("type") == "FeatureCollection" else [data]
+    for feature in features:
+        geometry = feature.get("geometry") if feature.get("type") == "Feature" else feature
+        bbox = feature.get("bbox") or geometry_bbox(geometry)
+        aois.append(_aoi_from_properties(bbox[:4], feature.get("properties") or {}, default_start, default_end))
+    return aois
+
+
+def bbox_area_km2(bbox: List[float]) -> float:
+    """Approximate area of a lon/lat bbox in km² (equirectangular)."""
+    min_lon, min_lat, max_lon, max_lat = bbox
+    mean_lat = math.radians((min_lat + max_lat) / 2)
+    width = (max_lon - min_lon) * KM_PER_DEG_LON_EQUATOR * math.cos(mean_lat)
+    height = (max_lat - min_lat) * KM_PER_DEG_LAT
+    return abs(width * height)
+
+
+def tile_bbox(bbox: List[float], max_area_km2: float) -> List[List[float]]:
+    """
+    Split *bbox* into a grid of roughly square tiles no larger than
+    *max_area_km2*.  Bboxes under the threshold are returned unchanged.
+    """
+    if max_area_km2 <= 0 or bbox_area_km2(bbox) <= max_area_km2:
+        return [list(bbox)]
+    min_lon, min_lat, max_lon, max_lat = bbox
+    mean_lat = math.radians((min_lat + max_lat) / 2)
+    side_km = math.sqrt(max_area_km2)
+    width_km = (max_lon - min_lon) * KM_PER_DEG_LON_EQUATOR * max(math.cos(mean_lat), 1e-6)
+    height_km = (max_lat - min_lat) * KM_PER_DEG_LAT
+    nx = max(1, math.ceil(width_km / side_km))
+    ny = max(1, math.ceil(height_km / side_km))
+    dlon = (max_lon - min_lon) / nx
+    dlat = (max_lat - min_lat) / ny
+    return [
+        [
+            round(min_lon + i * dlon, 6),
+            round(min_lat + j * dlat, 6),
+            round(min_lon + (i + 1) * dlon if i < nx - 1 else max_lon, 6),
+            round(min_lat + (j + 1) * dlat if j < ny - 1 else max_lat, 6),
+        ]
+        for j in range(ny)
+        for i in range(nx)
+    ]
+
+
+def plan_jobs(aois: List[AOI], tune_id: str, template: dict, max_area_km2: float) -> List[TileJob]:
+    """Expand AOIs into one inference payload per tile."""
+    jobs = []
+    for a, aoi in enumerate(aois, 1):
+        tiles = tile_bbox(aoi.bbox, max_area_km2)
+        for t, tile in enumerate(tiles, 1):
+            payload = copy.deepcopy(template)
+            payload["fine_tuning_id"] = aoi.tune_id or tune_id
+            payload["spatial_domain"] = {"bbox": [tile], "urls": [], "tiles": [], "polygons": []}
+            payload["temporal_domain"] = [f"{aoi.start_date}_{aoi.end_date}"]
+            suffix = f" (tile {t}/{len(tiles)})" if len(tiles) > 1 else ""
+            payload["location"] = aoi.location or payload.get("location") or f"AOI {a}"
+            payload["description"] = (aoi.description or payload.get("description") or "Batch inference") + suffix
+            jobs.append(TileJob(name=f"aoi{a}-tile{t}", payload=payload))
+    return jobs
+
+
+# ---------------------------------------------------------------------------
+# Submission and tracking
+# ---------------------------------------------------------------------------
+
+def is_terminal(status: str) -> bool:
+    s = (status or "").upper()
+    return any(marker in s for marker in TERMINAL_MARKERS)
+
+
+def _error_text(exc: Exception) -> str:
+    if isinstance(exc, StudioAPIError):
+        return f"{exc.status} - {str(exc.detail)[:300]}"
+    return f"{type(exc).__name__}: {exc}"
+
+
+async def submit_job(client: AsyncStudioClient, job: TileJob) -> TileJob:
+    """POST the job's payload; failures are recorded on the job rather than raised."""
+    try:
+        body = await client.create_inference(json=job.payload)
+    except StudioAPIError as exc:
+        job.submitted_at = job.finished_at = time.time()
+        job.status, job.error = "SUBMIT_FAILED", _error_text(exc)
+        return job
+    except ValueError as exc:
+        job.submitted_at = job.finished_at = time.time()
+        job.status, job.error = "SUBMIT_FAILED", f"unreadable response: {exc}"
+        return job
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        job.submitted_at = job.finished_at = time.time()
+        job.status = "SUBMIT_FAILED"
+        job.error = f"request failed (the inference may still have been created): {_error_text(exc)}"
+        return job
+    job.submitted_at = time.time()
+    job.inference_id = body.get("id") if isinstance(body, dict) else None
+    if not job.inference_id:
+        job.status, job.error = "SUBMIT_FAILED", f"no inference ID in response: {str(body)[:300]}"
+        job.finished_at = job.submitted_at
+        return job
+    job.status = body.get("status") or "SUBMITTED"
+    return job
+
+
+async def refresh_job(client: AsyncStudioClient, job: TileJob) -> TileJob:
+    """
+    Update the job's status.  A failed refresh is retried on the next poll;
+    after MAX_POLL_ERRORS in a row the job is marked POLL_FAILED.
+    """
+    try:
+        body = await client.retrieve_inference(inference_id=job.inference_id)
+        if not isinstance(body, dict):
+            raise ValueError(f"unexpected response: {str(body)[:200]}")
+        job.status = body.get("status") or job.status
+        job.poll_errors = 0
+    except (StudioAPIError, aiohttp.ClientError, asyncio.TimeoutError, ValueError) as exc:
+        job.poll_errors += 1
+        if job.poll_errors >= MAX_POLL_ERRORS:
+            job.status = "POLL_FAILED"
+            job.error = f"status unavailable after {job.poll_errors} attempts: {_error_text(exc)}"
+    return job
+
+
+async def run_batch(
+    client: AsyncStudioClient,
+    jobs: List[TileJob],
+    max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+    poll_interval_s: float = DEFAULT_POLL_INTERVAL_S,
+    wait: bool = True,
+) -> List[TileJob]:
+    """
+    Submit *jobs* keeping at most *max_in_flight* unfinished inferences,
+    refreshing their statuses every *poll_interval_s*.  With wait=False
+    all jobs are submitted (still *max_in_flight* requests at a time) and
+    not tracked.  Requests run concurrently on the client's shared
+    connection pool.
+    """
+    pending = deque(jobs)
+    active: List[TileJob] = []
+    done = 0
+    max_in_flight = max(max_in_flight, 1)
+    while pending or active:
+        slots = min(len(pending), max_in_flight) if not wait else max_in_flight - len(active)
+        batch = [pending.popleft() for _ in range(min(slots, len(pending)))]
+        for job in await asyncio.gather(*(submit_job(client, j) for j in batch)):
+            if job.error:
+                print(f"  ❌ {job.name}: submission failed – {job.error}")
+                done += 1
+                continue
+            print(f"  ▶  {job.name}: submitted as {job.inference_id} ({job.payload['spatial_domain']['bbox'][0]})")
+            if wait:
+                active.append(job)
+            else:
+                done += 1
+        if not active:
+            continue
+
+        await asyncio.sleep(poll_interval_s)
+        await asyncio.gather(*(refresh_job(client, j) for j in active))
+        for job in [j for j in active if is_terminal(j.status)]:
+            job.finished_at = time.time()
+            active.remove(job)
+            done += 1
+            icon = "✅" if "COMPLETED" in job.status.upper() else "❌"
+            print(f"  {icon} {job.name}: {job.status} after {job.finished_at - job.submitted_at:.0f}s")
+        print(f"  ⏳ {done}/{len(jobs)} finished, {len(active)} running, {len(pending)} queued")
+    return jobs
+
+
+async def _run(args: argparse.Namespace, jobs: List[TileJob], metrics: RequestMetrics) -> None:
+    api_url = f"{args.studio_url.rstrip('/')}/studio-gateway"
+    async with AsyncStudioClient(
+        api_url, args.api_key, max_in_flight=max(args.max_in_flight, 1), verify_ssl=False, metrics=metrics
+    ) as client:
+        await run_batch(client, jobs, args.max_in_flight, args.poll_interval, wait=not args.no_wait)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Submit tiled batch inferences from a GeoJSON/CSV of AOIs")
+    parser.add_argument("--aois", required=True, help="GeoJSON (.geojson/.json) or CSV file of AOIs")
+    parser.add_argument("--tune-id", default="", help="Tune ID used for AOIs without a tune_id property")
+    parser.add_argument("--template", help="Inference payload JSON providing the remaining fields")
+    parser.add_argument("--start-date", default="", help="Start date (YYYY-MM-DD) for AOIs without dates")
+    parser.add_argument("--end-date", default="", help="End date (YYYY-MM-DD) for AOIs without dates")
+    parser.add_argument("--max-tile-area-km2", type=float, default=DEFAULT_MAX_TILE_AREA_KM2,
+                        help=f"Split AOIs larger than this into tiles, 0 to disable "
+                             f"(default: {DEFAULT_MAX_TILE_AREA_KM2:g}, or set BATCH_MAX_TILE_AREA_KM2)")
+    parser.add_argument("--max-in-flight", type=int, default=DEFAULT_MAX_IN_FLIGHT,
+                        help=f"Maximum unfinished inferences at any time "
+                             f"(default: {DEFAULT_MAX_IN_FLIGHT}, or set BATCH_MAX_IN_FLIGHT)")
+    parser.add_argument("--poll-interval", type=float, default=DEFAULT_POLL_INTERVAL_S,
+                        help=f"Seconds between status refreshes (default: {DEFAULT_POLL_INTERVAL_S})")
+    parser.add_argument("--no-wait", action="store_true", help="Submit everything without tracking completion")
+    parser.add_argument("--plan", action="store_true", help="Print the planned tiles and exit")
+    parser.add_argument("--results-out", help="Write every job's payload, ID and final status to this JSON file")
+    parser.add_argument("--metrics-out", default=os.environ.get("STUDIO_METRICS_OUT"),
+                        help="Write per-endpoint gateway latency metrics to this .json or .csv file")
+    parser.add_argument("--api-key", default=os.environ.get("STUDIO_API_KEY", ""), help="Studio API key")
+    parser.add_argument("--studio-url", default=os.environ.get("UI_ROUTE_URL", ""), help="Studio UI base URL")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    template = {}
+    if args.template:
+        with open(args.template, "r") as fh:
+            template = json.load(fh)
+        # the AOI and dates come from the batch file
+        template.pop("spatial_domain", None)
+        template.pop("temporal_domain", None)
+
+    try:
+        aois = load_aois(args.aois, args.start_date, args.end_date)
+    except (KeyError, ValueError) as exc:
+        print(f"❌ Could not read AOIs from {args.aois}: {exc}")
+        return 1
+    if not args.tune_id and any(not a.tune_id for a in aois):
+        print("❌ Provide --tune-id or a tune_id for every AOI.")
+        return 1
+
+    jobs = plan_jobs(aois, args.tune_id, template, args.max_tile_area_km2)
+    print(f"📋 {len(aois)} AOI(s) -> {len(jobs)} inference tile(s) (max {args.max_tile_area_km2:g} km² per tile)")
+    if args.plan:
+        for job in jobs:
+            bbox = job.payload["spatial_domain"]["bbox"][0]
+            print(f"  {job.name}: bbox={bbox} ~{bbox_area_km2(bbox):.0f} km² {job.payload['temporal_domain'][0]}")
+        return 0
+
+    if not args.api_key or not args.studio_url:
+        print("❌ Provide --api-key/--studio-url or set STUDIO_API_KEY/UI_ROUTE_URL.")
+        return 1
+
+    metrics = RequestMetrics()
+    asyncio.run(_run(args, jobs, metrics))
+
+    failed = [j for j in jobs if j.error or (is_terminal(j.status) and "COMPLETED" not in j.status.upper())]
+    print(f"\n--- Batch summary: {len(jobs) - len(failed)}/{len(jobs)} ok, {len(failed)} failed ---")
+    if metrics.calls:
+        print(metrics.format_summary())
+    if args.results_out:
+        with open(args.results_out, "w") as fh:
+            json.dump([asdict(j) for j in jobs], fh, indent=2)
+        print(f"Results written to {args.results_out}")
+    if args.metrics_out:
+        metrics.write(args.metrics_out)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,472 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+load_test.py - Load / soak test for the Studio gateway and pipelines.
+
+Replays one of the tests/api-data payloads (e.g. 01-inf-inferences.json)
+against a deployment, either at a fixed arrival rate (--rate, open model:
+arrivals don't wait for the cluster) or keeping a fixed number of jobs in
+flight (--concurrency, closed model), for --duration seconds or --count
+jobs.  Every submitted inference / dataset onboarding is tracked to
+completion through the shared StatusPoller used by run_labs.py.
+
+Reported, overall and per --window of the run:
+  - throughput (completed jobs per minute) and jobs in flight
+  - submit latency, queue time (submitted -> first non-queued status),
+    run time (-> terminal status) and total time percentiles
+  - error rate (submit errors, failed jobs, timeouts)
+plus the per-endpoint gateway latency table from studio_metrics.
+
+Queue and run times are measured from the status polls, so they are
+accurate to the poll interval (bounded by --poll-max-interval).
+
+Workloads (--workload):
+  inferences   01-inf-inferences.json  POST v2/inference           tracked
+  datasets     02-ft-datasets.json     POST v2/datasets/onboard    tracked
+  models       00-inf-models.json      POST v2/models              latency only
+  templates    03-ft-templates.json    POST v2/tune-templates      latency only
+  base-models  04-ft-base-models.json  POST v2/base-models         latency only
+
+Name fields of the payload (the description for inferences, whose
+model_display_name selects the model) get a "-load-<run>-<n>" suffix so
+every job creates a distinct resource.
+
+Usage:
+    python populate-studio/load_test.py --workload inferences --rate 0.2 --duration 1800
+    python populate-studio/load_test.py --workload inferences --concurrency 20 --count 200 \
+        --window 60 --out load-report.json
+
+Environment variables (alternative to flags):
+    STUDIO_API_KEY  - API key for authentication
+    UI_ROUTE_URL    - Studio UI base URL (e.g. https://localhost:4180)
+"""
+
+import argparse
+import concurrent.futures
+import copy
+import csv
+import json
+import os
+import random
+import sys
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+import requests
+import urllib3
+
+from studio_metrics import RequestMetrics, instrument_session, percentile
+from studio_poller import PollPolicy, StatusPoller
+from studio_resilience import mount_resilience
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+DEFAULT_PAYLOAD_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "tests", "api-data")
+
+
+@dataclass
+class Workload:
+    payload_file: str
+    endpoint: str
+    kind: Optional[str]  # StatusPoller job kind, None when the call is synchronous
+
+
+WORKLOADS = {
+    "models": Workload("00-inf-models.json", "v2/models", None),
+    "inferences": Workload("01-inf-inferences.json", "v2/inference", "inference"),
+    "datasets": Workload("02-ft-datasets.json", "v2/datasets/onboard", "dataset"),
+    "templates": Workload("03-ft-templates.json", "v2/tune-templates", None),
+    "base-models": Workload("04-ft-base-models.json", "v2/base-models", None),
+}
+
+# Payload fields made unique per job.  model_display_name is left alone: it
+# selects the model an inference runs on, so inferences get a tagged
+# description instead.
+NAME_FIELDS = ("display_name", "name", "dataset_name")
+LABEL_FALLBACK_FIELD = "description"
+
+# Statuses of jobs that have not started running yet
+QUEUED_STATUSES = {"PENDING", "QUEUED", "WAITING", "READY", "SUBMITTED", "ACCEPTED", "NEW"}
+
+# Terminal statuses that count as success
+SUCCESS_MARKERS = ("COMPLETED", "SUCCEEDED", "FINISHED", "CREATED")
+
+
+@dataclass
+class JobSample:
+    seq: int
+    resource_id: str = ""
+    submitted_at: float = 0.0  # seconds since the start of the test
+    submit_s: float = 0.0
+    started_at: Optional[float] = None  # first non-queued status seen
+    finished_at: Optional[float] = None
+    status: str = ""
+    error: str = ""
+
+    @property
+    def outcome(self) -> str:
+        if self.error == "timeout":
+            return "timeout"
+        if self.error:
+            return "error"
+        if self.finished_at is None:
+            return "in_flight"
+        return "ok" if any(m in self.status.upper() for m in SUCCESS_MARKERS) else "failed"
+
+    @property
+    def queue_s(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        started = self.started_at if self.started_at is not None else self.finished_at
+        return started - self.submitted_at
+
+    @property
+    def run_s(self) -> Optional[float]:
+        if self.finished_at is None:
+            return None
+        started = self.started_at if self.started_at is not None else self.finished_at
+        return self.finished_at - started
+
+    @property
+    def total_s(self) -> Optional[float]:
+        return None if self.finished_at is None else self.finished_at - self.submitted_at
+
+
+def make_payload(template: dict, seq: int, run_tag: str) -> dict:
+    payload = copy.deepcopy(template)
+    tag = f"load-{run_tag}-{seq}"
+    fields = [f for f in NAME_FIELDS if isinstance(payload.get(f), str)]
+    if not fields:
+        fields = [LABEL_FALLBACK_FIELD]
+        payload.setdefault(LABEL_FALLBACK_FIELD, "")
+    for field in fields:
+        payload[field] = f"{payload[field]}-{tag}" if payload[field] else tag
+    return payload
+
+
+class LoadTest:
+    """Submits jobs and tracks them; every timestamp is relative to start()."""
+
+    def __init__(
+        self,
+        session: requests.Session,
+        api_url: str,
+        workload: Workload,
+        template: dict,
+        poller: Optional[StatusPoller],
+        job_timeout_s: float,
+    ):
+        self.session = session
+        self.api_url = api_url.rstrip("/")
+        self.workload = workload
+        self.template = template
+        self.poller = poller
+        self.job_timeout_s = job_timeout_s
+        self.run_tag = time.strftime("%m%d%H%M%S")
+        self.samples: List[JobSample] = []
+        self.in_flight = 0
+        self._by_id: Dict[str, JobSample] = {}
+        self._futures: Dict[int, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+        self._slots: Optional[threading.Semaphore] = None
+        self._t0 = time.monotonic()
+
+    def now(self) -> float:
+        return time.monotonic() - self._t0
+
+    def on_record(self, kind: str, resource_id: str, record: dict) -> None:
+        """StatusPoller hook: note when a job leaves the queue."""
+        sample = self._by_id.get(resource_id)
+        status = str(record.get("status") or "").upper()
+        if sample is not None and sample.started_at is None and status and status not in QUEUED_STATUSES:
+            sample.started_at = self.now()
+
+    def _finish(self, sample: JobSample, status: str = "", error: str = "") -> None:
+        with self._lock:
+            if sample.finished_at is not None or (sample.error and sample.error != "timeout" and not error):
+                return
+            sample.finished_at = self.now()
+            sample.status = status or sample.status
+            sample.error = error or sample.error
+            self.in_flight -= 1
+        if self._slots is not None:
+            self._slots.release()
+
+    def submit(self, seq: int) -> None:
+        """Submit job *seq* and start tracking it (runs on a submit worker thread)."""
+        sample = JobSample(seq=seq, submitted_at=self.now())
+        with self._lock:
+            self.samples.append(sample)
+            self.in_flight += 1
+        payload = make_payload(self.template, seq, self.run_tag)
+        start = time.perf_counter()
+        try:
+            resp = self.session.post(f"{self.api_url}/{self.workload.endpoint}", json=payload, timeout=120)
+            sample.submit_s = time.perf_counter() - start
+            if not resp.ok:
+                self._finish(sample, error=f"{resp.status_code} - {resp.text[:200]}")
+                return
+            body = resp.json() if resp.content else {}
+        except (requests.exceptions.RequestException, ValueError) as exc:
+            sample.submit_s = time.perf_counter() - start
+            self._finish(sample, error=f"{type(exc).__name__}: {exc}")
+            return
+
+        sample.resource_id = str(body.get("id") or body.get("dataset_id") or body.get("inference_id") or "")
+        if self.workload.kind is None or self.poller is None:
+            self._finish(sample, status=str(body.get("status") or "CREATED"))
+            return
+        if not sample.resource_id:
+            self._finish(sample, error="no ID in submit response")
+            return
+        self._by_id[sample.resource_id] = sample
+        future = self.poller.watch(self.workload.kind, sample.resource_id, job_type=f"load:{self.workload.kind}")
+        self._futures[seq] = future
+        future.add_done_callback(
+            lambda f: None if f.cancelled() else self._finish(sample, status=str(f.result().get("status") or ""))
+        )
+
+    def expire(self) -> None:
+        """Mark jobs running longer than the job timeout as timed out."""
+        now = self.now()
+        for sample in list(self.samples):
+            if sample.finished_at is None and sample.resource_id and now - sample.submitted_at > self.job_timeout_s:
+                future = self._futures.get(sample.seq)
+                if future is not None:
+                    future.cancel()
+                self._finish(sample, error="timeout")
+
+    def run(
+        self,
+        rate: Optional[float],
+        concurrency: Optional[int],
+        duration_s: Optional[float],
+        count: Optional[int],
+        poisson: bool = False,
+        window_s: float = 60,
+    ) -> None:
+        """Generate load until *duration_s* or *count* is reached, then drain in-flight jobs."""
+        self._t0 = time.monotonic()
+        self._slots = threading.Semaphore(concurrency) if concurrency else None
+        next_arrival, next_report, seq = 0.0, window_s, 0
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(concurrency or 0, 16)) as submitters:
+            while (duration_s is None or self.now() < duration_s) and (count is None or seq < count):
+                if self._slots is not None:
+                    while not self._slots.acquire(timeout=1):
+                        self.expire()
+                if rate:
+                    delay = next_arrival - self.now()
+                    if delay > 0:
+                        time.sleep(delay)
+                    next_arrival += random.expovariate(rate) if poisson else 1 / rate
+                submitters.submit(self.submit, seq)
+                seq += 1
+                self.expire()
+                if self.now() >= next_report:
+                    self.progress()
+                    next_report += window_s
+        print(f"\n⏳ Load generation finished after {seq} job(s); draining {self.in_flight} in flight...")
+        while self.in_flight > 0:
+            self.expire()
+            time.sleep(1)
+            if self.now() >= next_report:
+                self.progress()
+                next_report += window_s
+
+    def progress(self) -> None:
+        done = [s for s in self.samples if s.finished_at is not None]
+        ok = sum(1 for s in done if s.outcome == "ok")
+        print(f"  [{self.now():7.0f}s] submitted={len(self.samples)} in_flight={self.in_flight} "
+              f"ok={ok} not_ok={len(done) - ok}")
+
+
+def _stats(values: List[float]) -> dict:
+    values = [v for v in values if v is not None]
+    if not values:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "p50": round(percentile(values, 50), 2),
+        "p95": round(percentile(values, 95), 2),
+        "p99": round(percentile(values, 99), 2),
+        "max": round(max(values), 2),
+    }
+
+
+def summarise(samples: List[JobSample], elapsed_s: float) -> dict:
+    outcomes: Dict[str, int] = {}
+    for s in samples:
+        outcomes[s.outcome] = outcomes.get(s.outcome, 0) + 1
+    finished = [s for s in samples if s.outcome == "ok"]
+    not_ok = len(samples) - outcomes.get("ok", 0) - outcomes.get("in_flight", 0)
+    return {
+        "jobs": len(samples),
+        "outcomes": outcomes,
+        "error_rate": round(not_ok / len(samples), 4) if samples else 0.0,
+        "elapsed_s": round(elapsed_s, 1),
+        "throughput_per_min": round(len(finished) / elapsed_s * 60, 3) if elapsed_s > 0 else 0.0,
+        "submit_s": _stats([s.submit_s for s in samples]),
+        "queue_s": _stats([s.queue_s for s in finished]),
+        "run_s": _stats([s.run_s for s in finished]),
+        "total_s": _stats([s.total_s for s in finished]),
+    }
+
+
+def timeline(samples: List[JobSample], elapsed_s: float, window_s: float) -> List[dict]:
+    """Per-window arrivals, completions, errors, jobs in flight and latency of the jobs finishing in it."""
+    rows = []
+    start = 0.0
+    while start < elapsed_s:
+        end = start + window_s
+        finished = [s for s in samples if s.finished_at is not None and start <= s.finished_at < end]
+        ok = [s for s in finished if s.outcome == "ok"]
+        rows.append({
+            "window_start_s": round(start),
+            "submitted": sum(1 for s in samples if start <= s.submitted_at < end),
+            "completed": len(ok),
+            "not_ok": len(finished) - len(ok),
+            "error_rate": round((len(finished) - len(ok)) / len(finished), 3) if finished else 0.0,
+            "in_flight_at_end": sum(
+                1 for s in samples if s.submitted_at < end and (s.finished_at is None or s.finished_at >= end)
+            ),
+            "throughput_per_min": round(len(ok) / window_s * 60, 2),
+            "queue_p50_s": _stats([s.queue_s for s in ok])["p50"],
+            "run_p50_s": _stats([s.run_s for s in ok])["p50"],
+            "total_p50_s": _stats([s.total_s for s in ok])["p50"],
+            "total_p95_s": _stats([s.total_s for s in ok])["p95"],
+        })
+        start = end
+    return rows
+
+
+def format_report(summary: dict, rows: List[dict]) -> str:
+    def _fmt(v):
+        return "-" if v is None else f"{v:g}"
+
+    lines = [
+        f"Jobs: {summary['jobs']}  outcomes: {summary['outcomes']}  error rate: {summary['error_rate']:.1%}",
+        f"Elapsed: {summary['elapsed_s']:g}s  throughput: {summary['throughput_per_min']:g} completed/min",
+        "",
+        "| Latency (s) | p50 | p95 | p99 | max |",
+        "|-------------|-----|-----|-----|-----|",
+    ]
+    for key, label in (("submit_s", "Submit"), ("queue_s", "Queue"), ("run_s", "Run"), ("total_s", "Total")):
+        st = summary[key]
+        lines.append(f"| {label} | {_fmt(st['p50'])} | {_fmt(st['p95'])} | {_fmt(st['p99'])} | {_fmt(st['max'])} |")
+    lines += [
+        "",
+        "| Window (s) | Submitted | Completed | Not ok | Error rate | In flight | /min | Queue p50 | Run p50 | Total p50 | Total p95 |",
+        "|------------|-----------|-----------|--------|------------|-----------|------|-----------|---------|-----------|-----------|",
+    ]
+    for r in rows:
+        lines.append(
+            f"| {r['window_start_s']} | {r['submitted']} | {r['completed']} | {r['not_ok']} | {r['error_rate']:.1%} "
+            f"| {r['in_flight_at_end']} | {r['throughput_per_min']:g} | {_fmt(r['queue_p50_s'])} "
+            f"| {_fmt(r['run_p50_s'])} | {_fmt(r['total_p50_s'])} | {_fmt(r['total_p95_s'])} |"
+        )
+    return "\n".join(lines)
+
+
+def write_report(path: str, summary: dict, rows: List[dict], samples: List[JobSample]) -> None:
+    """Write a .csv (timeline) or JSON (summary, timeline and every job) report."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    if path.lower().endswith(".csv"):
+        with open(path, "w", newline="") as fh:
+            writer = csv.DictWriter(fh, fieldnames=list(rows[0]) if rows else ["window_start_s"])
+            writer.writeheader()
+            writer.writerows(rows)
+        return
+    jobs = [dict(asdict(s), outcome=s.outcome, queue_s=s.queue_s, run_s=s.run_s, total_s=s.total_s) for s in samples]
+    with open(path, "w") as fh:
+        json.dump({"summary": summary, "timeline": rows, "jobs": jobs}, fh, indent=2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Load / soak test the Studio gateway with tests/api-data payloads")
+    parser.add_argument("--workload", choices=sorted(WORKLOADS), default="inferences",
+                        help="Payload to replay (default: inferences)")
+    parser.add_argument("--payload-dir", default=DEFAULT_PAYLOAD_DIR, help="Directory of the api-data payloads")
+    parser.add_argument("--payload", help="Replay this payload file instead of the workload's default one")
+    parser.add_argument("--rate", type=float, help="Arrival rate in jobs per second (open model)")
+    parser.add_argument("--poisson", action="store_true", help="Use exponential inter-arrival times with --rate")
+    parser.add_argument("--concurrency", type=int, help="Jobs kept in flight (closed model); also caps --rate")
+    parser.add_argument("--duration", type=float, help="Seconds to generate load for")
+    parser.add_argument("--count", type=int, help="Number of jobs to submit")
+    parser.add_argument("--job-timeout", type=float, default=3600, help="Seconds before a job counts as timed out")
+    parser.add_argument("--window", type=float, default=60, help="Reporting window in seconds (default: 60)")
+    parser.add_argument("--poll-max-interval", type=float, default=15,
+                        help="Longest interval between status checks of a job (sets timing resolution)")
+    parser.add_argument("--out", help="Write the report to this .json (summary, timeline, jobs) or .csv (timeline) file")
+    parser.add_argument("--metrics-out", default=os.environ.get("STUDIO_METRICS_OUT"),
+                        help="Write per-endpoint gateway latency metrics to this .json or .csv file")
+    parser.add_argument("--api-key", default=os.environ.get("STUDIO_API_KEY", ""), help="Studio API key")
+    parser.add_argument("--studio-url", default=os.environ.get("UI_ROUTE_URL", ""), help="Studio UI base URL")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if not args.rate and not args.concurrency:
+        print("❌ Provide --rate and/or --concurrency.")
+        return 1
+    if args.duration is None and args.count is None:
+        print("❌ Provide --duration and/or --count.")
+        return 1
+    if not args.api_key or not args.studio_url:
+        print("❌ Provide --api-key/--studio-url or set STUDIO_API_KEY/UI_ROUTE_URL.")
+        return 1
+
+    workload = WORKLOADS[args.workload]
+    payload_path = args.payload or os.path.join(args.payload_dir, workload.payload_file)
+    with open(payload_path, "r") as fh:
+        template = json.load(fh)
+
+    metrics = RequestMetrics()
+    pool_size = max(args.concurrency or 0, 16) + 4
+    with requests.Session() as session:
+        mount_resilience(session, pool_maxsize=pool_size)
+        instrument_session(session, metrics)
+        session.headers.update({"Content-Type": "application/json", "X-API-Key": args.api_key})
+        session.verify = False
+        api_url = f"{args.studio_url.rstrip('/')}/studio-gateway"
+
+        test = LoadTest(session, api_url, workload, template, None, args.job_timeout)
+        policy = PollPolicy(max_s=args.poll_max_interval)
+        policy.initial_s = min(policy.initial_s, policy.max_s)
+        policy.base_s = min(policy.base_s, policy.max_s)
+        poller = StatusPoller(
+            session,
+            api_url,
+            policy=policy,
+            on_record=test.on_record,
+            page_size=100,
+            max_pages=5,
+        )
+        test.poller = poller
+        print(f"🚀 Replaying {os.path.basename(payload_path)} -> POST {workload.endpoint} "
+              f"(rate={args.rate or '-'}/s, concurrency={args.concurrency or '-'}, "
+              f"duration={args.duration or '-'}s, count={args.count or '-'})")
+        with poller:
+            try:
+                test.run(args.rate, args.concurrency, args.duration, args.count, args.poisson, args.window)
+            except KeyboardInterrupt:
+                print("\n⏹  Interrupted; reporting what was measured so far")
+
+    elapsed = test.now()
+    summary = summarise(test.samples, elapsed)
+    rows = timeline(test.samples, elapsed, args.window)
+    print("\n--- Load test report ---")
+    print(format_report(summary, rows))
+    if metrics.calls:
+        print("\n" + metrics.format_summary())
+    if args.out:
+        write_report(args.out, summary, rows, test.samples)
+        print(f"Report written to {args.out}")
+    if args.metrics_out:
+        metrics.write(args.metrics_out)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
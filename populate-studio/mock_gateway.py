@@ -0,0 +1,494 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+mock_gateway.py - Offline stand-in for the Studio gateway.
+
+Serves, from memory, the subset of docs/openapi.json that populate-studio.py,
+run_labs.py, batch_inference.py and load_test.py use, so pollers, bulk
+onboarding and retry handling can be benchmarked and regression-tested on a
+laptop without a cluster or network:
+
+  registration   POST / GET v2/models, v2/tune-templates, v2/base-models (and /{id})
+  jobs           POST v2/inference, v2/datasets/onboard, v2/submit-tune,
+                 v2/upload-completed-tunes, v2/tunes/{id}/try-out;
+                 GET v2/inference, v2/datasets, v2/tunes (and /{id});
+                 POST v2/inference/{id}/cancel; DELETE /{id}
+  dry runs       POST v2/inference/dry-run, v2/submit-tune/dry-run
+  notifications  GET v2/notifications/{id} (JSON pages of status events)
+  file share     GET v2/file-share -> PUT/GET URLs served by the mock itself
+
+List endpoints page with limit/skip, newest first.  Jobs move through fake
+state machines driven by the time since submission (no background threads):
+
+  inference  READY -> RUNNING -> COMPLETED | FAILED      (cancel -> STOPPED)
+  tune       Pending -> Running -> Finished | Failed
+  dataset    Pending -> Running -> Succeeded | Failed
+
+Latency and errors are injected per API request: a fixed delay plus random
+jitter, and a fraction of requests answered with --error-status (503 with a
+Retry-After header by default).  GET /_mock/stats returns the request count
+per route, injected errors and job counts; POST /_mock/reset clears the store.
+
+Usage:
+    python populate-studio/mock_gateway.py --port 8080 --queue-s 2 --run-s 20 \
+        --latency-ms 50 --latency-jitter-ms 100 --error-rate 0.02 --job-failure-rate 0.05
+    UI_ROUTE_URL=http://127.0.0.1:8080 STUDIO_API_KEY=mock \
+        python populate-studio/load_test.py --concurrency 20 --count 200
+
+In-process, e.g. for a benchmark or regression test:
+    with MockGateway(MockConfig(port=0, run_s=2)) as gateway:
+        api_url = f"{gateway.url}/studio-gateway"
+
+Environment variables (alternative to flags):
+    MOCK_GATEWAY_PORT, MOCK_GATEWAY_API_KEY, MOCK_QUEUE_S, MOCK_RUN_S,
+    MOCK_JOB_FAILURE_RATE, MOCK_LATENCY_MS, MOCK_LATENCY_JITTER_MS,
+    MOCK_ERROR_RATE, MOCK_ERROR_STATUS
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+GATEWAY_PREFIX = "/studio-gateway"
+
+# job kind -> (queued, running, succeeded, failed, cancelled)
+STATE_MACHINES = {
+    "inference": ("READY", "RUNNING", "COMPLETED", "FAILED", "STOPPED"),
+    "tune": ("Pending", "Running", "Finished", "Failed", "Failed"),
+    "dataset": ("Pending", "Running", "Succeeded", "Failed", "Failed"),
+}
+
+# POST endpoint -> (collection, job kind or None for synchronous registrations)
+CREATE_ENDPOINTS = {
+    "inference": ("inference", "inference"),
+    "datasets/onboard": ("datasets", "dataset"),
+    "submit-tune": ("tunes", "tune"),
+    "upload-completed-tunes": ("tunes", "tune"),
+    "models": ("models", None),
+    "tune-templates": ("tune-templates", None),
+    "base-models": ("base-models", None),
+}
+
+COLLECTIONS = ("inference", "datasets", "tunes", "models", "tune-templates", "base-models")
+
+_COLL = "|".join(re.escape(c) for c in COLLECTIONS)
+_CREATE = "|".join(re.escape(e) for e in CREATE_ENDPOINTS)
+
+# (method, path pattern relative to the gateway prefix, handler name)
+ROUTES = [
+    ("GET", r"v2/file-share", "file_share"),
+    ("POST", r"v2/(?:inference|submit-tune)/dry-run", "dry_run"),
+    ("POST", r"v2/inference/(?P<id>[^/]+)/cancel", "cancel"),
+    ("POST", r"v2/tunes/(?P<id>[^/]+)/try-out", "try_out"),
+    ("GET", r"v2/notifications/(?P<id>[^/]+)", "notifications"),
+    ("POST", rf"v2/(?P<endpoint>{_CREATE})", "create"),
+    ("GET", rf"v2/(?P<coll>{_COLL})", "list"),
+    ("GET", rf"v2/(?P<coll>{_COLL})/(?P<id>[^/]+)", "get"),
+    ("DELETE", rf"v2/(?P<coll>{_COLL})/(?P<id>[^/]+)", "delete"),
+]
+_ROUTES = [(method, re.compile(pattern + r"/?$"), name) for method, pattern, name in ROUTES]
+
+
+@dataclass
+class MockConfig:
+    host: str = "127.0.0.1"
+    port: int = int(os.environ.get("MOCK_GATEWAY_PORT", "8080"))  # 0 picks a free port
+    api_key: str = os.environ.get("MOCK_GATEWAY_API_KEY", "")  # empty accepts any key
+    queue_s: float = float(os.environ.get("MOCK_QUEUE_S", "2"))
+    run_s: float = float(os.environ.get("MOCK_RUN_S", "10"))
+    duration_jitter: float = 0.25  # +/- fraction applied to queue_s and run_s per job
+    job_failure_rate: float = float(os.environ.get("MOCK_JOB_FAILURE_RATE", "0"))
+    latency_ms: float = float(os.environ.get("MOCK_LATENCY_MS", "0"))
+    latency_jitter_ms: float = float(os.environ.get("MOCK_LATENCY_JITTER_MS", "0"))
+    error_rate: float = float(os.environ.get("MOCK_ERROR_RATE", "0"))
+    error_status: int = int(os.environ.get("MOCK_ERROR_STATUS", "503"))
+    retry_after_s: float = 1
+    seed: Optional[int] = None
+
+
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, tz=timezone.utc).isoformat()
+
+
+@dataclass
+class _Job:
+    kind: str
+    created: float
+    started: float
+    finished: float
+    fails: bool
+    cancelled: Optional[float] = None
+
+    def transitions(self, now: float) -> List[Tuple[float, str]]:
+        """[(time, status)] reached by *now*, oldest first."""
+        queued, running, succeeded, failed, cancelled = STATE_MACHINES[self.kind]
+        steps = [(self.created, queued), (self.started, running), (self.finished, failed if self.fails else succeeded)]
+        if self.cancelled is not None:
+            steps = [s for s in steps if s[0] < self.cancelled] + [(self.cancelled, cancelled)]
+        return [s for s in steps if s[0] <= now]
+
+
+class _Store:
+    """In-memory collections; jobs carry their state machine next to the record."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records: Dict[str, "OrderedDict[str, dict]"] = {c: OrderedDict() for c in COLLECTIONS}
+        self.jobs: Dict[str, _Job] = {}
+        self.files: Dict[str, bytes] = {}
+
+    def view(self, record: dict, now: float) -> dict:
+        job = self.jobs.get(record["id"])
+        if job is None:
+            return dict(record)
+        status_time, status = job.transitions(now)[-1]
+        view = dict(record, status=status, updated_at=_iso(status_time))
+        if job.kind == "inference":
+            done = status in STATE_MACHINES["inference"][2:]
+            view.update(
+                tasks_count_total=1,
+                tasks_count_success=int(status == "COMPLETED"),
+                tasks_count_failed=int(status == "FAILED"),
+                tasks_count_stopped=int(status == "STOPPED"),
+                tasks_count_waiting=int(not done),
+            )
+        return view
+
+
+class MockGateway:
+    """A mock gateway on a background thread; use as a context manager or call start()/stop()."""
+
+    def __init__(self, config: Optional[MockConfig] = None):
+        self.config = config or MockConfig()
+        self.random = random.Random(self.config.seed)
+        self.store = _Store()
+        self.stats: Dict[str, int] = {}
+        self.injected_errors = 0
+        self._stats_lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockGateway":
+        self._server = ThreadingHTTPServer((self.config.host, self.config.port), _Handler)
+        self._server.daemon_threads = True
+        self._server.gateway = self
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mock-gateway", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockGateway":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    # --- injection ---
+
+    def _duration(self, seconds: float) -> float:
+        jitter = self.config.duration_jitter
+        return max(0.0, seconds * self.random.uniform(1 - jitter, 1 + jitter))
+
+    def delay(self) -> None:
+        delay_ms = self.config.latency_ms + self.random.uniform(0, self.config.latency_jitter_ms)
+        if delay_ms > 0:
+            time.sleep(delay_ms / 1000)
+
+    def inject_error(self) -> bool:
+        if self.config.error_rate > 0 and self.random.random() < self.config.error_rate:
+            with self._stats_lock:
+                self.injected_errors += 1
+            return True
+        return False
+
+    def count(self, route: str) -> None:
+        with self._stats_lock:
+            self.stats[route] = self.stats.get(route, 0) + 1
+
+    # --- handlers: each returns (status, body) ---
+
+    def _new_record(self, collection: str, payload: dict, kind: Optional[str], now: float) -> dict:
+        record = dict(payload, id=str(uuid.uuid4()), active=True, created_by="mock", created_at=_iso(now))
+        record["updated_at"] = record["created_at"]
+        with self.store.lock:
+            self.store.records[collection][record["id"]] = record
+            if kind is not None:
+                started = now + self._duration(self.config.queue_s)
+                self.store.jobs[record["id"]] = _Job(
+                    kind=kind,
+                    created=now,
+                    started=started,
+                    finished=started + self._duration(self.config.run_s),
+                    fails=self.random.random() < self.config.job_failure_rate,
+                )
+        return record
+
+    def create(self, body: dict, endpoint: str, **_) -> Tuple[int, dict]:
+        collection, kind = CREATE_ENDPOINTS[endpoint]
+        now = time.time()
+        record = self._new_record(collection, body, kind, now)
+        view = self.store.view(record, now)
+        if endpoint == "datasets/onboard":
+            return 201, {"dataset_id": record["id"], "status": view["status"], "message": "Onboarding submitted"}
+        if collection == "tunes":
+            return 201, {"tune_id": record["id"], "mcad_id": f"kjob-{record['id']}-job",
+                         "status": view["status"], "message": "Tune submitted"}
+        return 201, view
+
+    def try_out(self, body: dict, id: str, **_) -> Tuple[int, dict]:
+        if id not in self.store.records["tunes"]:
+            return 404, {"detail": f"Tune {id} not found"}
+        now = time.time()
+        record = self._new_record("inference", dict(body, fine_tuning_id=id), "inference", now)
+        return 200, self.store.view(record, now)
+
+    def list(self, coll: str, query: dict, **_) -> Tuple[int, dict]:
+        limit = int(query.get("limit", ["25"])[0])
+        skip = int(query.get("skip", ["0"])[0])
+        now = time.time()
+        with self.store.lock:
+            records = list(reversed(self.store.records[coll].values()))
+            page = [self.store.view(r, now) for r in records[skip:skip + limit]]
+        return 200, {
+            "total_records": len(records),
+            "page_count": math.ceil(len(records) / limit) if limit else 0,
+            "results": page,
+        }
+
+    def get(self, coll: str, id: str, **_) -> Tuple[int, dict]:
+        with self.store.lock:
+            record = self.store.records[coll].get(id)
+            if record is None:
+                return 404, {"detail": f"{coll} {id} not found"}
+            return 200, self.store.view(record, time.time())
+
+    def delete(self, coll: str, id: str, **_) -> Tuple[int, dict]:
+        with self.store.lock:
+            if self.store.records[coll].pop(id, None) is None:
+                return 404, {"detail": f"{coll} {id} not found"}
+            self.store.jobs.pop(id, None)
+        return 204, {}
+
+    def cancel(self, id: str, **_) -> Tuple[int, dict]:
+        now = time.time()
+        with self.store.lock:
+            job = self.store.jobs.get(id)
+            if job is None or id not in self.store.records["inference"]:
+                return 404, {"detail": f"inference {id} not found"}
+            if job.cancelled is None and job.finished > now:
+                job.cancelled = now
+        return 202, {"message": "Cancellation requested"}
+
+    def notifications(self, id: str, query: dict, **_) -> Tuple[int, dict]:
+        limit = int(query.get("limit", ["25"])[0])
+        skip = int(query.get("skip", ["0"])[0])
+        with self.store.lock:
+            job = self.store.jobs.get(id)
+            if job is None:
+                return 404, {"detail": f"No notifications for {id}"}
+            events = [
+                {"id": f"{id}-{n}", "event_id": id, "source": "mock-gateway", "detail_type": f"{job.kind}-status",
+                 "timestamp": _iso(ts), "detail": {"status": status}}
+                for n, (ts, status) in enumerate(job.transitions(time.time()))
+            ]
+        return 200, {"total_records": len(events), "page_count": 1, "results": events[skip:skip + limit]}
+
+    def dry_run(self, body: dict, **_) -> Tuple[int, dict]:
+        return 200, {"message": "Dry run OK", "payload": body}
+
+    def file_share(self, query: dict, base_url: str, **_) -> Tuple[int, dict]:
+        name = (query.get("object_name") or [""])[0]
+        if not re.match(r"^[a-zA-Z0-9-_]+.[a-z]+$", name) or not 6 <= len(name) <= 60:
+            return 422, {"detail": f"Invalid object_name {name!r}"}
+        url = f"{base_url}/_mock/files/{name}"
+        return 200, {"upload_url": url, "download_url": url, "message": "Presigned URLs generated"}
+
+    def snapshot(self) -> dict:
+        now = time.time()
+        with self.store.lock:
+            statuses: Dict[str, int] = {}
+            for job in self.store.jobs.values():
+                status = f"{job.kind}:{job.transitions(now)[-1][1]}"
+                statuses[status] = statuses.get(status, 0) + 1
+            counts = {c: len(r) for c, r in self.store.records.items()}
+        with self._stats_lock:
+            return {"requests": dict(self.stats), "injected_errors": self.injected_errors,
+                    "records": counts, "jobs": statuses}
+
+    def reset(self) -> None:
+        store = self.store
+        with store.lock:
+            for records in store.records.values():
+                records.clear()
+            store.jobs.clear()
+            store.files.clear()
+        with self._stats_lock:
+            self.stats.clear()
+            self.injected_errors = 0
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real ingress
+
+    def log_message(self, fmt, *args):  # quiet; use /_mock/stats
+        pass
+
+    @property
+    def gateway(self) -> MockGateway:
+        return self.server.gateway
+
+    def _send(self, status: int, body=None, content: Optional[bytes] = None, headers: Optional[dict] = None) -> None:
+        if content is None:
+            content = b"" if status == 204 else json.dumps(body).encode()
+        self.send_response(status)
+        if status != 204:
+            self.send_header("Content-Type", (headers or {}).pop("Content-Type", "application/json"))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(content)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _files(self, name: str) -> None:
+        store = self.gateway.store
+        if self.command == "PUT":
+            data = self._read_body()
+            with store.lock:
+                store.files[name] = data
+            return self._send(200, content=b"", headers={"ETag": f'"{hashlib.md5(data).hexdigest()}"'})
+        with store.lock:
+            data = store.files.get(name)
+        if data is None:
+            return self._send(404, {"detail": "NoSuchKey"})
+        headers = {"Content-Type": "application/octet-stream", "ETag": f'"{hashlib.md5(data).hexdigest()}"'}
+        match = re.match(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match and data:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(data) - 1), len(data) - 1)
+            headers["Content-Range"] = f"bytes {start}-{end}/{len(data)}"
+            return self._send(206, content=data[start:end + 1], headers=headers)
+        self._send(200, content=data, headers=headers)
+
+    def _dispatch(self) -> None:
+        parsed = urlparse(self.path)
+        path = parsed.path
+        if path.startswith("/_mock/files/"):
+            return self._files(path[len("/_mock/files/"):])
+        if path == "/_mock/stats":
+            return self._send(200, self.gateway.snapshot())
+        if path == "/_mock/reset" and self.command == "POST":
+            self.gateway.reset()
+            return self._send(200, {"message": "reset"})
+
+        if path.startswith(GATEWAY_PREFIX):
+            path = path[len(GATEWAY_PREFIX):]
+        path = path.lstrip("/")
+        for method, pattern, name in _ROUTES:
+            match = pattern.match(path)
+            if match and method == self.command:
+                break
+        else:
+            self._read_body()
+            return self._send(404, {"detail": "Not Found"})
+
+        raw = self._read_body()
+        gateway = self.gateway
+        params = match.groupdict()
+        route = path.rstrip("/").replace(params["id"], "{id}") if params.get("id") else path.rstrip("/")
+        gateway.count(f"{method} {route}")
+        gateway.delay()
+        if gateway.config.api_key and self.headers.get("X-API-Key") != gateway.config.api_key:
+            return self._send(401, {"detail": "Invalid API key"})
+        if gateway.inject_error():
+            headers = {}
+            if gateway.config.error_status in (429, 503):
+                headers["Retry-After"] = f"{gateway.config.retry_after_s:g}"
+            return self._send(gateway.config.error_status, {"detail": "Injected error"}, headers=headers)
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            return self._send(422, {"detail": "Body is not valid JSON"})
+        base_url = f"http://{self.headers.get('Host') or '%s:%s' % self.server.server_address[:2]}"
+        status, response = getattr(gateway, name)(
+            body=body, query=parse_qs(parsed.query), base_url=base_url, **params
+        )
+        self._send(status, response)
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = do_HEAD = _dispatch
+
+
+def parse_args() -> argparse.Namespace:
+    defaults = MockConfig()
+    parser = argparse.ArgumentParser(description="Offline stand-in for the Studio gateway")
+    parser.add_argument("--host", default=defaults.host, help="Interface to bind (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=defaults.port, help="Port to listen on (default: 8080)")
+    parser.add_argument("--api-key", default=defaults.api_key, help="Required X-API-Key (default: accept any)")
+    parser.add_argument("--queue-s", type=float, default=defaults.queue_s, help="Seconds a job stays queued")
+    parser.add_argument("--run-s", type=float, default=defaults.run_s, help="Seconds a job runs")
+    parser.add_argument("--duration-jitter", type=float, default=defaults.duration_jitter,
+                        help="+/- fraction of random variation in queue and run times (default: 0.25)")
+    parser.add_argument("--job-failure-rate", type=float, default=defaults.job_failure_rate,
+                        help="Fraction of jobs that end failed")
+    parser.add_argument("--latency-ms", type=float, default=defaults.latency_ms, help="Delay added to every API call")
+    parser.add_argument("--latency-jitter-ms", type=float, default=defaults.latency_jitter_ms,
+                        help="Extra random delay of up to this many ms per API call")
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="Fraction of API calls answered with --error-status")
+    parser.add_argument("--error-status", type=int, default=defaults.error_status,
+                        help="Status code of injected errors (default: 503, sent with Retry-After)")
+    parser.add_argument("--retry-after-s", type=float, default=defaults.retry_after_s,
+                        help="Retry-After of injected 429/503 errors (default: 1)")
+    parser.add_argument("--seed", type=int, help="Random seed, for reproducible runs")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    config = MockConfig(**vars(args))
+    gateway = MockGateway(config).start()
+    print(f"🧪 Mock Studio gateway on {gateway.url}{GATEWAY_PREFIX} "
+          f"(jobs {config.queue_s:g}s queued + {config.run_s:g}s running, "
+          f"latency {config.latency_ms:g}+{config.latency_jitter_ms:g}ms, error rate {config.error_rate:g})")
+    print(f"   Point the tools at it with UI_ROUTE_URL={gateway.url}; stats at {gateway.url}/_mock/stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print("\n⏹  Stopping mock gateway")
+        print(json.dumps(gateway.snapshot(), indent=2))
+    finally:
+        gateway.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
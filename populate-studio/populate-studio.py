@@ -2,202 +2,527 @@
 # SPDX-License-Identifier: Apache-2.0
 
 
-import glob
 import argparse
 import os
 import json
+import sys
+import time
+from dataclasses import asdict
 import requests
+import urllib3
 
-payloads_path = "./populate-studio/payloads"
+from studio_dag import Step, run_dag, SUCCEEDED
+from studio_state import JsonStateFile, sha256_file
+from studio_catalog import PayloadCatalog
+from studio_index import NameIndex
+from studio_resilience import RetryPolicy, mount_resilience
+from studio_preflight import check_urls, dry_run, format_table, run_preflight
+from studio_metrics import RequestMetrics, instrument_session
+from studio_upload import is_local_reference, resolve_local_path, upload_payload_files
+
+# Suppress SSL warnings for self-signed certificates (local/kind deployments)
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+# Payload tree to onboard from; point it at a mirrored copy (see
+# deployment-scripts/mirror_example_data.py) with --payloads-dir
+payloads_path = os.getenv("POPULATE_PAYLOADS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "payloads"))
 
 api_header = {
     "Content-Type": "application/json",
     "X-API-Key": os.getenv("STUDIO_API_KEY")
 }
 
-templates = glob.glob(f"{payloads_path}/templates/template-*.json")
-tunes = glob.glob(f"{payloads_path}/tunes/tune-*.json")
-
 studio_api_key = os.getenv("STUDIO_API_KEY")
 ui_route_url = os.getenv("UI_ROUTE_URL")
 
-def onboard_datasets(choose=True):
-    datasets = glob.glob(f"{payloads_path}/datasets/dataset-*.json")
-    if choose:
-        print("\n--- Available Datasets ---")
-        for i, dataset in enumerate(datasets, 1):
-            with open(dataset, 'r') as f:
-                data = json.load(f)
-                dataset_name = data['dataset_name']
-            print(f"  {i}. {dataset_name}")
-        print(f"  {i+1}. All of the above")
-        print("----------------------------------")
-        selection = int(input(f"Select a dataset number to onboard (1-{len(datasets)+1}): "))
-        if 1 <= selection <= len(datasets):
-            selected_dataset = datasets[selection - 1]
-            print(f"\n✅ Onboarding the dataset: '{selected_dataset}'...")
-            # *** PUT YOUR ONBOARDING LOGIC HERE ***
-            resp = requests.post(f'{ui_route_url}/studio-gateway/v2/datasets/onboard', data=open(selected_dataset, 'rb'), headers=api_header, verify=False)
-            print(f"Response: {resp.status_code} - {resp.text}")
-        else:
-            print("🚫 Invalid selection.")
+# Per-deployment working files live in the git-ignored workspace/ at the repository root
+WORKSPACE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workspace"))
+
+# Records the sha256 and gateway ID of every onboarded payload so re-runs skip them
+DEFAULT_STATE_FILE = os.path.join(WORKSPACE_DIR, os.getenv("DEPLOYMENT_ENV", "local"), "populate-studio-state.json")
+
+# Cache of the name/type/dependency metadata extracted from every payload file
+DEFAULT_CATALOG_CACHE = os.path.join(WORKSPACE_DIR, ".populate-studio-catalog.json")
+
+# Default number of payloads submitted in parallel in bulk mode
+DEFAULT_CONCURRENCY = int(os.getenv("POPULATE_CONCURRENCY", "8"))
+
+# A POST answered with these may or may not have created the resource (e.g.
+# during a gateway rollout), so studio_resilience does not replay it.  Named
+# payloads are resubmitted here once the NameIndex shows nothing was created.
+SUBMIT_RETRY_STATUS = (502, 504)
+SUBMIT_RETRIES = int(os.getenv("POPULATE_SUBMIT_RETRIES", "2"))
+SUBMIT_RETRY_DELAY_S = float(os.getenv("POPULATE_SUBMIT_RETRY_DELAY_S", "10"))
+
+# Artefact types in dependency order: tunes need backbones and templates,
+# inferences may need tunes (see payload_dependencies).  "file_fields" may
+# hold a local path instead of a URL; such files are uploaded through the
+# gateway file share and the field rewritten before onboarding.
+ARTEFACT_TYPES = {
+    "backbones": {
+        "label": "backbone",
+        "pattern": "backbones/backbone-*.json",
+        "endpoint": "v2/base-models",
+        "index_resource": "base_models",
+    },
+    "templates": {
+        "label": "template",
+        "pattern": "templates/template-*.json",
+        "endpoint": "v2/tune-templates",
+        "index_resource": "templates",
+    },
+    "datasets": {
+        "label": "dataset",
+        "pattern": "datasets/dataset-*.json",
+        "endpoint": "v2/datasets/onboard",
+        "index_resource": "datasets",
+        "file_fields": ["dataset_url"],
+    },
+    "tunes": {
+        "label": "tune",
+        "pattern": "tunes/tune-*.json",
+        "endpoint": "v2/upload-completed-tunes",
+        "index_resource": "tunes",
+        "file_fields": ["tune_config_url", "tune_checkpoint_url"],
+    },
+    "inferences": {
+        "label": "inference",
+        "pattern": "inferences/inference-*.json",
+        "endpoint": "v2/inference",
+    },
+}
+
+
+def build_session(pool_size=DEFAULT_CONCURRENCY, max_retries=None, rate_limit=None, metrics=None):
+    """
+    Build a single keep-alive session shared by every onboarding request so
+    that connections (and TLS handshakes) are reused across payloads.  Calls
+    are retried with backoff, rate limited and paused by a circuit breaker
+    (see studio_resilience.py), and timed into *metrics* if given
+    (see studio_metrics.py).
+    """
+    session = requests.Session()
+    retry_policy = RetryPolicy() if max_retries is None else RetryPolicy(max_retries=max_retries)
+    mount_resilience(session, pool_maxsize=pool_size, retry_policy=retry_policy, rate_limit=rate_limit)
+    if metrics is not None:
+        instrument_session(session, metrics)
+    session.headers.update(api_header)
+    session.verify = False
+    return session
+
+
+def response_id(resp_json):
+    """Extract the ID of the created resource from a gateway response."""
+    if not isinstance(resp_json, dict):
+        return None
+    for key in ("tune_id", "dataset_id", "id"):
+        if resp_json.get(key):
+            return resp_json[key]
+    return None
+
+
+def payload_dependencies(entry, names):
+    """
+    Work out which other payloads must be onboarded before this one.
+
+    names maps artefact type -> {payload_key: step name} for every payload
+    in this run.  Tunes depend on the backbone/template they name
+    (base_model_name / tune_template_name), or on every backbone and
+    template when they do not name one.  Inferences depend on the tune
+    referenced by fine_tuning_id when that tune is part of the run.
+    """
+    if entry.artefact_type == "tunes":
+        deps = []
+        backbone = entry.base_model_name
+        template = entry.template_name
+        if backbone in names["backbones"]:
+            deps.append(names["backbones"][backbone])
+        if template in names["templates"]:
+            deps.append(names["templates"][template])
+        if not backbone and not template:
+            deps = list(names["backbones"].values()) + list(names["templates"].values())
+        return deps
+    if entry.artefact_type == "inferences":
+        tune = names["tunes"].get(entry.fine_tuning_id)
+        return [tune] if tune else []
+    return []
+
+
+def onboard_payload(session, artefact_type, payload_file, data=None):
+    """
+    POST a single payload to the gateway and return the response.  When
+    *data* is given it is sent instead of the file contents.
+    """
+    endpoint = ARTEFACT_TYPES[artefact_type]["endpoint"]
+    if data is None:
+        with open(payload_file, 'rb') as f:
+            body = f.read()
     else:
-        for dataset in datasets:
-            print(f"\n✅ Onboarding the dataset: '{dataset}'...")
-            # *** PUT YOUR ONBOARDING LOGIC HERE ***
-            resp = requests.post(f'{ui_route_url}/studio-gateway/v2/datasets/onboard', data=open(selected_dataset, 'rb'), headers=api_header, verify=False)
+        body = json.dumps(data)
+    return session.post(f'{ui_route_url}/studio-gateway/{endpoint}', data=body)
+
+
+def fetch_existing(session, artefact_types):
+    """
+    Return a NameIndex over the gateway listings and the set of
+    *artefact_types* it covers: not inferences, which cannot be listed, nor
+    types whose list call fails (those rely on the state file only).
+    """
+    index = NameIndex(session, f'{ui_route_url}/studio-gateway')
+    indexed = set()
+    for artefact_type in artefact_types:
+        resource = ARTEFACT_TYPES[artefact_type].get("index_resource")
+        if not resource:
+            continue
+        try:
+            index.refresh(resource)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"⚠️  Could not list {artefact_type} ({e}); relying on the state file only")
+            continue
+        indexed.add(artefact_type)
+    return index, indexed
+
+
+def choose_payloads(catalog, artefact_type):
+    """
+    Print an interactive menu for an artefact type and return the list of
+    catalog entries the user picked.
+    """
+    label = ARTEFACT_TYPES[artefact_type]["label"]
+    entries = catalog.entries()[artefact_type]
+    if len(entries) == 0:
+        print(f"No {label} artefacts found to onboard.")
+        return []
+
+    print(f"\n--- Available {artefact_type.capitalize()} ---")
+    for i, entry in enumerate(entries, 1):
+        print(f"  {i}. {entry.display_name}")
+    print(f"  {len(entries) + 1}. All of the above")
+    print("----------------------------------")
+    selection = int(input(f"Select a {label} number to onboard (1-{len(entries) + 1}): "))
+    if 1 <= selection <= len(entries):
+        return [entries[selection - 1]]
+    if selection == len(entries) + 1:
+        return entries
+    print("🚫 Invalid selection.")
+    return []
+
+
+def print_catalog(entries_by_type, as_json=False):
+    """Print catalog entries as a table, or as JSON with --json."""
+    if as_json:
+        print(json.dumps(
+            {t: [asdict(e) for e in entries] for t, entries in entries_by_type.items()},
+            indent=2,
+        ))
+        return
+    for artefact_type, entries in entries_by_type.items():
+        print(f"\n--- {artefact_type.capitalize()} ({len(entries)}) ---")
+        for entry in entries:
+            print(f"  {entry.name}  [{os.path.basename(entry.path)}]")
+
+
+def build_onboarding_steps(session, entries_by_type, state=None, index=None, indexed=(), force=False):
+    """
+    Build the dependency graph of onboarding steps for the given catalog
+    entries ({artefact_type: [PayloadEntry, ...]}).  Step names are
+    "<artefact_type>:<file name>".
+
+    When a *state* file is given, payloads whose sha256 matches the recorded
+    one (and whose recorded ID still exists according to the NameIndex
+    *index*, for the *indexed* artefact types) are not re-submitted; payloads
+    whose name already exists server-side are adopted instead of creating a
+    duplicate.  *force* re-submits everything.
+    """
+    names = {artefact_type: {} for artefact_type in ARTEFACT_TYPES}
+    name_index = index or NameIndex(session, f'{ui_route_url}/studio-gateway')
+    for artefact_type, entries in entries_by_type.items():
+        for entry in entries:
+            names[artefact_type][entry.name] = f"{artefact_type}:{os.path.basename(entry.path)}"
+
+    def _already_onboarded(entry, digest):
+        """Return the ID of an up-to-date onboarded copy of this payload, or None."""
+        if state is None or force:
+            return None
+        resource = None
+        if index is not None and entry.artefact_type in indexed:
+            resource = ARTEFACT_TYPES[entry.artefact_type]["index_resource"]
+        record = state.get(os.path.relpath(entry.path, payloads_path))
+        try:
+            if record and record.get("sha256") == digest and record.get("id"):
+                if resource is None or index.has_id(resource, record["id"]):
+                    return record["id"]
+            elif not record and resource is not None and entry.name:
+                return index.lookup(resource, entry.name)
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"⚠️  Could not refresh the {entry.artefact_type} listing ({e}); relying on the state file only")
+            if record and record.get("sha256") == digest and record.get("id"):
+                return record["id"]
+        return None
+
+    def _submit(entry, body):
+        """
+        POST the payload; on a 502/504 look the name up and either adopt what
+        the failed call created or resubmit.  Returns (response, adopted ID).
+        """
+        resource = ARTEFACT_TYPES[entry.artefact_type].get("index_resource")
+        for attempt in range(SUBMIT_RETRIES + 1):
+            resp = onboard_payload(session, entry.artefact_type, entry.path, data=body)
+            if resp.status_code not in SUBMIT_RETRY_STATUS or resource is None or not entry.name:
+                return resp, None
+            if attempt == SUBMIT_RETRIES:
+                break
+            time.sleep(SUBMIT_RETRY_DELAY_S)
+            existing_id = name_index.lookup(resource, entry.name)
+            if existing_id:
+                # with --force a same-named resource may predate this run
+                return resp, None if force else existing_id
+            print(f"\n↻ {resp.status_code} onboarding '{entry.path}' and nothing named '{entry.name}' "
+                  f"exists; resubmitting")
+        return resp, None
+
+    def _make_fn(entry):
+        artefact_type = entry.artefact_type
+        payload_file = entry.path
+        label = ARTEFACT_TYPES[artefact_type]["label"]
+
+        def _fn(dep_values):
+            digest = sha256_file(payload_file)
+            state_key = os.path.relpath(payload_file, payloads_path)
+            existing_id = _already_onboarded(entry, digest)
+            if existing_id:
+                print(f"\n⏭  Skipping the {label} '{payload_file}': already onboarded as {existing_id}")
+                if state is not None:
+                    state.set(state_key, {"sha256": digest, "id": existing_id, "artefact_type": artefact_type})
+                return {"id": existing_id, "status_code": None}
+
+            with open(payload_file, 'r') as f:
+                body = json.load(f)
+            file_fields = ARTEFACT_TYPES[artefact_type].get("file_fields", [])
+            if any(is_local_reference(body.get(field)) for field in file_fields):
+                body = upload_payload_files(
+                    session, f'{ui_route_url}/studio-gateway/', body, file_fields,
+                    base_dir=os.path.dirname(payload_file), state=state,
+                )
+            # Point inferences at the ID the gateway gave the tune they reference
+            if artefact_type == "inferences":
+                for dep_value in dep_values.values():
+                    if dep_value.get("id"):
+                        body["fine_tuning_id"] = dep_value["id"]
+            resp, adopted_id = _submit(entry, body)
+            if adopted_id:
+                print(f"\n⏭  Adopting the {label} '{payload_file}': created as {adopted_id} despite a "
+                      f"{resp.status_code} response")
+                if state is not None:
+                    state.set(state_key, {"sha256": digest, "id": adopted_id, "artefact_type": artefact_type})
+                return {"id": adopted_id, "status_code": None}
+            print(f"\n✅ Onboarded the {label}: '{payload_file}'")
             print(f"Response: {resp.status_code} - {resp.text}")
+            if not resp.ok:
+                raise RuntimeError(f"{resp.status_code} - {resp.text}")
+            try:
+                resp_json = resp.json()
+            except ValueError:
+                resp_json = None
+            resource_id = response_id(resp_json)
+            if state is not None and resource_id:
+                state.set(state_key, {"sha256": digest, "id": resource_id, "artefact_type": artefact_type})
+            return {"id": resource_id, "status_code": resp.status_code}
+
+        return _fn
+
+    return [
+        Step(
+            name=f"{entry.artefact_type}:{os.path.basename(entry.path)}",
+            fn=_make_fn(entry),
+            deps=payload_dependencies(entry, names),
+        )
+        for entries in entries_by_type.values()
+        for entry in entries
+    ]
+
 
-def onboard_backbones(choose=True):
-    backbones = glob.glob(f"{payloads_path}/backbones/backbone-*.json")
-    if choose:
-        print("\n--- Available Backbones ---")
-        for i, backbone in enumerate(backbones, 1):
-            with open(backbone, 'r') as f:
+def check_payload_files(values, base_dir):
+    """
+    Pre-flight check for payload file references: local paths (uploaded at
+    onboarding time) must exist, remote URLs must be reachable.
+    """
+    values = [v for v in values if v]
+    missing = [v for v in values if is_local_reference(v) and not os.path.isfile(resolve_local_path(v, base_dir))]
+    if missing:
+        return False, "local file(s) not found: " + "; ".join(missing)
+    remote = [v for v in values if not is_local_reference(v)]
+    ok, detail = check_urls(remote)
+    local_count = len(values) - len(remote)
+    return ok, f"{detail}, {local_count} local file(s) to upload" if local_count else detail
+
+
+def preflight(session, entries_by_type, concurrency=DEFAULT_CONCURRENCY):
+    """
+    Validate the selected tune, inference and dataset payloads concurrently
+    before anything is submitted: inferences are dry-run against the gateway
+    and the remote files tunes and datasets point at must be reachable.
+    Prints one table of results and returns True when every check passed.
+    """
+    api_url = f'{ui_route_url}/studio-gateway/'
+    tune_names = {entry.name for entry in entries_by_type.get("tunes", [])}
+    checks = {}
+    for artefact_type, entries in entries_by_type.items():
+        for entry in entries:
+            with open(entry.path, 'r') as f:
                 data = json.load(f)
-                backbone_name = data['name']
-            print(f"  {i}. {backbone_name}")
-        print(f"  {i+1}. All of the above")
-        print("----------------------------------")
-        selection = int(input(f"Select a backbone number to onboard (1-{len(backbones)+1}): "))
-        if 1 <= selection <= len(backbones):
-            selected_backbone = backbones[selection - 1]
-            print(f"\n✅ Onboarding the backbone: '{selected_backbone}'...")
-            # *** PUT YOUR ONBOARDING LOGIC HERE ***
-            resp = requests.post(f'{ui_route_url}/studio-gateway/v2/base-models', data=open(selected_backbone, 'rb'), headers=api_header, verify=False)
-            print(f"\n Response: {resp.status_code} - {resp.text}")
-        else:
-            print("🚫 Invalid selection.")
-    else:
-        for backbone in backbones:
-            print(f"\n✅ Onboarding the backbone: '{backbone}'...")
-            # *** PUT YOUR ONBOARDING LOGIC HERE ***
-            resp = requests.post(f'{ui_route_url}/studio-gateway/v2/base-models', data=open(selected_backbone, 'rb'), headers=api_header, verify=False)
-            print(f"\n Response: {resp.status_code} - {resp.text} \n \n")
-
-def onboard_inferences(choose=True):
-    inferences = glob.glob(f"{payloads_path}/inferences/inference-*.json")
-    if len(inferences) != 0:
-        if choose:
-            print("\n--- Available Inferences ---")
-            for i, inference in enumerate(inferences, 1):
-                with open(inference, 'r') as f:
-                    data = json.load(f)
-                    inference_name = f"{data['description']} - {data['location']}"
-                print(f"  {i}. {inference_name}")
-            print(f"  {i+1}. All of the above")
-            print("----------------------------------")
-            selection = int(input(f"Select a inference number to onboard (1-{len(inferences)+1}): "))
-            if 1 <= selection <= len(inferences):
-                selected_inference = inferences[selection - 1]
-                print(f"\n✅ Onboarding the inference: '{selected_inference}'...")
-                # *** PUT YOUR ONBOARDING LOGIC HERE ***
-                resp = requests.post(f'{ui_route_url}/studio-gateway/v2/inference', data=open(selected_inference, 'rb'), headers=api_header, verify=False)
-                print(f"\n Response: {resp.status_code} - {resp.text}")
-            else:
-                print("🚫 Invalid selection.")
-        else:
-            for inference in inferences:
-                print(f"\n✅ Onboarding the inference: '{inference}'...")
-                # *** PUT YOUR ONBOARDING LOGIC HERE ***
-                resp = requests.post(f'{ui_route_url}/studio-gateway/v2/inference', data=open(selected_inference, 'rb'), headers=api_header, verify=False)
-                print(f"\n Response: {resp.status_code} - {resp.text} \n \n")
-    else:
-        print("No inference artefacts found to onboard.")
-
-def onboard_tunes(choose=True):
-    tunes = glob.glob(f"{payloads_path}/tunes/tune-*.json")
-    if len(tunes) != 0:
-        if choose:
-            print("\n--- Available Tunes ---")
-            for i, tune in enumerate(tunes, 1):
-                with open(tune, 'r') as f:
-                    data = json.load(f)
-                    if "name" in data:
-                        tune_name = f"{data['name']} - {data['description']}"
-                    elif "display_name" in data:
-                        tune_name = f"{data['display_name']}"
-                print(f"  {i}. {tune_name}")
-            print(f"  {i+1}. All of the above")
-            print("----------------------------------")
-            selection = int(input(f"Select a tune number to onboard (1-{len(tunes)+1}): "))
-            if 1 <= selection <= len(tunes):
-                selected_tune = tunes[selection - 1]
-                print(f"\n✅ Onboarding the tune: '{selected_tune}'...")
-                # *** PUT YOUR ONBOARDING LOGIC HERE ***
-                resp = requests.post(f'{ui_route_url}/studio-gateway/v2/upload-completed-tunes', data=open(selected_tune, 'rb'), headers=api_header, verify=False)
-                print(f"\n Response: {resp.status_code} - {resp.text}")
-            else:
-                print("🚫 Invalid selection.")
-        else:
-            for tune in tunes:
-                print(f"\n✅ Onboarding the tune: '{tune}'...")
-                # *** PUT YOUR ONBOARDING LOGIC HERE ***
-                resp = requests.post(f'{ui_route_url}/studio-gateway/v2/upload-completed-tunes', data=open(selected_tune, 'rb'), headers=api_header, verify=False)
-                print(f"\n Response: {resp.status_code} - {resp.text} \n \n")
-    else:
-        print("No tune artefacts found to onboard.")
-
-
-def onboard_templates(choose=True):
-    templates = glob.glob(f"{payloads_path}/templates/template-*.json")
-    if len(templates) != 0:
-        if choose:
-            print("\n--- Available Templates ---")
-            for i, template in enumerate(templates, 1):
-                with open(template, 'r') as f:
-                    data = json.load(f)
-                    template_name = f"{data['name']} - {data['description']}"
-                print(f"  {i}. {template_name}")
-            print(f"  {i+1}. All of the above")
-            print("----------------------------------")
-            selection = int(input(f"Select a template number to onboard (1-{len(templates)+1}): "))
-            if 1 <= selection <= len(templates):
-                selected_template = templates[selection - 1]
-                print(f"\n✅ Onboarding the template: '{selected_template}'...")
-                # *** PUT YOUR ONBOARDING LOGIC HERE ***
-                resp = requests.post(f'{ui_route_url}/studio-gateway/v2/tune-templates', data=open(selected_template, 'rb'), headers=api_header, verify=False)
-                print(f"\n Response: {resp.status_code} - {resp.text}")
-            else:
-                print("🚫 Invalid selection.")
-        else:
-            for template in templates:
-                print(f"\n✅ Onboarding the template: '{template}'...")
-                # *** PUT YOUR ONBOARDING LOGIC HERE ***
-                resp = requests.post(f'{ui_route_url}/studio-gateway/v2/tune-templates', data=open(selected_template, 'rb'), headers=api_header, verify=False)
-                print(f"\n Response: {resp.status_code} - {resp.text} \n \n")
-    else:
-        print("No template artefacts found to onboard.")
+            name = f"{artefact_type}:{os.path.basename(entry.path)}"
+            base_dir = os.path.dirname(entry.path)
+            if artefact_type in ("tunes", "datasets"):
+                fields = ARTEFACT_TYPES[artefact_type]["file_fields"]
+                checks[name] = lambda d=data, b=base_dir, f=fields: check_payload_files([d.get(x) for x in f], b)
+            elif artefact_type == "inferences":
+                if entry.fine_tuning_id in tune_names:
+                    # the tune does not exist yet, so the gateway cannot validate against it
+                    checks[name] = lambda d=data: check_urls(d.get("spatial_domain", {}).get("urls", []))
+                else:
+                    checks[name] = lambda d=data: dry_run(session, api_url, "inference", d)
+
+    if not checks:
+        return True
+    print("\n--- Pre-flight checks ---")
+    results = run_preflight(checks, concurrency=concurrency)
+    print(format_table(results))
+    failed = [r for r in results if not r.ok]
+    if failed:
+        print(f"\n🚫 {len(failed)} pre-flight check(s) failed – nothing was submitted.")
+        return False
+    print("\n✅ All pre-flight checks passed.")
+    return True
 
 
+def run_onboarding(session, entries_by_type, concurrency=DEFAULT_CONCURRENCY, state=None, force=False):
+    """
+    Onboard the given catalog entries.  Payloads are scheduled as a dependency
+    graph so that e.g. a tune starts as soon as the backbones and templates it
+    needs are acknowledged, while unrelated datasets keep going.
+    """
+    index, indexed = None, set()
+    if state is not None and not force:
+        index, indexed = fetch_existing(session, entries_by_type)
+    steps = build_onboarding_steps(session, entries_by_type, state=state, index=index, indexed=indexed, force=force)
+    results = run_dag(steps, max_workers=concurrency)
+
+    print("\n--- Onboarding summary ---")
+    for step_name in sorted(results, key=lambda n: list(ARTEFACT_TYPES).index(n.split(":")[0])):
+        result = results[step_name]
+        icon = "✅" if result.status == SUCCEEDED else "🚫"
+        detail = result.value["id"] if result.status == SUCCEEDED else result.error
+        print(f"  {icon} {step_name} [{result.status}] {detail or ''}")
+    return results
+
 
 parser = argparse.ArgumentParser(
                     prog='python populate-studio.py',
                     description='Load datasets, templates, examples, and tunes into Studio via CLI',
                     epilog='For more information, visit https://')
 
-parser.add_argument('artefact_type', help='all, datasets, templates, tunes, inferences')           # positional argument
+parser.add_argument('artefact_type', nargs='?', default=None,
+                    help='all, backbones, datasets, templates, tunes, inferences')           # positional argument
+parser.add_argument('-a', '--all', action='store_true',
+                    help='Onboard every payload of the given artefact type without prompting')
+parser.add_argument('-s', '--select', action='append', default=[], metavar='TYPE[:GLOB]',
+                    help="Onboard payloads matching a selector without prompting, e.g. "
+                         "--select 'backbones:Prithvi*' --select 'datasets:burn*' (repeatable)")
+parser.add_argument('-l', '--list', action='store_true',
+                    help='List the (selected) payloads instead of onboarding them')
+parser.add_argument('--json', action='store_true',
+                    help='With --list, print the catalog as JSON')
+parser.add_argument('--payloads-dir', default=payloads_path,
+                    help=f'Directory of payloads to onboard (default: {payloads_path}, '
+                         'or set POPULATE_PAYLOADS_DIR env var)')
+parser.add_argument('--catalog-cache', default=DEFAULT_CATALOG_CACHE,
+                    help=f'Payload metadata cache file (default: {DEFAULT_CATALOG_CACHE})')
+parser.add_argument('-c', '--concurrency', type=int, default=DEFAULT_CONCURRENCY,
+                    help=f'Maximum number of payloads onboarded in parallel (default: {DEFAULT_CONCURRENCY}, '
+                         'or set POPULATE_CONCURRENCY env var)')
+parser.add_argument('--max-retries', type=int, default=None,
+                    help='Retries per gateway call on 429/5xx or connection errors. POSTs are only '
+                         'retried on connection errors, 429 and 503 with Retry-After; a 502/504 on a '
+                         'named payload is resubmitted once its name is confirmed absent '
+                         '(default: 5, or set STUDIO_MAX_RETRIES env var)')
+parser.add_argument('--rate-limit', type=float, default=None,
+                    help='Maximum requests per second per endpoint, 0 for unlimited '
+                         '(default: 0, or set STUDIO_RATE_LIMIT env var)')
+parser.add_argument('--preflight', action='store_true',
+                    help='Dry-run/validate the selected tunes, inferences and datasets first '
+                         'and do not submit anything if a check fails')
+parser.add_argument('--metrics-out', default=os.getenv("STUDIO_METRICS_OUT"),
+                    help='Write per-endpoint latency metrics to this .json (summary and every call) '
+                         'or .csv (summary) file (or set STUDIO_METRICS_OUT env var)')
+parser.add_argument('--state-file', default=DEFAULT_STATE_FILE,
+                    help=f'JSON file recording already-onboarded payloads (default: {DEFAULT_STATE_FILE})')
+parser.add_argument('--no-state', action='store_true',
+                    help='Do not read or write the state file')
+parser.add_argument('-f', '--force', action='store_true',
+                    help='Re-submit every selected payload even if it is already onboarded')
 parser.add_argument('-v', '--verbose',
                     action='store_true')  # on/off flag
 
 args = parser.parse_args()
+payloads_path = args.payloads_dir
+
+if args.artefact_type not in (None, "all", *ARTEFACT_TYPES):
+    parser.error(f"Invalid artefact type. Please choose from: all, {', '.join(ARTEFACT_TYPES)}.")
+if args.artefact_type is None and not args.select and not args.list:
+    parser.error("Provide an artefact type, --select or --list.")
 
-os.system('clear')
+catalog = PayloadCatalog(
+    payloads_path,
+    {artefact_type: cfg["pattern"] for artefact_type, cfg in ARTEFACT_TYPES.items()},
+    cache_file=args.catalog_cache,
+)
+
+selectors = list(args.select)
+if args.artefact_type == "all" or (args.artefact_type and args.all):
+    selectors.append(args.artefact_type)
+elif args.artefact_type and (args.list or selectors):
+    selectors.append(args.artefact_type)
+
+try:
+    selected = catalog.select(selectors or ["all"])
+except ValueError as e:
+    parser.error(str(e))
+
+if args.list:
+    print_catalog(selected, as_json=args.json)
+    sys.exit(0)
+
+interactive = not selectors
+if interactive:
+    os.system('clear')
 
 print('\n \n 🚀  Geospatial Studio Population Script  🚀')
 print('-------------------------------------------------')
 
-if args.artefact_type == "datasets":
-    onboard_datasets(choose=True)
-elif args.artefact_type == "backbones":
-    onboard_backbones(choose=True)
-elif args.artefact_type == "inferences":
-    onboard_inferences(choose=True)
-elif args.artefact_type == "tunes":
-    onboard_tunes(choose=True)
-elif args.artefact_type == "templates":
-    onboard_templates(choose=True)
-else:
-    print("Invalid artefact type. Please choose from: datasets, backbones, inferences, tunes.")
+if interactive:
+    selected = {args.artefact_type: choose_payloads(catalog, args.artefact_type)}
 
+state = None if args.no_state else JsonStateFile(args.state_file)
 
+if not any(selected.values()):
+    print("No payloads selected.")
+else:
+    metrics = RequestMetrics()
+    try:
+        with build_session(pool_size=args.concurrency, max_retries=args.max_retries,
+                           rate_limit=args.rate_limit, metrics=metrics) as session:
+            if args.preflight and not preflight(session, selected, concurrency=args.concurrency):
+                sys.exit(1)
+            results = run_onboarding(session, selected, concurrency=args.concurrency, state=state, force=args.force)
+            unfinished = [name for name, result in results.items() if result.status != SUCCEEDED]
+            if unfinished:
+                print(f"\n🚫 {len(unfinished)} of {len(results)} onboarding step(s) did not succeed.")
+                sys.exit(1)
+    finally:
+        if metrics.calls:
+            print("\n⏱️  Gateway call latency by endpoint:")
+            print(metrics.format_summary())
+        if args.metrics_out:
+            metrics.write(args.metrics_out)
+            print(f"Metrics written to {args.metrics_out}")
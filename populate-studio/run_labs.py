@@ -10,6 +10,10 @@ Labs executed:
   Lab 3 - Upload Model Checkpoints & Run Inference: Upload flood model, run inference
   Lab 4 - Burn Scars Workflow: Register backbone, onboard dataset, fine-tune, run inference
 
+Labs run as a dependency graph of steps (see build_lab_steps): independent
+labs and steps run in parallel (--max-parallel), so the wall clock is the
+critical path (Lab 4 fine-tuning) rather than the sum of every lab.
+
 Verification of each step is done via the SDK (list/get calls) and results are
 written as structured markdown to the GitHub Actions step summary.
 
@@ -19,7 +23,14 @@ Usage:
         --studio-url <UI_ROUTE_URL> \
         [--notebooks-dir <path>] \
         [--skip-lab4-training] \
-        [--skip-lab4-dataset]
+        [--skip-lab4-dataset] \
+        [--preflight] \
+        [--max-parallel <n>] \
+        [--metrics-out <file.json|file.csv>] \
+        [--cancel-on-timeout] \
+        [--poll-history <file.json>] \
+        [--no-notifications] \
+        [--state-file <file.json>] [--resume]
 
     --notebooks-dir defaults to populate-studio/payloads/ (sibling of this script).
     JSON config files required: backbone-Prithvi_EO_V2_300M.json, dataset-burn_scars.json,
@@ -44,14 +55,24 @@ Run locally (from the geospatial-studio/ directory after deploying with deploy_s
 """
 
 import argparse
-import concurrent.futures
 import json
 import os
-import subprocess
 import sys
+import threading
 import time
 import urllib3
 from pathlib import Path
+from typing import Callable
+
+from studio_dag import FAILED, SKIPPED, SUCCEEDED, Step, run_dag
+from studio_diagnostics import collect_diagnostics
+from studio_index import NameIndex
+from studio_metrics import RequestMetrics, instrument_session
+from studio_notifications import NotificationFeed
+from studio_poller import StatusPoller
+from studio_preflight import check_urls, dry_run, format_table, run_preflight
+from studio_resilience import mount_resilience
+from studio_state import JsonStateFile
 
 # Force line-buffered stdout so every print() appears immediately in
 # GitHub Actions logs (avoids the default block-buffering when stdout
@@ -69,31 +90,46 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 SEPARATOR = "=" * 70
 
+# Per-thread name and summary buffer of the lab step being run (see run_labs)
+_step_context = threading.local()
+
+
+def _prefix() -> str:
+    name = getattr(_step_context, "name", None)
+    return f"[{name}] " if name else ""
+
 
 def banner(title: str) -> None:
     print(f"\n{SEPARATOR}")
-    print(f"  {title}")
+    print(f"  {_prefix()}{title}")
     print(f"{SEPARATOR}\n")
 
 
 def step(msg: str) -> None:
-    print(f"  ▶  {msg}")
+    print(f"  ▶  {_prefix()}{msg}")
 
 
 def ok(msg: str) -> None:
-    print(f"  ✅ {msg}")
+    print(f"  ✅ {_prefix()}{msg}")
 
 
 def warn(msg: str) -> None:
-    print(f"  ⚠️  {msg}")
+    print(f"  ⚠️  {_prefix()}{msg}")
 
 
 def fail(msg: str) -> None:
-    print(f"  ❌ {msg}")
+    print(f"  ❌ {_prefix()}{msg}")
 
 
 def write_github_summary(content: str) -> None:
-    """Append markdown content to the GitHub Actions step summary."""
+    """
+    Append markdown content to the GitHub Actions step summary.  Inside a
+    lab step the content is buffered and written in lab order afterwards.
+    """
+    buffer = getattr(_step_context, "summary", None)
+    if buffer is not None:
+        buffer.append(content)
+        return
     summary_file = os.environ.get("GITHUB_STEP_SUMMARY")
     if summary_file:
         with open(summary_file, "a") as fh:
@@ -219,11 +255,12 @@ def embed_dataset_summary(title: str, client, dataset_id: str) -> None:
 # SDK client factory
 # ---------------------------------------------------------------------------
 
-def build_client(api_key: str, studio_url: str):
+def build_client(api_key: str, studio_url: str, metrics: RequestMetrics = None):
     """
     Build and return a geostudio Client instance.
     Sets the required environment variables before importing the SDK so that
-    the settings singleton picks them up correctly.
+    the settings singleton picks them up correctly.  If *metrics* is given,
+    every SDK call is timed into it.
     """
     os.environ["GEOSTUDIO_API_KEY"] = api_key
     os.environ["BASE_STUDIO_UI_URL"] = studio_url.rstrip("/") + "/"
@@ -232,9 +269,27 @@ def build_client(api_key: str, studio_url: str):
     from geostudio import Client  # noqa: PLC0415
 
     client = Client(api_key=api_key)
+    # Route every SDK call through retry/backoff, rate limiting and a circuit
+    # breaker so a gateway rollout (502) or throttling (429) is ridden out.
+    mount_resilience(client.session)
+    if metrics is not None:
+        instrument_session(client.session, metrics)
     return client
 
 
+def report_metrics(metrics: RequestMetrics, out_path: str = "") -> None:
+    """Print per-endpoint gateway latency, add it to the GitHub summary and optionally save it."""
+    if not metrics.calls:
+        return
+    table = metrics.format_summary()
+    banner("Gateway call latency by endpoint")
+    print(table)
+    write_github_summary(f"\n## ⏱️ Gateway Call Latency\n\n{table}\n")
+    if out_path:
+        metrics.write(out_path)
+        step(f"Metrics written to {out_path}")
+
+
 # ---------------------------------------------------------------------------
 # Polling helpers with timeout + k8s diagnostics
 # ---------------------------------------------------------------------------
@@ -246,86 +301,122 @@ POLL_TIMEOUT_INFERENCE_S = int(os.environ.get("POLL_TIMEOUT_INFERENCE_S", "600")
 POLL_TIMEOUT_FINETUNE_S  = int(os.environ.get("POLL_TIMEOUT_FINETUNE_S",  "5400"))  # 90 min
 POLL_TIMEOUT_DATASET_S   = int(os.environ.get("POLL_TIMEOUT_DATASET_S",   "1800"))  # 30 min
 
+# Per-deployment working files live in the git-ignored workspace/ at the repository root
+WORKSPACE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workspace"))
+
+# Durations of finished jobs per lab step, used to poll tightly around the
+# expected completion time on the next run (see studio_poller.PollPolicy)
+DEFAULT_POLL_HISTORY = os.environ.get(
+    "POLL_HISTORY_FILE",
+    os.path.join(WORKSPACE_DIR, os.environ.get("DEPLOYMENT_ENV", "local"), "run-labs-poll-history.json"),
+)
+
 # Kubernetes namespace where Studio workloads run (matches OC_PROJECT in CI)
 K8S_NAMESPACE = os.environ.get("K8S_NAMESPACE", "default")
 
 
 def dump_k8s_diagnostics(job_hint: str = "") -> None:
     """
-    Run kubectl commands to surface pod/job state when a poll times out.
-    Prints output directly so it appears in CI logs.
-    job_hint: an ID string (inference_id, tune_id, dataset_id) used to
-              narrow the pod search via grep.
+    Surface the state of the pods behind a job when a poll times out: a
+    short report in the CI log and a compressed bundle in
+    K8S_DIAGNOSTICS_DIR (see studio_diagnostics.collect_diagnostics).
+    job_hint: the inference_id, tune_id or dataset_id, used to select the
+              job's pods by name, label, annotation or owner.
     """
-    ns = K8S_NAMESPACE
-    warn(f"⏱  Poll timed out – dumping k8s diagnostics (namespace={ns}, hint={job_hint!r})")
+    warn(f"⏱  Poll timed out – collecting k8s diagnostics (namespace={K8S_NAMESPACE}, hint={job_hint!r})")
+    collect_diagnostics(job_hint=job_hint, namespace=K8S_NAMESPACE)
 
-    def _run(cmd: list) -> str:
-        try:
-            r = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
-            return (r.stdout + r.stderr).strip()
-        except Exception as e:
-            return f"(error running {' '.join(cmd)}: {e})"
-
-    # 1. All pods overview
-    pods_out = _run(["kubectl", "get", "pods", "-n", ns, "-o", "wide"])
-    print(f"\n--- kubectl get pods -n {ns} ---\n{pods_out}\n")
-
-    # 2. Node resource usage (OOM detection)
-    top_out = _run(["kubectl", "top", "nodes"])
-    print(f"--- kubectl top nodes ---\n{top_out}\n")
-
-    top_pods = _run(["kubectl", "top", "pods", "-n", ns])
-    print(f"--- kubectl top pods -n {ns} ---\n{top_pods}\n")
-
-    # 3. Find pods related to the job hint (by name substring)
-    hint_pods: list[str] = []
-    if job_hint:
-        for line in pods_out.splitlines():
-            # Include all pods when job_hint is provided
-            pod_name = line.split()[0] if line.split() else ""
-            if pod_name and pod_name != "NAME":  # Skip header line
-                hint_pods.append(pod_name)
-
-    # Also grab any pods in non-Running/Completed state
-    for line in pods_out.splitlines():
-        cols = line.split()
-        if len(cols) >= 3:
-            pod_name, _ready, pod_status = cols[0], cols[1], cols[2]
-            if pod_status not in ("Running", "Completed", "NAME") and pod_name not in hint_pods:
-                hint_pods.append(pod_name)
-
-    # 4. Describe + logs for each relevant pod
-    for pod in hint_pods[:6]:  # cap at 6 pods to avoid log flood
-        desc = _run(["kubectl", "describe", "pod", pod, "-n", ns])
-        print(f"\n--- kubectl describe pod {pod} -n {ns} ---\n{desc}\n")
-        logs = _run(["kubectl", "logs", pod, "-n", ns, "--tail=100", "--all-containers=true"])
-        print(f"--- kubectl logs {pod} -n {ns} (last 100 lines) ---\n{logs}\n")
-
-    # 5. Recent events (catches OOMKilled, FailedScheduling, etc.)
-    events = _run(["kubectl", "get", "events", "-n", ns, "--sort-by=.lastTimestamp"])
-    print(f"--- kubectl get events -n {ns} ---\n{events}\n")
-
-
-def poll_with_timeout(fn, *, label: str, job_hint: str = "", timeout_s: int) -> dict:
+
+def poll_with_timeout(poller: StatusPoller, kind: str, resource_id: str, *, label: str, timeout_s: int) -> dict:
+    """
+    Wait for the *kind* job ("inference", "tune" or "dataset") *resource_id*
+    to finish, via the shared status poller (*label* doubles as the job type
+    whose past durations set the polling schedule).  If it does not complete within
+    *timeout_s* seconds the wait returns at the deadline: the poller stops
+    watching the job, k8s diagnostics are dumped, the job is cancelled on the
+    gateway if the poller was created with cancel_on_timeout
+    (--cancel-on-timeout), and a TimeoutError is raised so the caller can
+    handle it.
+
+    Returns the job's final record on success.
+    """
+    try:
+        return poller.wait(
+            kind, resource_id, timeout=timeout_s,
+            on_timeout=lambda: dump_k8s_diagnostics(job_hint=str(resource_id)),
+            job_type=label,
+        )
+    except TimeoutError:
+        raise TimeoutError(
+            f"{label} did not finish within {timeout_s}s "
+            f"(job_hint={str(resource_id)!r}). "
+            "See k8s diagnostics above for root cause."
+        )
+
+
+# ---------------------------------------------------------------------------
+# Pre-flight checks
+# ---------------------------------------------------------------------------
+
+def _load_json(path: str) -> dict:
+    with open(path, "r") as fh:
+        return json.load(fh)
+
+
+def run_preflight_checks(client, notebooks_dir: str, skip_dataset: bool = False) -> bool:
     """
-    Run *fn* (a zero-argument callable that wraps an SDK poll call) in a
-    background thread.  If it does not complete within *timeout_s* seconds,
-    dump k8s diagnostics and raise a TimeoutError so the caller can handle it.
+    Validate every lab payload concurrently before anything is submitted:
+    dry-run the Lab 2 inference against the gateway and check that the
+    remote checkpoints, dataset archive and inference inputs the labs
+    depend on are reachable.  The Lab 4 fine-tuning payload is dry-run
+    separately just before submission, once its IDs are known.
 
-    Returns whatever *fn* returns on success.
+    Prints and writes one results table; returns True if every check passed.
     """
-    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-        future = executor.submit(fn)
-        try:
-            return future.result(timeout=timeout_s)
-        except concurrent.futures.TimeoutError:
-            dump_k8s_diagnostics(job_hint=job_hint)
-            raise TimeoutError(
-                f"{label} did not finish within {timeout_s}s "
-                f"(job_hint={job_hint!r}). "
-                "See k8s diagnostics above for root cause."
-            )
+    banner("Pre-flight – Validating lab payloads")
+
+    flood_path = os.path.join(notebooks_dir, "tunes", "tune-prithvi-eo-flood.json")
+    dataset_path = os.path.join(notebooks_dir, "datasets", "dataset-burn_scars.json")
+    config_paths = [
+        os.path.join(notebooks_dir, "templates", "template-seg.json"),
+        os.path.join(notebooks_dir, "backbones", "backbone-Prithvi_EO_V2_300M.json"),
+        flood_path,
+        dataset_path,
+    ]
+
+    def _check_configs():
+        for path in config_paths:
+            _load_json(path)
+        return True, f"{len(config_paths)} config file(s) parsed"
+
+    def _check_flood_urls():
+        flood = _load_json(flood_path)
+        return check_urls([flood.get("tune_config_url"), flood.get("tune_checkpoint_url")])
+
+    checks = {
+        "Lab 3/4 – JSON config files": _check_configs,
+        "Lab 2 – AGB Karen inference (dry-run)": lambda: dry_run(
+            client.session, client.api_url, "inference", LAB2_AGB_KAREN_PAYLOAD
+        ),
+        "Lab 3 – Flood checkpoint URLs": _check_flood_urls,
+        "Lab 4 – Park Fire input URLs": lambda: check_urls(
+            LAB4_PARK_FIRE_INFERENCE_PAYLOAD["spatial_domain"]["urls"]
+        ),
+    }
+    if not skip_dataset:
+        checks["Lab 4 – Burn scars dataset URL"] = lambda: check_urls([_load_json(dataset_path).get("dataset_url")])
+
+    results = run_preflight(checks)
+    table = format_table(results)
+    print(table)
+    write_github_summary(f"\n## 🛫 Pre-flight Checks\n\n{table}\n")
+
+    failed = [r for r in results if not r.ok]
+    if failed:
+        fail(f"{len(failed)} pre-flight check(s) failed – no labs were run")
+        return False
+    ok("All pre-flight checks passed")
+    return True
 
 
 # ---------------------------------------------------------------------------
@@ -410,62 +501,66 @@ def run_lab1(client, studio_url: str) -> dict:
 # Lab 2 – Onboarding Pre-computed Examples
 # ---------------------------------------------------------------------------
 
-def run_lab2(client, studio_url: str) -> dict:
+# Pre-computed example submitted in Lab 2 (also dry-run by --preflight)
+LAB2_AGB_KAREN_PAYLOAD = {
+    "fine_tuning_id": "sandbox",
+    "model_display_name": "add-layer-sandbox-model",
+    "description": "Above Ground Biomass (AGB) Estimation",
+    "location": "Karen, Nairobi, Kenya",
+    "spatial_domain": {
+        "urls": [
+            "https://geospatial-studio-example-data.s3.us-east.cloud-object-storage.appdomain.cloud"
+            "/test-add-layer/d5c33eb4-635d-4070-b72c-d57351ab2586_hls-agb_rgb.zip",
+            "https://geospatial-studio-example-data.s3.us-east.cloud-object-storage.appdomain.cloud"
+            "/test-add-layer/d5c33eb4-635d-4070-b72c-d57351ab2586_hls-agb_pred_postprocessed.zip",
+        ]
+    },
+    "temporal_domain": [],
+    "geoserver_push": [
+        {
+            "workspace": "geofm",
+            "layer_name": "karen_agb_rgb",
+            "display_name": "2024 Karen AGB RGB",
+            "filepath_key": "original_input_image",
+            "file_suffix": "",
+            "z_index": 0,
+            "visible_by_default": "True",
+            "geoserver_style": {
+                "rgb": [
+                    {"minValue": 0, "maxValue": 255, "channel": 1, "label": "RedChannel"},
+                    {"minValue": 0, "maxValue": 255, "channel": 2, "label": "GreenChannel"},
+                    {"minValue": 0, "maxValue": 255, "channel": 3, "label": "BlueChannel"},
+                ]
+            },
+        },
+        {
+            "workspace": "geofm",
+            "layer_name": "karen_agb_pred",
+            "display_name": "2024 Karen AGB Prediction",
+            "filepath_key": "original_input_image",
+            "file_suffix": "",
+            "z_index": 1,
+            "visible_by_default": "True",
+            "geoserver_style": {
+                "regression": [
+                    {"color": "#d0ffc9", "quantity": "0", "opacity": 1, "label": "0 MgC/ha"},
+                    {"color": "#2dba18", "quantity": "300", "opacity": 1, "label": "300 MgC/ha"},
+                ]
+            },
+        },
+    ],
+    "demo": {"demo": True, "section_name": "My Examples"},
+}
+
+
+def run_lab2(client, studio_url: str, poller: StatusPoller) -> dict:
     """
     Lab 2: Onboard the AGB Karen pre-computed inference example.
     Returns dict with inference_id and final status.
     """
     banner("LAB 2 – Onboarding Pre-computed Examples (AGB Karen)")
 
-    agb_karen_payload = {
-        "fine_tuning_id": "sandbox",
-        "model_display_name": "add-layer-sandbox-model",
-        "description": "Above Ground Biomass (AGB) Estimation",
-        "location": "Karen, Nairobi, Kenya",
-        "spatial_domain": {
-            "urls": [
-                "https://geospatial-studio-example-data.s3.us-east.cloud-object-storage.appdomain.cloud"
-                "/test-add-layer/d5c33eb4-635d-4070-b72c-d57351ab2586_hls-agb_rgb.zip",
-                "https://geospatial-studio-example-data.s3.us-east.cloud-object-storage.appdomain.cloud"
-                "/test-add-layer/d5c33eb4-635d-4070-b72c-d57351ab2586_hls-agb_pred_postprocessed.zip",
-            ]
-        },
-        "temporal_domain": [],
-        "geoserver_push": [
-            {
-                "workspace": "geofm",
-                "layer_name": "karen_agb_rgb",
-                "display_name": "2024 Karen AGB RGB",
-                "filepath_key": "original_input_image",
-                "file_suffix": "",
-                "z_index": 0,
-                "visible_by_default": "True",
-                "geoserver_style": {
-                    "rgb": [
-                        {"minValue": 0, "maxValue": 255, "channel": 1, "label": "RedChannel"},
-                        {"minValue": 0, "maxValue": 255, "channel": 2, "label": "GreenChannel"},
-                        {"minValue": 0, "maxValue": 255, "channel": 3, "label": "BlueChannel"},
-                    ]
-                },
-            },
-            {
-                "workspace": "geofm",
-                "layer_name": "karen_agb_pred",
-                "display_name": "2024 Karen AGB Prediction",
-                "filepath_key": "original_input_image",
-                "file_suffix": "",
-                "z_index": 1,
-                "visible_by_default": "True",
-                "geoserver_style": {
-                    "regression": [
-                        {"color": "#d0ffc9", "quantity": "0", "opacity": 1, "label": "0 MgC/ha"},
-                        {"color": "#2dba18", "quantity": "300", "opacity": 1, "label": "300 MgC/ha"},
-                    ]
-                },
-            },
-        ],
-        "demo": {"demo": True, "section_name": "My Examples"},
-    }
+    agb_karen_payload = LAB2_AGB_KAREN_PAYLOAD
 
     step("Submitting AGB Karen inference example...")
     try:
@@ -484,9 +579,8 @@ def run_lab2(client, studio_url: str) -> dict:
     step("Polling inference status (this takes 2-5 minutes)...")
     try:
         final = poll_with_timeout(
-            lambda: client.poll_inference_until_finished(inference_id=inference_id, poll_frequency=15),
+            poller, "inference", inference_id,
             label="Lab 2 inference",
-            job_hint=str(inference_id),
             timeout_s=POLL_TIMEOUT_INFERENCE_S,
         )
         status = final.get("status", "UNKNOWN")
@@ -517,20 +611,18 @@ def run_lab2(client, studio_url: str) -> dict:
 
 
 # ---------------------------------------------------------------------------
-# Lab 3 – Upload Model Checkpoints and Run Inference
+# Shared – segmentation task template (used by Labs 3 and 4)
 # ---------------------------------------------------------------------------
 
-def run_lab3(client, studio_url: str, notebooks_dir: str) -> dict:
-    """
-    Lab 3: Create segmentation task template, upload flood model checkpoint,
-    run inference on Assam flood event.
-    Returns dict with tune_id, template_id, inference_id.
-    """
-    banner("LAB 3 – Upload Model Checkpoints and Run Inference")
+class LabStepError(RuntimeError):
+    """A lab step failed in an expected way (already reported via fail())."""
 
-    results = {}
 
-    # --- Step 1: Create segmentation task template ---
+def ensure_segmentation_template(client, index: NameIndex, notebooks_dir: str) -> dict:
+    """
+    Create the segmentation task template, or reuse the existing one with
+    the same name (looked up in *index*).  Returns {"template_id": ...}.
+    """
     step("Loading segmentation task template...")
     template_path = os.path.join(notebooks_dir, "templates", "template-seg.json")
     try:
@@ -539,35 +631,38 @@ def run_lab3(client, studio_url: str, notebooks_dir: str) -> dict:
         ok(f"Loaded template from {template_path}")
     except FileNotFoundError:
         fail(f"template-seg.json not found at {template_path}")
-        return {"tune_id": None, "template_id": None, "inference_id": None}
+        raise LabStepError("segmentation template config missing")
 
     step("Creating segmentation task template in Studio...")
-    tune_template_id = None
     try:
         template_response = client.create_task(segmentation_template)
         tune_template_id = template_response["id"]
-        results["template_id"] = tune_template_id
         ok(f"Task template created – ID: {tune_template_id}")
+        index.add("templates", segmentation_template.get("name"), tune_template_id)
+        return {"template_id": tune_template_id}
     except Exception as exc:
         warn(f"create_task failed (may already exist): {exc}")
-        try:
-            templates = client.list_tune_templates()
-            existing = [
-                t for t in templates.get("results", [])
-                if t.get("name") == segmentation_template.get("name")
-            ]
-            if existing:
-                tune_template_id = existing[0]["id"]
-                results["template_id"] = tune_template_id
-                ok(f"Using existing template – ID: {tune_template_id}")
-            else:
-                fail("Could not create or find segmentation template")
-                return {"tune_id": None, "template_id": None, "inference_id": None}
-        except Exception as exc2:
-            fail(f"Could not list templates: {exc2}")
-            return {"tune_id": None, "template_id": None, "inference_id": None}
+    try:
+        tune_template_id = index.lookup("templates", segmentation_template.get("name"))
+    except Exception as exc2:
+        fail(f"Could not list templates: {exc2}")
+        raise LabStepError("could not list templates")
+    if not tune_template_id:
+        fail("Could not create or find segmentation template")
+        raise LabStepError("no segmentation template")
+    ok(f"Using existing template – ID: {tune_template_id}")
+    return {"template_id": tune_template_id}
 
-    # --- Step 2: Upload flood model checkpoint ---
+
+# ---------------------------------------------------------------------------
+# Lab 3 – Upload Model Checkpoints and Run Inference
+# ---------------------------------------------------------------------------
+
+def lab3_upload_tune(client, poller: StatusPoller, notebooks_dir: str) -> dict:
+    """
+    Lab 3, step 1: upload the flood model checkpoint and wait for it to be
+    ready.  Returns {"tune_id": ..., "flood_checkpoint": <config>}.
+    """
     step("Loading flood model checkpoint configuration...")
     checkpoint_path = os.path.join(notebooks_dir, "tunes", "tune-prithvi-eo-flood.json")
     try:
@@ -576,37 +671,43 @@ def run_lab3(client, studio_url: str, notebooks_dir: str) -> dict:
         ok(f"Loaded checkpoint config from {checkpoint_path}")
     except FileNotFoundError:
         fail(f"tune-prithvi-eo-flood.json not found at {checkpoint_path}")
-        return {"tune_id": None, "template_id": tune_template_id, "inference_id": None}
+        raise LabStepError("flood checkpoint config missing")
 
     step("Uploading flood detection model checkpoint (1-2 minutes)...")
-    tune_id = None
     try:
         tune_response = client.upload_completed_tunes(flood_checkpoint)
         tune_id = tune_response["tune_id"]
-        results["tune_id"] = tune_id
         ok(f"Model checkpoint uploaded – Tune ID: {tune_id}")
     except Exception as exc:
         fail(f"upload_completed_tunes failed: {exc}")
-        return {"tune_id": None, "template_id": tune_template_id, "inference_id": None}
+        raise LabStepError("flood checkpoint upload failed")
 
     # --- Poll until model is ready ---
     step("Waiting for model to be ready...")
     try:
-        poll_with_timeout(
-            lambda: client.poll_finetuning_until_finished(tune_id=tune_id, poll_frequency=15),
+        final_tune = poll_with_timeout(
+            poller, "tune", tune_id,
             label="Lab 3 model ready",
-            job_hint=str(tune_id),
             timeout_s=POLL_TIMEOUT_INFERENCE_S,
         )
-        ok("Model is ready for inference!")
+        if final_tune.get("status") == "Finished":
+            ok("Model is ready for inference!")
+        else:
+            warn(f"Model upload finished with status: {final_tune.get('status')}")
     except Exception as exc:
         warn(f"Polling error: {exc}")
 
     # --- SDK verification: embed tune state in summary ---
     step("Verifying model upload via SDK...")
     embed_tune_summary("Lab 3 – Flood Model Upload", client, tune_id)
+    return {"tune_id": tune_id, "flood_checkpoint": flood_checkpoint}
+
 
-    # --- Step 3: Run inference ---
+def lab3_inference(client, poller: StatusPoller, tune_id: str, flood_checkpoint: dict) -> dict:
+    """
+    Lab 3, step 2: run the Assam flood inference with the uploaded model.
+    Returns {"inference_id": ..., "inference_status": ...}.
+    """
     step("Submitting flood detection inference (Assam, India)...")
     # Note: fine_tuning_id is NOT included in the body – it is already
     # encoded in the URL path (/v2/tunes/{tune_id}/try-out).
@@ -632,79 +733,138 @@ def run_lab3(client, studio_url: str, notebooks_dir: str) -> dict:
         "post_processing": flood_checkpoint.get("post_processing"),
     }
 
-    inference_id = None
     try:
         inference_response = client.try_out_tune(tune_id=tune_id, data=inference_payload)
         inference_id = inference_response.get("inference_id", inference_response.get("id"))
-        results["inference_id"] = inference_id
         ok(f"Inference submitted – ID: {inference_id}")
     except Exception as exc:
         warn(f"try_out_tune failed: {exc}")
-        results["inference_id"] = None
+        raise LabStepError("flood inference submission failed")
 
-    # --- Poll inference if we have an ID ---
-    if inference_id:
-        step("Polling flood inference status...")
-        try:
-            final = poll_with_timeout(
-                lambda: client.poll_inference_until_finished(
-                    inference_id=inference_id, poll_frequency=15
-                ),
-                label="Lab 3 flood inference",
-                job_hint=str(inference_id),
-                timeout_s=POLL_TIMEOUT_INFERENCE_S,
-            )
-            inf_status = final.get("status", "UNKNOWN")
-            ok(f"Flood inference finished: {inf_status}")
-            results["inference_status"] = inf_status
-        except Exception as exc:
-            warn(f"Inference polling error: {exc}")
-            results["inference_status"] = "UNKNOWN"
+    results = {"inference_id": inference_id}
+    step("Polling flood inference status...")
+    try:
+        final = poll_with_timeout(
+            poller, "inference", inference_id,
+            label="Lab 3 flood inference",
+            timeout_s=POLL_TIMEOUT_INFERENCE_S,
+        )
+        inf_status = final.get("status", "UNKNOWN")
+        ok(f"Flood inference finished: {inf_status}")
+        results["inference_status"] = inf_status
+    except Exception as exc:
+        warn(f"Inference polling error: {exc}")
+        results["inference_status"] = "UNKNOWN"
+
+    # SDK verification: embed inference state in summary
+    step("Verifying flood inference via SDK...")
+    embed_inference_summary("Lab 3 – Flood Detection Inference", client, inference_id)
+    return results
 
-        # SDK verification: embed inference state in summary
-        step("Verifying flood inference via SDK...")
-        embed_inference_summary("Lab 3 – Flood Detection Inference", client, inference_id)
 
-    write_github_summary(
+def lab3_summary(template: dict, upload: dict, inference: dict) -> str:
+    """Markdown section for Lab 3 from its step values (None for steps that did not succeed)."""
+    complete = template and upload and inference
+    return (
         f"\n## 🧪 Lab 3 – Upload Model Checkpoints & Run Inference\n\n"
-        f"- **Template ID**: `{results.get('template_id', 'N/A')}`\n"
-        f"- **Tune ID (Flood Model)**: `{results.get('tune_id', 'N/A')}`\n"
-        f"- **Inference ID**: `{results.get('inference_id', 'N/A')}`\n"
-        f"- **Inference Status**: `{results.get('inference_status', 'N/A')}`\n\n"
-        f"✅ Lab 3 completed\n"
+        f"- **Template ID**: `{(template or {}).get('template_id', 'N/A')}`\n"
+        f"- **Tune ID (Flood Model)**: `{(upload or {}).get('tune_id', 'N/A')}`\n"
+        f"- **Inference ID**: `{(inference or {}).get('inference_id', 'N/A')}`\n"
+        f"- **Inference Status**: `{(inference or {}).get('inference_status', 'N/A')}`\n\n"
+        f"{'✅ Lab 3 completed' if complete else '⚠️ Lab 3 completed with partial results'}\n"
     )
 
-    ok("Lab 3 complete!")
-    return results
-
 
 # ---------------------------------------------------------------------------
 # Lab 4 – Burn Scars End-to-End Workflow
 # ---------------------------------------------------------------------------
 
-def run_lab4(
-    client,
-    studio_url: str,
-    notebooks_dir: str,
-    skip_training: bool = False,
-    skip_dataset: bool = False,
-) -> dict:
-    """
-    Lab 4: Full end-to-end burn scars workflow.
-      1. Register Prithvi-EO-V2-300M backbone
-      2. Onboard burn scars training dataset (skipped if skip_dataset=True)
-      3. Create segmentation task template
-      4. Submit fine-tuning job (skipped if skip_training=True)
-      5. Poll training until finished
-      6. Run inference on Park Fire 2024
-
-    Returns dict with all IDs and statuses.
-    """
-    banner("LAB 4 – Burn Scars End-to-End Workflow")
+# Inference run with the Lab 4 fine-tuned model (input URLs checked by --preflight)
+LAB4_PARK_FIRE_INFERENCE_PAYLOAD = {
+    "model_display_name": "burn-scars-demo",
+    "location": "Red Bluff, California, United States",
+    "description": "Park Fire Aug 2024",
+    "spatial_domain": {
+        "bbox": [],
+        "urls": [
+            "https://geospatial-studio-example-data.s3.us-east.cloud-object-storage.appdomain.cloud"
+            "/examples-for-inference/park_fire_scaled.tif"
+        ],
+        "tiles": [],
+        "polygons": [],
+    },
+    "temporal_domain": ["2024-08-12"],
+    "pipeline_steps": [
+        {"status": "READY", "process_id": "url-connector", "step_number": 0},
+        {"status": "WAITING", "process_id": "terratorch-inference", "step_number": 1},
+        {"status": "WAITING", "process_id": "postprocess-generic", "step_number": 2},
+        {"status": "WAITING", "process_id": "push-to-geoserver", "step_number": 3},
+    ],
+    "post_processing": {
+        "cloud_masking": "False",
+        "ocean_masking": "False",
+        "snow_ice_masking": None,
+        "permanent_water_masking": "False",
+    },
+    "model_input_data_spec": [
+        {
+            "bands": [
+                {"index": "0", "RGB_band": "B", "band_name": "Blue", "scaling_factor": "0.0001"},
+                {"index": "1", "RGB_band": "G", "band_name": "Green", "scaling_factor": "0.0001"},
+                {"index": "2", "RGB_band": "R", "band_name": "Red", "scaling_factor": "0.0001"},
+                {"index": "3", "band_name": "NIR_Narrow", "scaling_factor": "0.0001"},
+                {"index": "4", "band_name": "SWIR1", "scaling_factor": "0.0001"},
+                {"index": "5", "band_name": "SWIR2", "scaling_factor": "0.0001"},
+            ],
+            "connector": "sentinelhub",
+            "collection": "hls_l30",
+            "file_suffix": "_merged.tif",
+            "modality_tag": "HLS_L30",
+        }
+    ],
+    "geoserver_push": [
+        {
+            "z_index": 0,
+            "workspace": "geofm",
+            "layer_name": "input_rgb",
+            "file_suffix": "",
+            "display_name": "Input image (RGB)",
+            "filepath_key": "model_input_original_image_rgb",
+            "geoserver_style": {
+                "rgb": [
+                    {"label": "RedChannel", "channel": 1, "maxValue": 255, "minValue": 0},
+                    {"label": "GreenChannel", "channel": 2, "maxValue": 255, "minValue": 0},
+                    {"label": "BlueChannel", "channel": 3, "maxValue": 255, "minValue": 0},
+                ]
+            },
+            "visible_by_default": "True",
+        },
+        {
+            "z_index": 1,
+            "workspace": "geofm",
+            "layer_name": "pred",
+            "file_suffix": "",
+            "display_name": "Model prediction",
+            "filepath_key": "model_output_image",
+            "geoserver_style": {
+                "segmentation": [
+                    {"color": "#000000", "label": "ignore", "opacity": 0, "quantity": "-1"},
+                    {"color": "#000000", "label": "no-data", "opacity": 0, "quantity": "0"},
+                    {"color": "#ab4f4f", "label": "fire-scar", "opacity": 1, "quantity": "1"},
+                ]
+            },
+            "visible_by_default": "True",
+        },
+    ],
+}
 
-    results = {}
 
-    # ---- Step 1: Register backbone model ----
+def lab4_register_backbone(client, index: NameIndex, notebooks_dir: str) -> dict:
+    """
+    Lab 4, step 1: register the Prithvi-EO-V2-300M backbone, or reuse the
+    existing one with the same name (looked up in *index*).
+    Returns {"base_model_id": ...}.
+    """
     step("Loading Prithvi-EO-V2-300M backbone configuration...")
     backbone_path = os.path.join(notebooks_dir, "backbones", "backbone-Prithvi_EO_V2_300M.json")
     try:
@@ -713,157 +873,99 @@ def run_lab4(
         ok(f"Loaded backbone config from {backbone_path}")
     except FileNotFoundError:
         fail(f"backbone-Prithvi_EO_V2_300M.json not found at {backbone_path}")
-        return results
+        raise LabStepError("backbone config missing")
 
     step("Registering Prithvi-EO-V2-300M foundation model...")
-    base_model_id = None
     try:
         backbone_response = client.create_base_model(backbone)
         base_model_id = backbone_response["id"]
-        results["base_model_id"] = base_model_id
         ok(f"Foundation model registered – ID: {base_model_id}")
+        index.add("base_models", backbone.get("name"), base_model_id)
+        return {"base_model_id": base_model_id}
     except Exception as exc:
         warn(f"create_base_model failed (may already exist): {exc}")
-        try:
-            base_models = client.list_base_models()
-            existing = [
-                m for m in base_models.get("results", [])
-                if m.get("name") == backbone.get("name")
-            ]
-            if existing:
-                base_model_id = existing[0]["id"]
-                results["base_model_id"] = base_model_id
-                ok(f"Using existing backbone – ID: {base_model_id}")
-            else:
-                fail("Could not create or find backbone model")
-                return results
-        except Exception as exc2:
-            fail(f"Could not list base models: {exc2}")
-            return results
-
-    # ---- Step 2: Onboard burn scars dataset ----
-    dataset_id = None
-    if skip_dataset:
-        warn("Skipping dataset onboarding (--skip-lab4-dataset flag set)")
-        warn("Note: fine-tuning step will be skipped too without a dataset_id")
-    else:
-        step("Loading burn scars dataset configuration...")
-        dataset_path = os.path.join(notebooks_dir, "datasets", "dataset-burn_scars.json")
-        try:
-            with open(dataset_path, "r") as fh:
-                wild_fire_dataset = json.load(fh)
-            ok(f"Loaded dataset config from {dataset_path}")
-        except FileNotFoundError:
-            fail(f"dataset-burn_scars.json not found at {dataset_path}")
-            return results
-
-        step("Onboarding burn scars training dataset (may take several minutes)...")
-        try:
-            onboard_response = client.onboard_dataset(data=wild_fire_dataset)
-            dataset_id = onboard_response["dataset_id"]
-            results["dataset_id"] = dataset_id
-            ok(f"Dataset onboarding initiated – ID: {dataset_id}")
-        except Exception as exc:
-            warn(f"onboard_dataset failed (may already exist): {exc}")
-            try:
-                datasets = client.list_datasets()
-                existing = [
-                    d for d in datasets.get("results", [])
-                    if d.get("dataset_name") == wild_fire_dataset.get("dataset_name")
-                ]
-                if existing:
-                    dataset_id = existing[0]["id"]
-                    results["dataset_id"] = dataset_id
-                    ok(f"Using existing dataset – ID: {dataset_id}")
-                else:
-                    fail("Could not create or find burn scars dataset")
-                    return results
-            except Exception as exc2:
-                fail(f"Could not list datasets: {exc2}")
-                return results
-
-        # Poll dataset onboarding
-        if dataset_id:
-            step("Polling dataset onboarding status...")
-            try:
-                final_ds = poll_with_timeout(
-                    lambda: client.poll_onboard_dataset_until_finished(
-                        dataset_id=dataset_id, poll_frequency=15
-                    ),
-                    label="Lab 4 dataset onboarding",
-                    job_hint=str(dataset_id),
-                    timeout_s=POLL_TIMEOUT_DATASET_S,
-                )
-                ds_status = final_ds.get("status", "UNKNOWN")
-                results["dataset_status"] = ds_status
-                ok(f"Dataset onboarding finished: {ds_status}")
-            except Exception as exc:
-                warn(f"Dataset polling error: {exc}")
-                results["dataset_status"] = "UNKNOWN"
-
-            # SDK verification: embed dataset state in summary
-            step("Verifying dataset via SDK...")
-            embed_dataset_summary("Lab 4 – Burn Scars Dataset", client, dataset_id)
-
-    # ---- Step 3: Create segmentation task template ----
-    step("Loading segmentation task template...")
-    template_path = os.path.join(notebooks_dir, "templates", "template-seg.json")
-    tune_template_id = None
     try:
-        with open(template_path, "r") as fh:
-            segmentation_template = json.load(fh)
-        ok(f"Loaded template from {template_path}")
+        base_model_id = index.lookup("base_models", backbone.get("name"))
+    except Exception as exc2:
+        fail(f"Could not list base models: {exc2}")
+        raise LabStepError("could not list base models")
+    if not base_model_id:
+        fail("Could not create or find backbone model")
+        raise LabStepError("no backbone model")
+    ok(f"Using existing backbone – ID: {base_model_id}")
+    return {"base_model_id": base_model_id}
+
+
+def lab4_onboard_dataset(client, poller: StatusPoller, index: NameIndex, notebooks_dir: str) -> dict:
+    """
+    Lab 4, step 2: onboard the burn scars training dataset (or reuse the
+    existing one with the same name, looked up in *index*) and wait for it.
+    Returns {"dataset_id": ..., "dataset_status": ...}.
+    """
+    step("Loading burn scars dataset configuration...")
+    dataset_path = os.path.join(notebooks_dir, "datasets", "dataset-burn_scars.json")
+    try:
+        with open(dataset_path, "r") as fh:
+            wild_fire_dataset = json.load(fh)
+        ok(f"Loaded dataset config from {dataset_path}")
     except FileNotFoundError:
-        fail(f"template-seg.json not found at {template_path}")
-        return results
+        fail(f"dataset-burn_scars.json not found at {dataset_path}")
+        raise LabStepError("dataset config missing")
 
-    step("Creating segmentation task template...")
+    step("Onboarding burn scars training dataset (may take several minutes)...")
+    dataset_id = None
     try:
-        template_response = client.create_task(segmentation_template)
-        tune_template_id = template_response["id"]
-        results["template_id"] = tune_template_id
-        ok(f"Task template created – ID: {tune_template_id}")
+        onboard_response = client.onboard_dataset(data=wild_fire_dataset)
+        dataset_id = onboard_response["dataset_id"]
+        ok(f"Dataset onboarding initiated – ID: {dataset_id}")
+        index.add("datasets", wild_fire_dataset.get("dataset_name"), dataset_id)
     except Exception as exc:
-        warn(f"create_task failed (may already exist): {exc}")
+        warn(f"onboard_dataset failed (may already exist): {exc}")
         try:
-            templates = client.list_tune_templates()
-            existing = [
-                t for t in templates.get("results", [])
-                if t.get("name") == segmentation_template.get("name")
-            ]
-            if existing:
-                tune_template_id = existing[0]["id"]
-                results["template_id"] = tune_template_id
-                ok(f"Using existing template – ID: {tune_template_id}")
-        except Exception:
-            pass
+            dataset_id = index.lookup("datasets", wild_fire_dataset.get("dataset_name"))
+        except Exception as exc2:
+            fail(f"Could not list datasets: {exc2}")
+            raise LabStepError("could not list datasets")
+        if not dataset_id:
+            fail("Could not create or find burn scars dataset")
+            raise LabStepError("no burn scars dataset")
+        ok(f"Using existing dataset – ID: {dataset_id}")
+
+    results = {"dataset_id": dataset_id}
+    step("Polling dataset onboarding status...")
+    try:
+        final_ds = poll_with_timeout(
+            poller, "dataset", dataset_id,
+            label="Lab 4 dataset onboarding",
+            timeout_s=POLL_TIMEOUT_DATASET_S,
+        )
+        ds_status = final_ds.get("status", "UNKNOWN")
+        results["dataset_status"] = ds_status
+        ok(f"Dataset onboarding finished: {ds_status}")
+    except Exception as exc:
+        warn(f"Dataset polling error: {exc}")
+        results["dataset_status"] = "UNKNOWN"
 
-    if not tune_template_id:
-        fail("No task template available – cannot submit fine-tuning job")
-        return results
+    # SDK verification: embed dataset state in summary
+    step("Verifying dataset via SDK...")
+    embed_dataset_summary("Lab 4 – Burn Scars Dataset", client, dataset_id)
+    return results
 
-    # ---- Step 4: Submit fine-tuning job ----
-    tune_id = None
-    # Skip training if explicitly requested OR if dataset was skipped (no dataset_id to train on)
-    _skip_reason = (
-        "--skip-lab4-training flag set" if skip_training
-        else "--skip-lab4-dataset flag set (no dataset_id)" if not dataset_id
-        else None
-    )
-    if _skip_reason:
-        warn(f"Skipping fine-tuning ({_skip_reason})")
-        warn("Note: inference step will be skipped too without a tune_id")
-        write_github_summary(
-            "\n## 🧪 Lab 4 – Burn Scars Workflow\n\n"
-            f"- **Base Model ID**: `{base_model_id}`\n"
-            f"- **Dataset ID**: `{dataset_id or 'N/A (skipped)'}`\n"
-            f"- **Dataset Status**: `{results.get('dataset_status', 'N/A')}`\n"
-            f"- **Template ID**: `{tune_template_id}`\n"
-            f"- **Fine-tuning**: Skipped ({_skip_reason})\n\n"
-            f"⚠️ Lab 4 partially completed (training skipped)\n"
-        )
-        return results
 
+def lab4_finetune(
+    client,
+    poller: StatusPoller,
+    base_model_id: str,
+    dataset_id: str,
+    tune_template_id: str,
+    preflight: bool = False,
+) -> dict:
+    """
+    Lab 4, steps 4-5: submit the burn scars fine-tuning job and poll it
+    until finished.  With preflight=True the payload is dry-run first and
+    the job is not submitted if the gateway rejects it.
+    Returns {"tune_id": ..., "tune_status": ...}.
+    """
     step("Submitting burn scars fine-tuning job...")
     tune_payload = {
         "name": "burn-scars-demo",
@@ -873,35 +975,36 @@ def run_lab4(
         "tune_template_id": tune_template_id,
     }
 
+    if preflight:
+        step("Dry-running fine-tuning submission...")
+        try:
+            dry_ok, dry_detail = dry_run(client.session, client.api_url, "tune", tune_payload)
+        except Exception as exc:
+            dry_ok, dry_detail = False, f"{type(exc).__name__}: {exc}"
+        if not dry_ok:
+            fail(f"submit-tune dry-run failed: {dry_detail}")
+            raise LabStepError(f"Dry-run rejected: {dry_detail}")
+        ok(f"Fine-tuning dry-run accepted ({dry_detail})")
+
     try:
         tune_submitted = client.submit_tune(tune_payload, output="json")
         tune_id = tune_submitted["tune_id"]
-        results["tune_id"] = tune_id
         ok(f"Fine-tuning job submitted – Tune ID: {tune_id}")
         step("Training will take 30-90 minutes depending on GPU availability")
     except Exception as exc:
         fail(f"submit_tune failed: {exc}")
-        write_github_summary(
-            "\n## 🧪 Lab 4 – Burn Scars Workflow\n\n"
-            f"- **Base Model ID**: `{base_model_id}`\n"
-            f"- **Dataset ID**: `{dataset_id}`\n"
-            f"- **Template ID**: `{tune_template_id}`\n"
-            f"- **Fine-tuning**: ❌ Failed to submit\n\n"
-            f"❌ Lab 4 failed at fine-tuning submission\n"
-        )
-        return results
+        raise LabStepError("Failed to submit")
 
-    # ---- Step 5: Poll training ----
+    results = {"tune_id": tune_id}
     step("Polling fine-tuning progress (30-90 minutes)...")
     try:
-        poll_with_timeout(
-            lambda: client.poll_finetuning_until_finished(tune_id=tune_id, poll_frequency=30),
+        final_tune = poll_with_timeout(
+            poller, "tune", tune_id,
             label="Lab 4 fine-tuning",
-            job_hint=str(tune_id),
             timeout_s=POLL_TIMEOUT_FINETUNE_S,
         )
-        ok("Fine-tuning completed!")
-        results["tune_status"] = "Finished"
+        results["tune_status"] = final_tune.get("status", "UNKNOWN")
+        ok(f"Fine-tuning finished: {results['tune_status']}")
     except Exception as exc:
         warn(f"Fine-tuning polling error: {exc}")
         try:
@@ -913,133 +1016,346 @@ def run_lab4(
     # SDK verification: embed tune state in summary
     step("Verifying fine-tuning via SDK...")
     embed_tune_summary("Lab 4 – Burn Scars Fine-Tuning", client, tune_id)
+    return results
 
-    # ---- Step 6: Run inference on Park Fire 2024 ----
+
+def lab4_inference(client, poller: StatusPoller, tune_id: str) -> dict:
+    """
+    Lab 4, step 6: run the Park Fire 2024 inference with the fine-tuned model.
+    Returns {"inference_id": ..., "inference_status": ...}.
+    """
     step("Submitting burn scar inference (Park Fire, California, Aug 2024)...")
-    inference_payload = {
-        "model_display_name": "burn-scars-demo",
-        "location": "Red Bluff, California, United States",
-        "description": "Park Fire Aug 2024",
-        "spatial_domain": {
-            "bbox": [],
-            "urls": [
-                "https://geospatial-studio-example-data.s3.us-east.cloud-object-storage.appdomain.cloud"
-                "/examples-for-inference/park_fire_scaled.tif"
-            ],
-            "tiles": [],
-            "polygons": [],
-        },
-        "temporal_domain": ["2024-08-12"],
-        "pipeline_steps": [
-            {"status": "READY", "process_id": "url-connector", "step_number": 0},
-            {"status": "WAITING", "process_id": "terratorch-inference", "step_number": 1},
-            {"status": "WAITING", "process_id": "postprocess-generic", "step_number": 2},
-            {"status": "WAITING", "process_id": "push-to-geoserver", "step_number": 3},
-        ],
-        "post_processing": {
-            "cloud_masking": "False",
-            "ocean_masking": "False",
-            "snow_ice_masking": None,
-            "permanent_water_masking": "False",
-        },
-        "model_input_data_spec": [
-            {
-                "bands": [
-                    {"index": "0", "RGB_band": "B", "band_name": "Blue", "scaling_factor": "0.0001"},
-                    {"index": "1", "RGB_band": "G", "band_name": "Green", "scaling_factor": "0.0001"},
-                    {"index": "2", "RGB_band": "R", "band_name": "Red", "scaling_factor": "0.0001"},
-                    {"index": "3", "band_name": "NIR_Narrow", "scaling_factor": "0.0001"},
-                    {"index": "4", "band_name": "SWIR1", "scaling_factor": "0.0001"},
-                    {"index": "5", "band_name": "SWIR2", "scaling_factor": "0.0001"},
-                ],
-                "connector": "sentinelhub",
-                "collection": "hls_l30",
-                "file_suffix": "_merged.tif",
-                "modality_tag": "HLS_L30",
-            }
-        ],
-        "geoserver_push": [
-            {
-                "z_index": 0,
-                "workspace": "geofm",
-                "layer_name": "input_rgb",
-                "file_suffix": "",
-                "display_name": "Input image (RGB)",
-                "filepath_key": "model_input_original_image_rgb",
-                "geoserver_style": {
-                    "rgb": [
-                        {"label": "RedChannel", "channel": 1, "maxValue": 255, "minValue": 0},
-                        {"label": "GreenChannel", "channel": 2, "maxValue": 255, "minValue": 0},
-                        {"label": "BlueChannel", "channel": 3, "maxValue": 255, "minValue": 0},
-                    ]
-                },
-                "visible_by_default": "True",
-            },
-            {
-                "z_index": 1,
-                "workspace": "geofm",
-                "layer_name": "pred",
-                "file_suffix": "",
-                "display_name": "Model prediction",
-                "filepath_key": "model_output_image",
-                "geoserver_style": {
-                    "segmentation": [
-                        {"color": "#000000", "label": "ignore", "opacity": 0, "quantity": "-1"},
-                        {"color": "#000000", "label": "no-data", "opacity": 0, "quantity": "0"},
-                        {"color": "#ab4f4f", "label": "fire-scar", "opacity": 1, "quantity": "1"},
-                    ]
-                },
-                "visible_by_default": "True",
-            },
-        ],
-    }
+    inference_payload = LAB4_PARK_FIRE_INFERENCE_PAYLOAD
 
-    inference_id = None
     try:
         inference_response = client.try_out_tune(tune_id=tune_id, data=inference_payload)
         inference_id = inference_response.get("inference_id", inference_response.get("id"))
-        results["inference_id"] = inference_id
         ok(f"Inference submitted – ID: {inference_id}")
     except Exception as exc:
         warn(f"try_out_tune failed: {exc}")
+        raise LabStepError("burn scar inference submission failed")
 
-    # Poll inference
-    if inference_id:
-        step("Polling burn scar inference status...")
-        try:
-            final_inf = poll_with_timeout(
-                lambda: client.poll_inference_until_finished(
-                    inference_id=inference_id, poll_frequency=15
-                ),
-                label="Lab 4 burn scar inference",
-                job_hint=str(inference_id),
-                timeout_s=POLL_TIMEOUT_INFERENCE_S,
-            )
-            inf_status = final_inf.get("status", "UNKNOWN")
-            results["inference_status"] = inf_status
-            ok(f"Burn scar inference finished: {inf_status}")
-        except Exception as exc:
-            warn(f"Inference polling error: {exc}")
-            results["inference_status"] = "UNKNOWN"
+    results = {"inference_id": inference_id}
+    step("Polling burn scar inference status...")
+    try:
+        final_inf = poll_with_timeout(
+            poller, "inference", inference_id,
+            label="Lab 4 burn scar inference",
+            timeout_s=POLL_TIMEOUT_INFERENCE_S,
+        )
+        inf_status = final_inf.get("status", "UNKNOWN")
+        results["inference_status"] = inf_status
+        ok(f"Burn scar inference finished: {inf_status}")
+    except Exception as exc:
+        warn(f"Inference polling error: {exc}")
+        results["inference_status"] = "UNKNOWN"
 
-        # SDK verification: embed inference state in summary
-        step("Verifying burn scar inference via SDK...")
-        embed_inference_summary("Lab 4 – Burn Scar Detection (Park Fire 2024)", client, inference_id)
+    # SDK verification: embed inference state in summary
+    step("Verifying burn scar inference via SDK...")
+    embed_inference_summary("Lab 4 – Burn Scar Detection (Park Fire 2024)", client, inference_id)
+    return results
 
-    write_github_summary(
+
+def lab4_summary(
+    backbone: dict,
+    dataset: dict,
+    template: dict,
+    finetune: dict,
+    inference: dict,
+    skip_reason: str = "",
+    finetune_error: str = "",
+) -> str:
+    """Markdown section for Lab 4 from its step values (None for steps that did not succeed)."""
+    backbone, dataset, template = backbone or {}, dataset or {}, template or {}
+    finetune, inference = finetune or {}, inference or {}
+    if skip_reason:
+        tune_cell, footer = f"Skipped ({skip_reason})", "⚠️ Lab 4 partially completed (training skipped)"
+    elif finetune_error:
+        tune_cell, footer = f"❌ {finetune_error}", "❌ Lab 4 failed at fine-tuning"
+    else:
+        tune_cell = f"`{finetune.get('tune_status', 'N/A')}`"
+        footer = "✅ Lab 4 completed" if inference else "⚠️ Lab 4 completed with partial results"
+    return (
         f"\n## 🧪 Lab 4 – Burn Scars End-to-End Workflow\n\n"
         f"| Step | ID | Status |\n"
         f"|------|----|--------|\n"
-        f"| Foundation Model | `{base_model_id}` | ✅ Registered |\n"
-        f"| Training Dataset | `{dataset_id}` | `{results.get('dataset_status', 'N/A')}` |\n"
-        f"| Task Template | `{tune_template_id}` | ✅ Created |\n"
-        f"| Fine-tuning Job | `{tune_id}` | `{results.get('tune_status', 'N/A')}` |\n"
-        f"| Inference | `{inference_id}` | `{results.get('inference_status', 'N/A')}` |\n\n"
-        f"✅ Lab 4 completed\n"
+        f"| Foundation Model | `{backbone.get('base_model_id')}` | "
+        f"{'✅ Registered' if backbone else '❌ Failed'} |\n"
+        f"| Training Dataset | `{dataset.get('dataset_id', 'N/A (skipped)' if skip_reason else None)}` | "
+        f"`{dataset.get('dataset_status', 'N/A')}` |\n"
+        f"| Task Template | `{template.get('template_id')}` | {'✅ Created' if template else '❌ Failed'} |\n"
+        f"| Fine-tuning Job | `{finetune.get('tune_id')}` | {tune_cell} |\n"
+        f"| Inference | `{inference.get('inference_id')}` | `{inference.get('inference_status', 'N/A')}` |\n\n"
+        f"{footer}\n"
     )
 
-    ok("Lab 4 complete!")
-    return results
+
+# ---------------------------------------------------------------------------
+# Lab step graph
+# ---------------------------------------------------------------------------
+
+# Maximum number of lab steps running at the same time
+DEFAULT_MAX_PARALLEL = int(os.environ.get("LABS_MAX_PARALLEL", "4"))
+
+# Value of every completed step (IDs and statuses), so --resume can skip it
+DEFAULT_STATE_FILE = os.environ.get(
+    "LABS_STATE_FILE",
+    os.path.join(WORKSPACE_DIR, os.environ.get("DEPLOYMENT_ENV", "local"), "run-labs-state.json"),
+)
+
+
+def _finished(field: str, done: Callable[[str], bool]) -> Callable[[dict], bool]:
+    return lambda record: bool(record.get("id")) and done(str(record.get(field) or ""))
+
+
+# Steps that can be resumed: (ID field of the step value, fetch the resource,
+# is the fetched resource still there and complete?)
+RESUMABLE_STEPS = {
+    "lab2": ("inference_id", lambda c, i: c.get_inference(inference_id=i), _finished("status", lambda s: "COMPLETED" in s)),
+    "segmentation-template": ("template_id", lambda c, i: c.get_task(i), _finished("id", bool)),
+    "lab3-upload-tune": ("tune_id", lambda c, i: c.get_tune(i), _finished("status", lambda s: s == "Finished")),
+    "lab3-inference": ("inference_id", lambda c, i: c.get_inference(inference_id=i), _finished("status", lambda s: "COMPLETED" in s)),
+    "lab4-backbone": ("base_model_id", lambda c, i: c.get_base_model(i), _finished("id", bool)),
+    "lab4-dataset": ("dataset_id", lambda c, i: c.get_dataset(i), _finished("status", lambda s: s == "Succeeded")),
+    "lab4-finetune": ("tune_id", lambda c, i: c.get_tune(i), _finished("status", lambda s: s == "Finished")),
+    "lab4-inference": ("inference_id", lambda c, i: c.get_inference(inference_id=i), _finished("status", lambda s: "COMPLETED" in s)),
+}
+
+
+def build_lab_steps(
+    client,
+    poller: StatusPoller,
+    index: NameIndex,
+    studio_url: str,
+    notebooks_dir: str,
+    skip_training: bool = False,
+    skip_dataset: bool = False,
+    preflight: bool = False,
+) -> list:
+    """
+    Build the dependency graph of lab steps.  Labs 1-3 and the independent
+    Lab 4 steps (backbone, dataset, template) run in parallel; the shared
+    segmentation template is created once for Labs 3 and 4, and fine-tuning
+    starts as soon as its backbone, dataset and template are ready.  Every
+    step waits for its jobs through the one shared *poller*, and "create or
+    reuse" steps find existing resources through the shared name *index*.
+    """
+    steps = [
+        Step("lab1", lambda deps: run_lab1(client=client, studio_url=studio_url)),
+        Step("lab2", lambda deps: run_lab2(client=client, studio_url=studio_url, poller=poller)),
+        Step("segmentation-template", lambda deps: ensure_segmentation_template(client, index, notebooks_dir)),
+        Step(
+            "lab3-upload-tune",
+            lambda deps: lab3_upload_tune(client, poller, notebooks_dir),
+            deps=["segmentation-template"],
+        ),
+        Step(
+            "lab3-inference",
+            lambda deps: lab3_inference(
+                client,
+                poller,
+                deps["lab3-upload-tune"]["tune_id"],
+                deps["lab3-upload-tune"]["flood_checkpoint"],
+            ),
+            deps=["lab3-upload-tune"],
+        ),
+        Step("lab4-backbone", lambda deps: lab4_register_backbone(client, index, notebooks_dir)),
+    ]
+    if not skip_dataset:
+        steps.append(Step("lab4-dataset", lambda deps: lab4_onboard_dataset(client, poller, index, notebooks_dir)))
+    if not (skip_training or skip_dataset):
+        steps += [
+            Step(
+                "lab4-finetune",
+                lambda deps: lab4_finetune(
+                    client,
+                    poller,
+                    base_model_id=deps["lab4-backbone"]["base_model_id"],
+                    dataset_id=deps["lab4-dataset"]["dataset_id"],
+                    tune_template_id=deps["segmentation-template"]["template_id"],
+                    preflight=preflight,
+                ),
+                deps=["lab4-backbone", "lab4-dataset", "segmentation-template"],
+            ),
+            Step(
+                "lab4-inference",
+                lambda deps: lab4_inference(client, poller, deps["lab4-finetune"]["tune_id"]),
+                deps=["lab4-finetune"],
+            ),
+        ]
+    return steps
+
+
+def _capture_step(s: Step, summaries: dict) -> Step:
+    """Wrap a step so its log lines are prefixed and its summary output buffered."""
+    def _fn(deps):
+        _step_context.name = s.name
+        _step_context.summary = summaries.setdefault(s.name, [])
+        try:
+            return s.fn(deps)
+        finally:
+            _step_context.name = None
+            _step_context.summary = None
+
+    return Step(s.name, _fn, s.deps)
+
+
+def verify_step_value(client, name: str, value: dict) -> str:
+    """Return "" if the resource a recorded step produced still exists and is complete, else why not."""
+    id_field, fetch, complete = RESUMABLE_STEPS[name]
+    resource_id = (value or {}).get(id_field)
+    if not resource_id:
+        return f"no {id_field} recorded"
+    try:
+        record = fetch(client, resource_id)
+    except Exception as exc:
+        return f"could not fetch {id_field} {resource_id}: {exc}"
+    if not isinstance(record, dict) or not complete(record):
+        status = record.get("status", record.get("detail", "missing")) if isinstance(record, dict) else "missing"
+        return f"{id_field} {resource_id} is {status}"
+    return ""
+
+
+def _resumable_step(s: Step, client, state: JsonStateFile, resume: bool, resumed: set) -> Step:
+    """
+    Wrap a step so its value is recorded in *state* when it succeeds and,
+    with *resume*, reused instead of re-running it when every step it
+    depends on was reused too and its resource still checks out.
+    """
+    if s.name not in RESUMABLE_STEPS:
+        return s
+
+    def _fn(deps):
+        record = state.get(f"step:{s.name}") if resume else None
+        if record is not None:
+            rerun = [d for d in s.deps if d not in resumed]
+            why = f"{', '.join(rerun)} ran again" if rerun else verify_step_value(client, s.name, record["value"])
+            if not why:
+                resumed.add(s.name)
+                id_field = RESUMABLE_STEPS[s.name][0]
+                ok(f"Resumed from previous run – {id_field}: {record['value'][id_field]}")
+                write_github_summary(
+                    f"\n- ⏭ `{s.name}` resumed from the run at {record['recorded_at']} "
+                    f"({id_field} `{record['value'][id_field]}`)\n"
+                )
+                return record["value"]
+            warn(f"Not resuming: {why}")
+        value = s.fn(deps)
+        state.set(f"step:{s.name}", {
+            "value": value,
+            "recorded_at": time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime()),
+        })
+        return value
+
+    return Step(s.name, _fn, s.deps)
+
+
+def run_labs(
+    client,
+    studio_url: str,
+    notebooks_dir: str,
+    skip_training: bool = False,
+    skip_dataset: bool = False,
+    preflight: bool = False,
+    max_parallel: int = DEFAULT_MAX_PARALLEL,
+    cancel_on_timeout: bool = False,
+    poll_history: str = DEFAULT_POLL_HISTORY,
+    notifications: bool = True,
+    state_file: str = DEFAULT_STATE_FILE,
+    resume: bool = False,
+) -> bool:
+    """
+    Run every lab as a step graph with at most *max_parallel* steps in
+    flight, then write the per-step timings and each lab's summary in lab
+    order.  Returns True unless a lab hit an unexpected error (or Lab 2
+    failed), matching the sequential runner's notion of success.
+
+    All running jobs are polled by a single StatusPoller (one list call per
+    job kind per cycle) instead of one polling loop per job, each on an
+    adaptive schedule learned from the job durations in *poll_history*
+    ("" to disable).  With *notifications*, inferences are resolved from
+    their /v2/notifications feed and only polled as a fallback.
+    With *cancel_on_timeout*, inferences that exceed their poll timeout are
+    cancelled on the gateway to free cluster capacity.
+
+    The value (IDs and statuses) of every step is recorded in *state_file*
+    ("" to disable).  With *resume*, steps recorded by a previous run are
+    skipped when their resources still exist and completed, so a rerun
+    continues from the first incomplete step.
+    """
+    summaries: dict = {}
+    state = JsonStateFile(state_file) if state_file else None
+    if state is not None and not resume:
+        for key, _ in state.items():
+            state.delete(key)
+    resumed: set = set()
+    poller = StatusPoller(
+        client.session,
+        client.api_url,
+        history=JsonStateFile(poll_history) if poll_history else None,
+        feed=NotificationFeed(client.session, client.api_url) if notifications else None,
+        cancel_on_timeout=cancel_on_timeout,
+    )
+    with poller:
+        index = NameIndex(client.session, client.api_url)
+        steps = build_lab_steps(
+            client, poller, index, studio_url, notebooks_dir, skip_training, skip_dataset, preflight,
+        )
+        if state is not None:
+            steps = [_resumable_step(s, client, state, resume, resumed) for s in steps]
+        results = run_dag(
+            [_capture_step(s, summaries) for s in steps],
+            max_workers=max_parallel,
+            on_done=lambda r: (ok if r.status == SUCCEEDED else warn)(
+                f"[{r.name}] {r.status} in {r.elapsed_s:.0f}s"
+            ),
+        )
+    step(f"Status poller: {poller.cycles} cycles, {poller.api_calls} API calls")
+
+    def _value(name):
+        r = results.get(name)
+        return r.value if r is not None and r.status == SUCCEEDED else None
+
+    def _flush(*names):
+        for name in names:
+            for content in summaries.get(name, []):
+                write_github_summary(content)
+
+    overall_success = True
+    for r in results.values():
+        if r.status == FAILED and not isinstance(r.error, LabStepError):
+            fail(f"Step {r.name} encountered an unexpected error: {r.error}")
+            overall_success = False
+    if (_value("lab2") or {}).get("status") == "FAILED":
+        overall_success = False
+
+    skip_reason = (
+        "--skip-lab4-training flag set" if skip_training
+        else "--skip-lab4-dataset flag set (no dataset_id)" if skip_dataset
+        else ""
+    )
+    finetune = results.get("lab4-finetune")
+    finetune_error = str(finetune.error) if finetune is not None and finetune.status == FAILED else ""
+
+    _flush("lab1", "lab2")
+    _flush("segmentation-template", "lab3-upload-tune", "lab3-inference")
+    write_github_summary(lab3_summary(
+        _value("segmentation-template"), _value("lab3-upload-tune"), _value("lab3-inference"),
+    ))
+    _flush("lab4-backbone", "lab4-dataset", "lab4-finetune", "lab4-inference")
+    write_github_summary(lab4_summary(
+        _value("lab4-backbone"), _value("lab4-dataset"), _value("segmentation-template"),
+        _value("lab4-finetune"), _value("lab4-inference"),
+        skip_reason=skip_reason, finetune_error=finetune_error,
+    ))
+
+    icons = {SUCCEEDED: "✅", FAILED: "❌", SKIPPED: "⏭"}
+    table = ["| Step | Status | Duration |", "|------|--------|----------|"]
+    for s in steps:
+        r = results[s.name]
+        table.append(f"| {s.name} | {icons[r.status]} {r.status} | {r.elapsed_s:.0f}s |")
+    write_github_summary("\n## ⏱️ Lab Steps\n\n" + "\n".join(table) + "\n")
+    return overall_success
 
 
 # ---------------------------------------------------------------------------
@@ -1082,6 +1398,64 @@ def parse_args() -> argparse.Namespace:
         help="Skip the dataset onboarding step in Lab 4 (also skips fine-tuning; "
              "useful when S3 access or bandwidth is limited)",
     )
+    parser.add_argument(
+        "--preflight",
+        action="store_true",
+        default=False,
+        help="Dry-run/validate every lab payload before running the labs and "
+             "abort if any check fails; also dry-runs the Lab 4 fine-tuning job "
+             "before submitting it",
+    )
+    parser.add_argument(
+        "--max-parallel",
+        type=int,
+        default=DEFAULT_MAX_PARALLEL,
+        help="Maximum number of lab steps run at the same time; 1 runs them one "
+             f"by one (default: {DEFAULT_MAX_PARALLEL}, or set LABS_MAX_PARALLEL env var)",
+    )
+    parser.add_argument(
+        "--metrics-out",
+        default=os.environ.get("STUDIO_METRICS_OUT", ""),
+        help="Write per-endpoint gateway latency metrics to this .json (summary "
+             "and every call) or .csv (summary) file (or set STUDIO_METRICS_OUT env var)",
+    )
+    parser.add_argument(
+        "--cancel-on-timeout",
+        action="store_true",
+        default=os.environ.get("POLL_CANCEL_ON_TIMEOUT", "").lower() in ("1", "true", "yes"),
+        help="Cancel inferences on the gateway when they exceed their poll timeout so "
+             "stuck jobs do not hold cluster resources (or set POLL_CANCEL_ON_TIMEOUT=true). "
+             "Tunes and dataset onboarding have no cancel endpoint and keep running",
+    )
+    parser.add_argument(
+        "--no-notifications",
+        dest="notifications",
+        action="store_false",
+        default=os.environ.get("STUDIO_NOTIFICATIONS", "true").lower() not in ("0", "false", "no"),
+        help="Detect inference completion by polling only, instead of following the "
+             "/v2/notifications feed (or set STUDIO_NOTIFICATIONS=false)",
+    )
+    parser.add_argument(
+        "--state-file",
+        default=DEFAULT_STATE_FILE,
+        help="JSON file recording the IDs and statuses every step produced; '' disables "
+             f"(default: {DEFAULT_STATE_FILE}, or set LABS_STATE_FILE env var)",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        default=False,
+        help="Reuse the steps recorded in --state-file whose resources still exist and "
+             "completed (e.g. the onboarded dataset and fine-tuned model) and continue "
+             "from the first incomplete step",
+    )
+    parser.add_argument(
+        "--poll-history",
+        default=DEFAULT_POLL_HISTORY,
+        help="JSON file of past job durations used to poll tightly around each job's "
+             f"expected completion; '' disables (default: {DEFAULT_POLL_HISTORY}, "
+             "or set POLL_HISTORY_FILE env var)",
+    )
     return parser.parse_args()
 
 
@@ -1105,6 +1479,9 @@ def main() -> int:
     step(f"Notebooks   : {notebooks_dir}")
     step(f"Skip Lab4 Training: {args.skip_lab4_training}")
     step(f"Skip Lab4 Dataset:  {args.skip_lab4_dataset}")
+    step(f"Pre-flight checks:  {args.preflight}")
+    step(f"Max parallel steps: {args.max_parallel}")
+    step(f"Resume from state:  {args.resume} ({args.state_file or 'no state file'})")
 
     # Write summary header
     write_github_summary(
@@ -1118,64 +1495,37 @@ def main() -> int:
     step("Initializing geostudio SDK client...")
     try:
 
-        client = build_client(api_key=args.api_key, studio_url=args.studio_url)
+        metrics = RequestMetrics()
+        client = build_client(api_key=args.api_key, studio_url=args.studio_url, metrics=metrics)
         ok("SDK client initialized")
     except Exception as exc:
         fail(f"Failed to initialize SDK client: {exc}")
         return 1
 
+    if args.preflight and not run_preflight_checks(
+        client, notebooks_dir, skip_dataset=args.skip_lab4_dataset
+    ):
+        write_github_summary("\n---\n\n❌ **Pre-flight checks failed – labs were not run.**\n")
+        report_metrics(metrics, args.metrics_out)
+        return 1
+
     # -------------------------------------------------------------------------
     # Run labs
     # -------------------------------------------------------------------------
-    overall_success = True
-
-    # Lab 1 – Getting Started
-    try:
-        run_lab1(
-            client=client,
-            studio_url=args.studio_url,
-        )
-    except Exception as exc:
-        fail(f"Lab 1 encountered an unexpected error: {exc}")
-        overall_success = False
-
-    # Lab 2 – Onboarding Pre-computed Examples
-    try:
-        lab2_result = run_lab2(
-            client=client,
-            studio_url=args.studio_url,
-        )
-        if lab2_result.get("status") == "FAILED":
-            overall_success = False
-    except Exception as exc:
-        fail(f"Lab 2 encountered an unexpected error: {exc}")
-        overall_success = False
-
-    # Lab 3 – Upload Model Checkpoints & Run Inference
-    try:
-        lab3_result = run_lab3(
-            client=client,
-            studio_url=args.studio_url,
-            notebooks_dir=notebooks_dir,
-        )
-        if lab3_result.get("tune_id") is None or lab3_result.get("inference_id") is None:
-            warn("Lab 3 completed with partial results")
-    except Exception as exc:
-        fail(f"Lab 3 encountered an unexpected error: {exc}")
-        overall_success = False
-
-    # Lab 4 – Burn Scars End-to-End Workflow
-    try:
-        run_lab4(
-            client=client,
-            studio_url=args.studio_url,
-            notebooks_dir=notebooks_dir,
-            skip_training=args.skip_lab4_training,
-            skip_dataset=args.skip_lab4_dataset,
-        )
-    except Exception as exc:
-        fail(f"Lab 4 encountered an unexpected error: {exc}")
-        overall_success = False
+    overall_success = run_labs(
+        client=client,
+        studio_url=args.studio_url,
+        notebooks_dir=notebooks_dir,
+        skip_training=args.skip_lab4_training,
+        skip_dataset=args.skip_lab4_dataset,
+        preflight=args.preflight,
+        max_parallel=args.max_parallel,
+        cancel_on_timeout=args.cancel_on_timeout,
+        poll_history=args.poll_history,
+        notifications=args.notifications,
+        state_file=args.state_file,
+        resume=args.resume,
+    )
 
     # -------------------------------------------------------------------------
     # Final summary
@@ -1188,6 +1538,7 @@ def main() -> int:
         warn("One or more labs encountered errors – check output above.")
         write_github_summary("\n---\n\n⚠️ **Some labs encountered errors. Review the log above.**\n")
 
+    report_metrics(metrics, args.metrics_out)
     return 0 if overall_success else 1
 
 
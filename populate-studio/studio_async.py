@@ -0,0 +1,264 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_async.py - asyncio client for the Studio gateway, driven by
+docs/openapi.json.
+
+Every operation in the OpenAPI spec is exposed as a coroutine method named
+after its operationId without the FastAPI path/method suffix, e.g.
+
+    async with AsyncStudioClient(api_url, api_key) as client:
+        page = await client.list_inferences(limit=50, tune_id=tune_id)
+        inference = await client.retrieve_inference(inference_id=inference_id)
+        created = await client.create_inference(json=payload)
+        await client.cancel_inference(inference_id=inference_id)
+        async for tune in client.paginate("list_tunes", status="COMPLETED"):
+            ...
+
+Keyword arguments are split into path and query parameters according to
+the spec (unknown ones raise TypeError); request bodies are passed as
+json= (or data= for multipart endpoints).
+
+All calls share one aiohttp connection pool with HTTP keep-alive, so a
+single process can keep hundreds of requests in flight.  Calls are retried
+on 429/502/503/504 and connection errors with the same backoff policy as
+studio_resilience.py (non-idempotent calls only when the request cannot
+have reached the gateway, or on 429).  Pass a studio_metrics.RequestMetrics
+as metrics= to record every call in the same per-endpoint latency table as
+instrument_session().
+
+Used by batch_inference.py.
+"""
+
+import asyncio
+import json as _json
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+import aiohttp
+
+from studio_metrics import CallRecord, RequestMetrics
+from studio_resilience import IDEMPOTENT_METHODS, RetryPolicy, endpoint_key
+
+DEFAULT_SPEC_PATH = os.environ.get(
+    "STUDIO_OPENAPI_SPEC",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "docs", "openapi.json"),
+)
+
+# Maximum concurrent connections to the gateway
+DEFAULT_MAX_IN_FLIGHT = int(os.environ.get("STUDIO_ASYNC_MAX_IN_FLIGHT", "100"))
+
+
+class StudioAPIError(Exception):
+    def __init__(self, status: int, method: str, path: str, detail: Any):
+        super().__init__(f"{method} {path} -> {status}: {detail}")
+        self.status = status
+        self.method = method
+        self.path = path
+        self.detail = detail
+
+
+@dataclass
+class Operation:
+    name: str
+    method: str
+    path: str
+    path_params: List[str] = field(default_factory=list)
+    query_params: List[str] = field(default_factory=list)
+    summary: str = ""
+
+
+def _operation_name(operation_id: str, method: str, path: str) -> str:
+    """Strip FastAPI's "<path>_<method>" suffix from an operationId."""
+    suffix = re.sub(r"\W", "_", path) + "_" + method.lower()
+    return operation_id[: -len(suffix)] if operation_id.endswith(suffix) else operation_id
+
+
+def load_operations(spec_path: str = DEFAULT_SPEC_PATH) -> Dict[str, Operation]:
+    """Return {operation name: Operation} for every path/method in the OpenAPI spec."""
+    with open(spec_path, "r") as fh:
+        spec = _json.load(fh)
+    operations = {}
+    for path, methods in spec.get("paths", {}).items():
+        for method, op in methods.items():
+            params = op.get("parameters", [])
+            name = _operation_name(op.get("operationId", f"{method}{path}"), method, path)
+            operations[name] = Operation(
+                name=name,
+                method=method.upper(),
+                path=path,
+                path_params=[p["name"] for p in params if p.get("in") == "path"],
+                query_params=[p["name"] for p in params if p.get("in") == "query"],
+                summary=op.get("summary", ""),
+            )
+    return operations
+
+
+def _query_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+class AsyncStudioClient:
+    """
+    asyncio gateway client.  *api_url* is the gateway base URL, e.g.
+    https://localhost:4180/studio-gateway/.  Use as an async context manager
+    (or call close()) so the connection pool is released.
+    """
+
+    def __init__(
+        self,
+        api_url: str,
+        api_key: Optional[str] = None,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        verify_ssl: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        timeout_s: float = 300,
+        spec_path: str = DEFAULT_SPEC_PATH,
+        metrics: Optional[RequestMetrics] = None,
+    ):
+        self.api_url = api_url.rstrip("/")
+        self.api_key = api_key if api_key is not None else os.environ.get("STUDIO_API_KEY")
+        self.max_in_flight = max_in_flight
+        self.verify_ssl = verify_ssl
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.timeout_s = timeout_s
+        self.metrics = metrics
+        self.operations = load_operations(spec_path)
+        self._session = None
+
+    async def __aenter__(self) -> "AsyncStudioClient":
+        self._ensure_session()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    def _ensure_session(self):
+        if self._session is None or self._session.closed:
+            connector_kwargs = {} if self.verify_ssl else {"ssl": False}
+            connector = aiohttp.TCPConnector(
+                limit=self.max_in_flight,
+                limit_per_host=self.max_in_flight,
+                keepalive_timeout=60,
+                **connector_kwargs,
+            )
+            headers = {"X-API-Key": self.api_key} if self.api_key else {}
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=self.timeout_s),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def __getattr__(self, name: str):
+        operations = self.__dict__.get("operations", {})
+        if name in operations:
+            async def _call(**kwargs):
+                return await self.call(name, **kwargs)
+
+            _call.__name__ = name
+            _call.__doc__ = operations[name].summary
+            return _call
+        raise AttributeError(f"{type(self).__name__!r} has no attribute or gateway operation {name!r}")
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Optional[Dict[str, Any]] = None,
+        json: Any = None,
+        data: Any = None,
+    ) -> Any:
+        """
+        Send one request to *path* (relative to the gateway base URL) and
+        return the decoded JSON body (or text).  Raises StudioAPIError on
+        HTTP errors once retries are exhausted.
+        """
+        session = self._ensure_session()
+        method = method.upper()
+        url = f"{self.api_url}/{path.lstrip('/')}"
+        query = {k: _query_value(v) for k, v in (params or {}).items() if v is not None}
+        policy = self.retry_policy
+        key = endpoint_key(method, url)
+        sent = len(_json.dumps(json)) if json is not None else len(data) if isinstance(data, (bytes, str)) else 0
+        started_at, start = time.time(), time.perf_counter()
+        ttfb_s = 0.0
+        attempt = 0
+        while True:
+            try:
+                async with session.request(method, url, params=query or None, json=json, data=data) as resp:
+                    ttfb_s = time.perf_counter() - start
+                    if resp.status in policy.retry_status and attempt < policy.max_retries and (
+                        resp.status == 429 or method in IDEMPOTENT_METHODS
+                    ):
+                        delay = policy.retry_after(resp)
+                        delay = policy.backoff(attempt) if delay is None else delay
+                    else:
+                        raw = await resp.read()
+                        self._record(key, str(resp.status), sent, len(raw), ttfb_s, start, started_at)
+                        if resp.content_type == "application/json":
+                            body = _json.loads(raw) if raw else None
+                        else:
+                            body = raw.decode(resp.get_encoding(), errors="replace")
+                        if resp.status >= 400:
+                            detail = body.get("detail", body) if isinstance(body, dict) else body
+                            raise StudioAPIError(resp.status, method, path, detail)
+                        return body
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as exc:
+                # only replay requests that cannot have been applied by the gateway
+                unsent = isinstance(exc, aiohttp.ClientConnectorError)
+                if attempt >= policy.max_retries or not (unsent or method in IDEMPOTENT_METHODS):
+                    self._record(key, type(exc).__name__, sent, 0, ttfb_s, start, started_at)
+                    raise
+                delay = policy.backoff(attempt)
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def _record(self, key: str, status: str, sent: int, received: int, ttfb_s: float, start: float,
+                started_at: float) -> None:
+        if self.metrics is not None:
+            self.metrics.record(
+                CallRecord(key, status, sent, received, ttfb_s, time.perf_counter() - start, started_at)
+            )
+
+    async def call(self, operation: str, json: Any = None, data: Any = None, **kwargs) -> Any:
+        """Call a spec operation by name; kwargs are the path and query parameters."""
+        try:
+            op = self.operations[operation]
+        except KeyError:
+            raise ValueError(f"Unknown gateway operation {operation!r}") from None
+        unknown = set(kwargs) - set(op.path_params) - set(op.query_params)
+        if unknown:
+            raise TypeError(f"{operation}() got unexpected parameter(s): {', '.join(sorted(unknown))}")
+        missing = [p for p in op.path_params if p not in kwargs]
+        if missing:
+            raise TypeError(f"{operation}() missing path parameter(s): {', '.join(missing)}")
+        path = op.path.format(**{p: kwargs[p] for p in op.path_params})
+        params = {p: kwargs[p] for p in op.query_params if p in kwargs}
+        return await self.request(op.method, path, params=params, json=json, data=data)
+
+    async def paginate(self, operation: str, page_size: int = 100, **kwargs) -> AsyncIterator[dict]:
+        """
+        Yield every record of a limit/skip list operation, following
+        pagination.  total_records may be null, so without it paging stops
+        at the first short page.
+        """
+        skip = 0
+        while True:
+            body = await self.call(operation, limit=page_size, skip=skip, **kwargs)
+            page = body.get("results") or []
+            for record in page:
+                yield record
+            skip += len(page)
+            total = body.get("total_records")
+            if len(page) < page_size or (total is not None and skip >= total):
+                return
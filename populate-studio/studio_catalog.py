@@ -0,0 +1,177 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_catalog.py - Cached catalog of the payload files under populate-studio/payloads.
+
+The name, type and dependency metadata of every payload is extracted once
+and cached keyed by file mtime and size, so listing and selecting payloads
+does not re-parse hundreds of JSON files on every run.
+
+Selectors have the form "<artefact_type>:<glob>" (e.g. "backbones:Prithvi*")
+and match the payload name, display name, file name or file name without
+its "<type>-" prefix (e.g. "burn_scars"), case-insensitively.
+A bare "<artefact_type>" or "<artefact_type>:*" selects every payload of
+that type, and "all" selects everything.
+"""
+
+import fnmatch
+import glob
+import json
+import os
+import threading
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+# Bump when the extracted fields change so stale cache entries are ignored
+CACHE_VERSION = 1
+
+
+@dataclass
+class PayloadEntry:
+    path: str
+    artefact_type: str
+    name: Optional[str]
+    display_name: str
+    base_model_name: Optional[str] = None
+    template_name: Optional[str] = None
+    fine_tuning_id: Optional[str] = None
+    mtime_ns: int = 0
+    size: int = 0
+
+
+def payload_display_name(artefact_type: str, data: dict) -> str:
+    """Return the human-readable name printed in menus for a payload."""
+    if artefact_type == "datasets":
+        return data["dataset_name"]
+    if artefact_type == "backbones":
+        return data["name"]
+    if artefact_type == "inferences":
+        return f"{data['description']} - {data['location']}"
+    if "name" in data:
+        return f"{data['name']} - {data['description']}"
+    return f"{data['display_name']}"
+
+
+def payload_key(artefact_type: str, data: dict) -> Optional[str]:
+    """Return the name other payloads (and the gateway) use to refer to this payload."""
+    if artefact_type == "datasets":
+        return data.get("dataset_name")
+    return data.get("name") or data.get("display_name")
+
+
+def _extract(path: str, artefact_type: str, stat: os.stat_result) -> PayloadEntry:
+    with open(path, "r") as fh:
+        data = json.load(fh)
+    return PayloadEntry(
+        path=path,
+        artefact_type=artefact_type,
+        name=payload_key(artefact_type, data),
+        display_name=payload_display_name(artefact_type, data),
+        base_model_name=data.get("base_model_name") or data.get("backbone"),
+        template_name=data.get("tune_template_name") or data.get("template_name"),
+        fine_tuning_id=data.get("fine_tuning_id"),
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+    )
+
+
+class PayloadCatalog:
+    """
+    Catalog of payload files.  *patterns* maps artefact type -> glob pattern
+    relative to *payloads_path*.  If *cache_file* is given, extracted entries
+    are persisted there and reused while a file's mtime and size are unchanged.
+    """
+
+    def __init__(self, payloads_path: str, patterns: Dict[str, str], cache_file: Optional[str] = None):
+        self.payloads_path = payloads_path
+        self.patterns = patterns
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, List[PayloadEntry]]] = None
+
+    def _load_cache(self) -> Dict[str, dict]:
+        if not self.cache_file or not os.path.isfile(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r") as fh:
+                cache = json.load(fh)
+        except (OSError, ValueError):
+            return {}
+        if cache.get("version") != CACHE_VERSION:
+            return {}
+        return cache.get("entries", {})
+
+    def _save_cache(self, entries: Dict[str, List[PayloadEntry]]) -> None:
+        if not self.cache_file:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_file)), exist_ok=True)
+        tmp_path = f"{self.cache_file}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(
+                {
+                    "version": CACHE_VERSION,
+                    "entries": {e.path: asdict(e) for type_entries in entries.values() for e in type_entries},
+                },
+                fh,
+            )
+        os.replace(tmp_path, self.cache_file)
+
+    def entries(self) -> Dict[str, List[PayloadEntry]]:
+        """Return {artefact_type: [PayloadEntry, ...]} sorted by file name."""
+        with self._lock:
+            if self._entries is not None:
+                return self._entries
+            cached = self._load_cache()
+            entries: Dict[str, List[PayloadEntry]] = {}
+            dirty = False
+            for artefact_type, pattern in self.patterns.items():
+                entries[artefact_type] = []
+                for path in sorted(glob.glob(os.path.join(self.payloads_path, pattern))):
+                    stat = os.stat(path)
+                    hit = cached.get(path)
+                    if (
+                        hit
+                        and hit.get("artefact_type") == artefact_type
+                        and hit.get("mtime_ns") == stat.st_mtime_ns
+                        and hit.get("size") == stat.st_size
+                    ):
+                        entries[artefact_type].append(PayloadEntry(**hit))
+                        continue
+                    entries[artefact_type].append(_extract(path, artefact_type, stat))
+                    dirty = True
+            if dirty or len(cached) != sum(len(v) for v in entries.values()):
+                self._save_cache(entries)
+            self._entries = entries
+            return entries
+
+    def select(self, selectors: List[str]) -> Dict[str, List[PayloadEntry]]:
+        """
+        Return the entries matching any of *selectors*, grouped by artefact
+        type, preserving catalog order.  Raises ValueError on an unknown type.
+        """
+        entries = self.entries()
+        chosen: Dict[str, List[PayloadEntry]] = {}
+        for selector in selectors:
+            artefact_type, _, pattern = selector.partition(":")
+            artefact_type = artefact_type.strip()
+            pattern = (pattern.strip() or "*").lower()
+            if artefact_type in ("all", "*"):
+                types = list(entries)
+            elif artefact_type in entries:
+                types = [artefact_type]
+            else:
+                raise ValueError(
+                    f"Unknown artefact type {artefact_type!r} in selector {selector!r}. "
+                    f"Choose from: all, {', '.join(entries)}"
+                )
+            for t in types:
+                for entry in entries[t]:
+                    file_name = os.path.basename(entry.path)
+                    # also match the file stem without its "<type>-" prefix, e.g. "burn_scars"
+                    short_name = os.path.splitext(file_name)[0].split("-", 1)[-1]
+                    candidates = (entry.name or "", entry.display_name, file_name, short_name)
+                    if any(fnmatch.fnmatchcase(c.lower(), pattern) for c in candidates):
+                        chosen.setdefault(t, [])
+                        if entry not in chosen[t]:
+                            chosen[t].append(entry)
+        return {t: sorted(chosen[t], key=lambda e: e.path) for t in entries if t in chosen}
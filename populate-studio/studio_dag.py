@@ -0,0 +1,134 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_dag.py - Small dependency-graph executor shared by the Studio tooling.
+
+Each step declares the names of the steps it depends on.  Steps run on a
+bounded thread pool and a step is started as soon as all of its
+prerequisites have succeeded, rather than waiting for a whole "tier" of
+work to finish.  If a step fails, every step that (transitively) depends on
+it is marked as skipped.
+"""
+
+import concurrent.futures
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+SKIPPED = "skipped"
+
+
+@dataclass
+class Step:
+    """
+    A unit of work in the graph.
+
+    fn is called with a dict mapping each dependency name to the value that
+    dependency returned.  Raising an exception marks the step as failed.
+    """
+
+    name: str
+    fn: Callable[[Dict[str, Any]], Any]
+    deps: List[str] = field(default_factory=list)
+
+
+@dataclass
+class StepResult:
+    name: str
+    status: str
+    value: Any = None
+    error: Optional[BaseException] = None
+    elapsed_s: float = 0.0
+
+
+def _validate(steps: Dict[str, Step]) -> None:
+    """Raise ValueError on unknown dependencies or dependency cycles."""
+    for s in steps.values():
+        for dep in s.deps:
+            if dep not in steps:
+                raise ValueError(f"Step {s.name!r} depends on unknown step {dep!r}")
+
+    visiting, done = set(), set()
+
+    def _visit(name: str, path: List[str]) -> None:
+        if name in done:
+            return
+        if name in visiting:
+            raise ValueError(f"Dependency cycle: {' -> '.join(path + [name])}")
+        visiting.add(name)
+        for dep in steps[name].deps:
+            _visit(dep, path + [name])
+        visiting.discard(name)
+        done.add(name)
+
+    for name in steps:
+        _visit(name, [])
+
+
+def run_dag(
+    steps: List[Step],
+    max_workers: int = 8,
+    on_done: Optional[Callable[[StepResult], None]] = None,
+) -> Dict[str, StepResult]:
+    """
+    Execute *steps* respecting their dependencies with at most *max_workers*
+    steps in flight.  *on_done* is called (from the scheduling thread) with
+    each StepResult as soon as it is known, including skipped steps.
+
+    Returns a dict of step name -> StepResult.
+    """
+    by_name = {s.name: s for s in steps}
+    if len(by_name) != len(steps):
+        raise ValueError("Step names must be unique")
+    _validate(by_name)
+
+    dependents: Dict[str, List[str]] = {name: [] for name in by_name}
+    pending_deps: Dict[str, int] = {}
+    for s in steps:
+        pending_deps[s.name] = len(set(s.deps))
+        for dep in set(s.deps):
+            dependents[dep].append(s.name)
+
+    results: Dict[str, StepResult] = {}
+
+    def _finish(result: StepResult) -> None:
+        results[result.name] = result
+        if on_done:
+            on_done(result)
+
+    def _skip_dependents(name: str) -> None:
+        for child in dependents[name]:
+            if child in results:
+                continue
+            _finish(StepResult(name=child, status=SKIPPED, error=RuntimeError(f"dependency {name!r} did not succeed")))
+            _skip_dependents(child)
+
+    def _run(s: Step) -> StepResult:
+        started = time.monotonic()
+        try:
+            value = s.fn({dep: results[dep].value for dep in s.deps})
+            return StepResult(name=s.name, status=SUCCEEDED, value=value, elapsed_s=time.monotonic() - started)
+        except Exception as exc:
+            return StepResult(name=s.name, status=FAILED, error=exc, elapsed_s=time.monotonic() - started)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(max_workers, 1)) as executor:
+        in_flight = {
+            executor.submit(_run, s): s.name for s in steps if pending_deps[s.name] == 0
+        }
+        while in_flight:
+            done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                in_flight.pop(future)
+                result = future.result()
+                _finish(result)
+                if result.status != SUCCEEDED:
+                    _skip_dependents(result.name)
+                    continue
+                for child in dependents[result.name]:
+                    pending_deps[child] -= 1
+                    if pending_deps[child] == 0 and child not in results:
+                        in_flight[executor.submit(_run, by_name[child])] = child
+
+    return results
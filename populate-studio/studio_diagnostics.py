@@ -0,0 +1,208 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_diagnostics.py - Kubernetes diagnostics for a Studio job that hung.
+
+collect_diagnostics() fetches the namespace's pods and events once as JSON
+(together with kubectl top, all in parallel), selects the pods that belong
+to the job - by its ID in pod names, labels (e.g. job-name=kjob-<tune_id>-job),
+annotations or owner references - plus any unhealthy pods, and then fetches
+describe and logs (and previous-container logs after restarts) for those pods
+concurrently.
+
+A short report is printed for the CI log and everything collected is written
+to a compressed bundle (k8s-diagnostics-<id>-<time>.tar.gz) that CI can
+upload as an artefact.
+"""
+
+import concurrent.futures
+import io
+import json
+import os
+import re
+import subprocess
+import tarfile
+import time
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_NAMESPACE = os.environ.get("K8S_NAMESPACE", "default")
+DEFAULT_BUNDLE_DIR = os.environ.get(
+    "K8S_DIAGNOSTICS_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "workspace", "k8s-diagnostics"),
+)
+
+# Pod phases / container reasons that are healthy
+_HEALTHY_PHASES = ("Running", "Succeeded")
+_UNHEALTHY_REASONS = (
+    "CrashLoopBackOff", "ImagePullBackOff", "ErrImagePull", "CreateContainerConfigError",
+    "OOMKilled", "Error", "ContainerCannotRun", "RunContainerError",
+)
+
+
+def kubectl(args: List[str], namespace: Optional[str] = None, timeout: int = 30) -> Tuple[bool, str]:
+    """Run kubectl; returns (ok, stdout or error text)."""
+    cmd = ["kubectl"] + args + (["-n", namespace] if namespace else [])
+    try:
+        r = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except Exception as exc:
+        return False, f"(error running {' '.join(cmd)}: {exc})"
+    if r.returncode != 0:
+        return False, (r.stdout + r.stderr).strip() or f"(exit code {r.returncode})"
+    return True, r.stdout
+
+
+def _pod_values(pod: dict) -> List[str]:
+    meta = pod.get("metadata", {})
+    values = [meta.get("name", "")]
+    values += list((meta.get("labels") or {}).values())
+    values += list((meta.get("annotations") or {}).values())
+    values += [ref.get("name", "") for ref in meta.get("ownerReferences") or []]
+    return values
+
+
+def pod_problems(pod: dict) -> List[str]:
+    """Reasons a pod looks unhealthy (phase, waiting/terminated reasons, restarts)."""
+    status = pod.get("status", {})
+    problems = []
+    if status.get("phase") not in _HEALTHY_PHASES:
+        problems.append(status.get("phase") or "Unknown")
+    for cs in status.get("initContainerStatuses", []) + status.get("containerStatuses", []):
+        for state in (cs.get("state") or {}, cs.get("lastState") or {}):
+            for detail in state.values():
+                reason = (detail or {}).get("reason")
+                if reason in _UNHEALTHY_REASONS and reason not in problems:
+                    problems.append(reason)
+        if cs.get("restartCount"):
+            problems.append(f"{cs['name']} restarted {cs['restartCount']}x")
+    return problems
+
+
+def restarted_containers(pod: dict) -> List[str]:
+    return [cs["name"] for cs in pod.get("status", {}).get("containerStatuses", []) if cs.get("restartCount")]
+
+
+def select_pods(pods: List[dict], job_hint: str = "", max_pods: int = 6) -> List[Tuple[dict, str]]:
+    """
+    Return [(pod, why)] for the pods worth describing: pods that carry the
+    job ID (name, label, annotation or owner) first, then unhealthy pods.
+    """
+    hint = job_hint.lower()
+    matched, unhealthy = [], []
+    for pod in pods:
+        if hint and any(hint in str(v).lower() for v in _pod_values(pod)):
+            matched.append((pod, f"matches {job_hint}"))
+            continue
+        problems = pod_problems(pod)
+        if problems:
+            unhealthy.append((pod, ", ".join(problems)))
+    return (matched + unhealthy)[:max_pods]
+
+
+def _event_time(event: dict) -> str:
+    return event.get("lastTimestamp") or event.get("eventTime") or event.get("firstTimestamp") or ""
+
+
+def relevant_events(events: List[dict], pod_names: List[str], job_hint: str = "") -> List[dict]:
+    """Warning events plus every event about the selected pods or the job, oldest first."""
+    hint = job_hint.lower()
+    keep = []
+    for event in events:
+        name = (event.get("involvedObject") or {}).get("name", "")
+        if event.get("type") == "Warning" or name in pod_names or (hint and hint in name.lower()):
+            keep.append(event)
+    return sorted(keep, key=_event_time)
+
+
+def _slug(value: str) -> str:
+    return re.sub(r"[^A-Za-z0-9_.-]", "-", value)[:60] or "namespace"
+
+
+def _write_bundle(path: str, files: Dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with tarfile.open(path, "w:gz") as tar:
+        for name, content in files.items():
+            data = content.encode("utf-8", errors="replace")
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            tar.addfile(info, io.BytesIO(data))
+
+
+def collect_diagnostics(
+    job_hint: str = "",
+    namespace: str = DEFAULT_NAMESPACE,
+    bundle_dir: str = DEFAULT_BUNDLE_DIR,
+    max_pods: int = 6,
+    tail_lines: int = 200,
+    workers: int = 8,
+) -> Optional[str]:
+    """
+    Collect diagnostics for the job *job_hint* (an inference, tune or dataset
+    ID), print a short report and return the path of the bundle written to
+    *bundle_dir* (None if it could not be written).
+    """
+    files: Dict[str, str] = {}
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        overview = {
+            "pods.json": pool.submit(kubectl, ["get", "pods", "-o", "json"], namespace),
+            "events.json": pool.submit(kubectl, ["get", "events", "-o", "json"], namespace),
+            "top-nodes.txt": pool.submit(kubectl, ["top", "nodes"]),
+            "top-pods.txt": pool.submit(kubectl, ["top", "pods"], namespace),
+        }
+        results = {name: future.result() for name, future in overview.items()}
+        files.update({name: out for name, (_, out) in results.items()})
+
+        def _items(name: str) -> List[dict]:
+            ok, out = results[name]
+            if not ok:
+                print(f"  ⚠️  kubectl get {name.split('.')[0]} failed: {out[:300]}")
+                return []
+            try:
+                return json.loads(out).get("items", [])
+            except ValueError:
+                return []
+
+        pods, events = _items("pods.json"), _items("events.json")
+        selected = select_pods(pods, job_hint, max_pods)
+        names = [p["metadata"]["name"] for p, _ in selected]
+
+        details = {}
+        for pod, _ in selected:
+            name = pod["metadata"]["name"]
+            details[f"pods/{name}.describe.txt"] = pool.submit(kubectl, ["describe", "pod", name], namespace)
+            details[f"pods/{name}.log"] = pool.submit(
+                kubectl, ["logs", name, f"--tail={tail_lines}", "--all-containers=true", "--prefix=true"], namespace,
+            )
+            for container in restarted_containers(pod):
+                details[f"pods/{name}.{container}.previous.log"] = pool.submit(
+                    kubectl, ["logs", name, "-c", container, "--previous", f"--tail={tail_lines}"], namespace,
+                )
+        files.update({path: future.result()[1] for path, future in details.items()})
+
+    # --- short report for the CI log ---
+    print(f"\n--- {len(pods)} pods in {namespace}; selected for job {job_hint!r}: {len(selected)} ---")
+    for pod, why in selected:
+        print(f"  {pod['metadata']['name']:<60} {pod.get('status', {}).get('phase', '?'):<10} {why}")
+    for name in names:
+        log_lines = files.get(f"pods/{name}.log", "").strip().splitlines()
+        print(f"\n--- kubectl logs {name} (last {min(30, len(log_lines))} lines) ---")
+        print("\n".join(log_lines[-30:]) or "(no output)")
+    events = relevant_events(events, names, job_hint)
+    files["events-relevant.txt"] = "\n".join(
+        f"{_event_time(e)}  {e.get('type', ''):<8} {e.get('reason', ''):<20} "
+        f"{(e.get('involvedObject') or {}).get('kind', '')}/{(e.get('involvedObject') or {}).get('name', '')}: "
+        f"{(e.get('message') or '').strip()}"
+        for e in events
+    )
+    print(f"\n--- events (warnings and selected pods, last 20 of {len(events)}) ---")
+    print("\n".join(files["events-relevant.txt"].splitlines()[-20:]) or "(none)")
+
+    stamp = time.strftime("%Y%m%dT%H%M%SZ", time.gmtime())
+    path = os.path.join(bundle_dir, f"k8s-diagnostics-{_slug(job_hint or namespace)}-{stamp}.tar.gz")
+    try:
+        _write_bundle(path, files)
+    except OSError as exc:
+        print(f"  ⚠️  Could not write diagnostics bundle {path}: {exc}")
+        return None
+    print(f"\n  📦 Full diagnostics (describe, logs, events, top) written to {path}")
+    return path
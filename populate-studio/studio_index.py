@@ -0,0 +1,156 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_index.py - Name -> ID lookup index over the gateway's list endpoints.
+
+"Create, or reuse the existing one with the same name" steps need to find a
+resource by name.  Scanning the first page of a list call both misses
+matches on a busy Studio and downloads the same list again in every step.
+NameIndex instead builds one index per resource type on first use by
+following limit/skip pagination, and then answers lookups from a dict.
+
+  - entries older than *ttl_s* are rebuilt on the next lookup
+  - a lookup that misses refreshes incrementally: pages are fetched from
+    the newest records until a page holds no unknown IDs, so a resource
+    created since the index was built is found without a full rebuild.
+    The gateway does not promise newest-first order, so unless
+    total_records then matches the number of indexed IDs the index is
+    rebuilt in full (also dropping deleted records)
+  - a name found is confirmed with a GET of the resource before it is
+    returned for reuse; a 404 drops it from the index
+  - add() records resources created by the runner itself
+  - has_id() tells whether a recorded ID still exists, refreshing the same way
+
+Safe to share between threads; concurrent first lookups of a resource type
+build its index once.
+"""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+# resource type -> (list endpoint, get endpoint, fields holding the name, first non-empty wins)
+RESOURCES: Dict[str, Tuple[str, str, Tuple[str, ...]]] = {
+    "templates": ("v2/tune-templates", "v2/tune-templates/{id}", ("name", "display_name")),
+    "base_models": ("v2/base-models", "v2/base-models/{id}", ("name", "display_name")),
+    "datasets": ("v2/datasets", "v2/datasets/{id}", ("dataset_name",)),
+    "tunes": ("v2/tunes", "v2/tunes/{id}", ("name", "display_name")),
+}
+
+DEFAULT_TTL_S = 300
+
+
+class _Entry:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.names: Dict[str, str] = {}
+        self.ids: set = set()
+        self.built_at: Optional[float] = None
+
+
+class NameIndex:
+    def __init__(self, session: requests.Session, api_url: str, ttl_s: float = DEFAULT_TTL_S, page_size: int = 100):
+        self.session = session
+        self.api_url = api_url.rstrip("/") + "/"
+        self.ttl_s = ttl_s
+        self.page_size = page_size
+        self.pages_fetched = 0
+        self._entries = {resource: _Entry() for resource in RESOURCES}
+
+    def _page(self, resource: str, skip: int) -> dict:
+        endpoint = RESOURCES[resource][0]
+        resp = self.session.get(urljoin(self.api_url, endpoint), params={"limit": self.page_size, "skip": skip})
+        resp.raise_for_status()
+        self.pages_fetched += 1
+        return resp.json()
+
+    def _exists(self, resource: str, resource_id: str) -> bool:
+        endpoint = RESOURCES[resource][1].format(id=resource_id)
+        resp = self.session.get(urljoin(self.api_url, endpoint))
+        if resp.status_code == 404:
+            return False
+        resp.raise_for_status()
+        return True
+
+    def _fetch(self, resource: str, entry: _Entry, incremental: bool) -> None:
+        """
+        Fetch pages into *entry*; incremental fetches stop at the first page
+        with nothing new, and fall back to a full rebuild if the result
+        disagrees with total_records.
+        """
+        name_fields = RESOURCES[resource][2]
+        names: Dict[str, str] = {}
+        ids: set = set()
+        skip = 0
+        total = None
+        while True:
+            body = self._page(resource, skip)
+            page = body.get("results") or []
+            new = [r for r in page if r.get("id") not in entry.ids]
+            for record in new if incremental else page:
+                name = next((record[f] for f in name_fields if record.get(f)), None)
+                if name is not None:
+                    names.setdefault(name, record.get("id"))
+                ids.add(record.get("id"))
+            skip += len(page)
+            # total_records may be null; then a short page is the last one
+            total = body.get("total_records")
+            if len(page) < self.page_size or (total is not None and skip >= total):
+                break
+            if incremental and not new:
+                break
+        if incremental:
+            if total is None or total != len(entry.ids | ids):
+                # not newest-first, or records were deleted: start over
+                self._fetch(resource, entry, incremental=False)
+                return
+            entry.names.update(names)  # newer records win
+            entry.ids |= ids
+        else:
+            entry.names, entry.ids = names, ids
+            entry.built_at = time.monotonic()
+
+    def _stale(self, entry: _Entry) -> bool:
+        return entry.built_at is None or time.monotonic() - entry.built_at > self.ttl_s
+
+    def refresh(self, resource: str) -> None:
+        """(Re)build the index of *resource* now, e.g. to surface listing errors up front."""
+        entry = self._entries[resource]
+        with entry.lock:
+            self._fetch(resource, entry, incremental=False)
+
+    def lookup(self, resource: str, name: str) -> Optional[str]:
+        """Return the ID of the existing *resource* (e.g. "datasets") named *name*, or None."""
+        entry = self._entries[resource]
+        with entry.lock:
+            if self._stale(entry):
+                self._fetch(resource, entry, incremental=False)
+            elif name not in entry.names:
+                self._fetch(resource, entry, incremental=True)
+            resource_id = entry.names.get(name)
+            if resource_id is None or self._exists(resource, resource_id):
+                return resource_id
+            # deleted since the index was built
+            entry.ids.discard(resource_id)
+            entry.names = {n: i for n, i in entry.names.items() if i != resource_id}
+            return None
+
+    def has_id(self, resource: str, resource_id: str) -> bool:
+        """Return whether a *resource* with ID *resource_id* exists."""
+        entry = self._entries[resource]
+        with entry.lock:
+            if self._stale(entry):
+                self._fetch(resource, entry, incremental=False)
+            elif resource_id not in entry.ids:
+                self._fetch(resource, entry, incremental=True)
+            return resource_id in entry.ids
+
+    def add(self, resource: str, name: str, resource_id: str) -> None:
+        """Record a resource created by the caller so later lookups find it."""
+        entry = self._entries[resource]
+        with entry.lock:
+            entry.names[name] = resource_id
+            entry.ids.add(resource_id)
@@ -0,0 +1,173 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_metrics.py - Per-endpoint latency and throughput instrumentation for
+Studio gateway calls.
+
+instrument_session() wraps a requests.Session (including the geostudio SDK
+client's session) so every call records its endpoint (method + path with
+IDs folded, see studio_resilience.endpoint_key), status, bytes sent and
+received, time to response headers and total elapsed time (including
+retries and body download).
+
+Comparing time-to-headers with total time, and one endpoint with another,
+shows whether a slow run is the gateway/database (high time-to-headers on
+every endpoint), the network (large gap between headers and total on big
+responses) or one slow API.
+
+At the end of a run, format_summary() renders p50/p95/p99 per endpoint and
+write() saves a JSON (summary + every call) or CSV (summary) artefact.
+"""
+
+import csv
+import json
+import math
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+import requests
+
+from studio_resilience import endpoint_key
+
+
+@dataclass
+class CallRecord:
+    endpoint: str
+    status: str
+    bytes_sent: int
+    bytes_received: int
+    ttfb_s: float
+    elapsed_s: float
+    started_at: float
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of *values* (0 <= pct <= 100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100.0
+    low, high = math.floor(rank), math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def _body_size(body) -> int:
+    if isinstance(body, (bytes, str)):
+        return len(body)
+    return 0
+
+
+class RequestMetrics:
+    """Thread-safe collector of CallRecords."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls: List[CallRecord] = []
+
+    def record(self, call: CallRecord) -> None:
+        with self._lock:
+            self.calls.append(call)
+
+    def summary(self) -> List[dict]:
+        """Per-endpoint statistics, slowest total time first."""
+        with self._lock:
+            calls = list(self.calls)
+        by_endpoint: Dict[str, List[CallRecord]] = {}
+        for call in calls:
+            by_endpoint.setdefault(call.endpoint, []).append(call)
+
+        rows = []
+        for endpoint, group in by_endpoint.items():
+            elapsed = [c.elapsed_s for c in group]
+            ttfb = [c.ttfb_s for c in group]
+            window = max(c.started_at + c.elapsed_s for c in group) - min(c.started_at for c in group)
+            received = sum(c.bytes_received for c in group)
+            rows.append({
+                "endpoint": endpoint,
+                "count": len(group),
+                "errors": sum(1 for c in group if not c.status.isdigit() or int(c.status) >= 400),
+                "bytes_sent": sum(c.bytes_sent for c in group),
+                "bytes_received": received,
+                "p50_s": round(percentile(elapsed, 50), 4),
+                "p95_s": round(percentile(elapsed, 95), 4),
+                "p99_s": round(percentile(elapsed, 99), 4),
+                "max_s": round(max(elapsed), 4),
+                "ttfb_p50_s": round(percentile(ttfb, 50), 4),
+                "total_s": round(sum(elapsed), 4),
+                # throughput over the endpoint's active window; undefined for a single call
+                "req_per_s": round(len(group) / window, 3) if len(group) > 1 and window > 0 else None,
+                "recv_bytes_per_s": round(received / window, 1) if len(group) > 1 and window > 0 else None,
+            })
+        return sorted(rows, key=lambda r: r["total_s"], reverse=True)
+
+    def format_summary(self) -> str:
+        """Render summary() as a markdown table."""
+        lines = [
+            "| Endpoint | Calls | Errors | p50 (s) | p95 (s) | p99 (s) | Max (s) | TTFB p50 (s) | Req/s | KiB recv |",
+            "|----------|-------|--------|---------|---------|---------|---------|--------------|-------|----------|",
+        ]
+        for r in self.summary():
+            rps = "-" if r["req_per_s"] is None else f"{r['req_per_s']:g}"
+            lines.append(
+                f"| `{r['endpoint']}` | {r['count']} | {r['errors']} | {r['p50_s']:.3f} | {r['p95_s']:.3f} "
+                f"| {r['p99_s']:.3f} | {r['max_s']:.3f} | {r['ttfb_p50_s']:.3f} | {rps} "
+                f"| {r['bytes_received'] / 1024:.1f} |"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write a .csv (per-endpoint summary) or JSON (summary and every call) artefact."""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        summary = self.summary()
+        if path.lower().endswith(".csv"):
+            fields = list(summary[0]) if summary else ["endpoint"]
+            with open(path, "w", newline="") as fh:
+                writer = csv.DictWriter(fh, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(summary)
+            return
+        with self._lock:
+            calls = [asdict(c) for c in self.calls]
+        with open(path, "w") as fh:
+            json.dump({"summary": summary, "calls": calls}, fh, indent=2)
+
+
+def instrument_session(session: requests.Session, metrics: Optional[RequestMetrics] = None) -> RequestMetrics:
+    """
+    Record every request sent through *session* into *metrics* (a new
+    RequestMetrics if not given) and return it.
+    """
+    metrics = metrics or RequestMetrics()
+    send = session.send
+
+    def _send(request, **kwargs):
+        started_at = time.time()
+        start = time.perf_counter()
+        key = endpoint_key(request.method or "GET", request.url)
+        sent = _body_size(request.body)
+        try:
+            response = send(request, **kwargs)
+        except Exception as exc:
+            metrics.record(CallRecord(key, type(exc).__name__, sent, 0, 0.0, time.perf_counter() - start, started_at))
+            raise
+        if kwargs.get("stream"):
+            # don't consume streamed bodies; fall back to the advertised length
+            received = int(response.headers.get("Content-Length") or 0)
+        else:
+            received = len(response.content or b"")
+        metrics.record(CallRecord(
+            key,
+            str(response.status_code),
+            sent,
+            received,
+            response.elapsed.total_seconds(),
+            time.perf_counter() - start,
+            started_at,
+        ))
+        return response
+
+    session.send = _send
+    return metrics
@@ -0,0 +1,245 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_notifications.py - Event-driven completion for StatusPoller waits.
+
+The gateway publishes inference progress on GET /v2/notifications/{event_id}
+(the event_id of an inference is its ID).  Depending on the deployment that
+endpoint is a Server-Sent Events stream, which is followed as a long-lived
+connection per job, or a NotificationListResponse page, which is tailed with
+an incremental limit/skip cursor.  When an event with a terminal status
+arrives, the poller is told to check that job immediately, so completion is
+detected within a request round-trip instead of a poll interval.
+
+While a job's stream is followed, the poller only checks it at its slowest
+interval as a safety net for missed events.  JSON pages are no cheaper than
+the poller's own list call, so those jobs stay on the normal schedule and
+the cursors are read by the poller itself, one job per cycle, round-robin;
+API calls still grow with poll cycles, not jobs x time.  If the feed is
+unavailable for a job (404, repeated errors), it is only polled.
+
+Only inferences publish notifications; tunes and dataset onboarding are
+always polled.
+"""
+
+import collections
+import concurrent.futures
+import json
+import threading
+from typing import Iterator, Optional
+from urllib.parse import urljoin
+
+import requests
+from urllib3.exceptions import ReadTimeoutError
+
+NOTIFICATIONS_ENDPOINT = "v2/notifications/{event_id}"
+
+# Job kinds that publish notifications
+FEED_KINDS = ("inference",)
+
+# Statuses in event details that mean the job has stopped
+TERMINAL_EVENT_MARKERS = ("COMPLETED", "FAILED", "ERROR", "STOPPED", "CANCELLED")
+
+# Gateway responses meaning the feed is not available at all
+_UNSUPPORTED_STATUS = (404, 405, 501)
+
+# Events requested per cursor page
+_PAGE_SIZE = 25
+
+
+def _sse_events(resp: requests.Response) -> Iterator[dict]:
+    """Yield the JSON payload of each event of a text/event-stream response."""
+    data = []
+    for line in resp.iter_lines(decode_unicode=True):
+        if line is None:
+            continue
+        if line.startswith("data:"):
+            data.append(line[5:].lstrip())
+        elif not line and data:
+            try:
+                event = json.loads("\n".join(data))
+            except ValueError:
+                event = {"detail": {"message": "\n".join(data)}}
+            data = []
+            if isinstance(event, dict):
+                yield event
+
+
+def _is_idle_timeout(exc: Exception) -> bool:
+    """
+    True for a read timeout on a quiet connection.  Before the response it is
+    a ReadTimeout; while iterating a stream, requests re-raises urllib3's
+    ReadTimeoutError as a plain ConnectionError.
+    """
+    if isinstance(exc, requests.exceptions.ReadTimeout):
+        return True
+    return isinstance(exc, requests.exceptions.ConnectionError) and any(
+        isinstance(arg, ReadTimeoutError) for arg in exc.args
+    )
+
+
+def event_status(event: dict) -> str:
+    detail = event.get("detail") or {}
+    return str(detail.get("status") or "") if isinstance(detail, dict) else ""
+
+
+def is_terminal_event(event: dict) -> bool:
+    status = event_status(event).upper()
+    return any(marker in status for marker in TERMINAL_EVENT_MARKERS)
+
+
+class _Cursor:
+    def __init__(self, future: concurrent.futures.Future, skip: int = 0):
+        self.future = future
+        self.skip = skip
+        self.failures = 0
+
+
+class NotificationFeed:
+    """
+    Follows the notification feed of every inference a StatusPoller watches
+    (pass it as StatusPoller(feed=...)).  *stream_timeout_s* is how long an
+    idle stream is kept before reconnecting, *reconnect_s* the delay before
+    reconnecting a closed one.  Once the gateway has answered with a JSON
+    page, later jobs are not probed for a stream but go straight to the
+    cursors read by read_cursor().
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        api_url: str,
+        reconnect_s: float = 5,
+        stream_timeout_s: float = 300,
+        max_failures: int = 3,
+    ):
+        self.session = session
+        self.api_url = api_url.rstrip("/") + "/"
+        self.reconnect_s = reconnect_s
+        self.stream_timeout_s = stream_timeout_s
+        self.max_failures = max_failures
+        self.events = 0
+        self._paged = False  # the gateway serves JSON pages, not streams
+        self._cursors: "collections.OrderedDict[tuple, _Cursor]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def supports(self, kind: str) -> bool:
+        return kind in FEED_KINDS
+
+    def follow(self, poller, kind: str, resource_id: str, future: concurrent.futures.Future) -> None:
+        """
+        Tail the job's stream in a daemon thread until *future* is done, or
+        add a cursor for it if the gateway serves JSON pages.
+        """
+        if self._paged:
+            self._add_cursor(poller, kind, resource_id, future)
+            return
+        threading.Thread(
+            target=self._follow,
+            args=(poller, kind, resource_id, future),
+            name=f"studio-notifications-{resource_id}",
+            daemon=True,
+        ).start()
+
+    def _add_cursor(self, poller, kind: str, resource_id: str, future: concurrent.futures.Future, skip: int = 0) -> None:
+        with self._lock:
+            self._cursors[(kind, resource_id)] = _Cursor(future, skip)
+        # one cursor page per cycle cannot stand in for the poller's checks
+        poller.unfollow(kind, resource_id)
+
+    def read_cursor(self, poller) -> bool:
+        """
+        Read the next page of the least recently read cursor; called by the
+        poller once per cycle.  Returns whether a request was made.
+        """
+        with self._lock:
+            for key in [k for k, c in self._cursors.items() if c.future.done()]:
+                del self._cursors[key]
+            if not self._cursors:
+                return False
+            (kind, resource_id), cursor = self._cursors.popitem(last=False)
+        url = urljoin(self.api_url, NOTIFICATIONS_ENDPOINT.format(event_id=resource_id))
+        try:
+            resp = self.session.get(
+                url,
+                params={"skip": cursor.skip, "limit": _PAGE_SIZE},
+                headers={"Accept": "application/json"},
+                timeout=(10, 60),
+            )
+            if resp.status_code in _UNSUPPORTED_STATUS:
+                print(f"  ⚠️  No notification feed for {kind} {resource_id} ({resp.status_code}); polling only")
+                return True
+            resp.raise_for_status()
+            events = resp.json().get("results") or []
+        except (requests.exceptions.RequestException, ValueError, AttributeError) as exc:
+            cursor.failures += 1
+            if cursor.failures >= self.max_failures:
+                print(f"  ⚠️  Notification feed for {kind} {resource_id} failed ({exc}); polling only")
+                return True
+        else:
+            cursor.failures = 0
+            cursor.skip += len(events)
+            if any(self._handle(poller, kind, resource_id, e) for e in events):
+                return True
+        with self._lock:
+            self._cursors[(kind, resource_id)] = cursor
+        return True
+
+    def _handle(self, poller, kind: str, resource_id: str, event: dict) -> bool:
+        self.events += 1
+        if is_terminal_event(event):
+            print(f"  🔔 {kind} {resource_id}: {event_status(event)} event received")
+            poller.check_now(kind, resource_id)
+            return True
+        return False
+
+    def _follow(self, poller, kind: str, resource_id: str, future: concurrent.futures.Future) -> None:
+        try:
+            self._tail(poller, kind, resource_id, future)
+        except Exception as exc:  # never leave the job on the slow fallback schedule
+            print(f"  ⚠️  Notification feed for {kind} {resource_id} stopped ({exc}); polling instead")
+            poller.unfollow(kind, resource_id)
+
+    def _tail(self, poller, kind: str, resource_id: str, future: concurrent.futures.Future) -> None:
+        url = urljoin(self.api_url, NOTIFICATIONS_ENDPOINT.format(event_id=resource_id))
+        failures = 0
+        while not future.done():
+            resp: Optional[requests.Response] = None
+            try:
+                resp = self.session.get(
+                    url,
+                    params={"skip": 0, "limit": _PAGE_SIZE},
+                    headers={"Accept": "text/event-stream, application/json"},
+                    stream=True,
+                    timeout=(10, self.stream_timeout_s),
+                )
+                if resp.status_code in _UNSUPPORTED_STATUS:
+                    print(f"  ⚠️  No notification feed for {kind} {resource_id} ({resp.status_code}); polling instead")
+                    poller.unfollow(kind, resource_id)
+                    return
+                resp.raise_for_status()
+                failures = 0
+                if "text/event-stream" in resp.headers.get("Content-Type", ""):
+                    # long-lived stream; when the server closes it, reconnect
+                    for event in _sse_events(resp):
+                        if future.done() or self._handle(poller, kind, resource_id, event):
+                            return
+                else:
+                    # JSON pages: hand the job to the poller-driven cursors
+                    self._paged = True
+                    events = resp.json().get("results") or []
+                    if not any(self._handle(poller, kind, resource_id, e) for e in events):
+                        self._add_cursor(poller, kind, resource_id, future, skip=len(events))
+                    return
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                if _is_idle_timeout(exc):
+                    continue  # idle stream, not a failure: reconnect
+                failures += 1
+                if failures >= self.max_failures:
+                    print(f"  ⚠️  Notification feed for {kind} {resource_id} failed ({exc}); polling instead")
+                    poller.unfollow(kind, resource_id)
+                    return
+            finally:
+                if resp is not None:
+                    resp.close()
+            concurrent.futures.wait([future], timeout=self.reconnect_s)
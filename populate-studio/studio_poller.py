@@ -0,0 +1,397 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_poller.py - One background poller for the status of many Studio jobs.
+
+Instead of one polling loop (and thread) per job, callers register the
+inferences, tunes and datasets they are waiting for with a StatusPoller and
+get a Future back.  Every cycle the poller lists each resource type once
+(GET /v2/inference, /v2/tunes, /v2/datasets, newest first, following
+limit/skip pagination only until every outstanding ID has been seen) and
+resolves the futures of jobs that reached a terminal status.  Jobs not found
+in the first pages (e.g. old ones) are fetched individually.
+
+API calls therefore grow with the number of poll cycles, not with
+jobs x cycles.
+
+Each job is checked on its own adaptive schedule (PollPolicy): a fast first
+check to catch immediate failures, then exponential backoff with jitter
+while it runs, tightened to a short interval around the completion time
+expected from past runs of the same job type (kept in an optional
+JsonStateFile).  A cycle only runs when some job is due, and jobs that are
+not due yet are still resolved for free if they show up in a list call.
+
+With a NotificationFeed (studio_notifications.py), jobs that publish
+completion events are resolved as soon as their event arrives.  Jobs
+followed over a stream are only polled at the slowest interval as a
+fallback for missed events; where the gateway serves JSON pages instead,
+each cycle also reads one job's notification cursor.
+
+Waits are cancellable: wait() returns at its deadline, stops watching the
+job and, with cancel_on_timeout=True, asks the gateway to cancel it
+(POST /v2/inference/{id}/cancel) so a stuck job does not keep holding
+cluster capacity.  The gateway has no cancel endpoint for tunes or
+dataset onboarding; those are only reported.
+"""
+
+import concurrent.futures
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+# Gateway list and get endpoints per job kind
+ENDPOINTS = {
+    "inference": ("v2/inference", "v2/inference/{id}"),
+    "tune": ("v2/tunes", "v2/tunes/{id}"),
+    "dataset": ("v2/datasets", "v2/datasets/{id}"),
+}
+
+# Server-side cancel endpoints (POST); tunes and datasets have none
+CANCEL_ENDPOINTS = {
+    "inference": "v2/inference/{id}/cancel",
+}
+
+# Terminal statuses, matching the geostudio SDK poll_*_until_finished loops
+TERMINAL: Dict[str, Callable[[str], bool]] = {
+    "inference": lambda s: "COMPLETED" in s or s in ("FAILED", "STOPPED"),
+    "tune": lambda s: s in ("Finished", "Failed"),
+    "dataset": lambda s: s in ("Succeeded", "Failed"),
+}
+
+
+def is_terminal(kind: str, status: Optional[str]) -> bool:
+    return bool(status) and TERMINAL[kind](status)
+
+
+@dataclass
+class PollPolicy:
+    """
+    When to check a job next.  The first check is *initial_s* after the job
+    is watched; after that the interval grows from *base_s* by *factor* per
+    check up to *max_s*.  Within *near_fraction* of the expected duration
+    (at least *near_s* x 2 either side) it drops to *near_s*, and a long
+    backoff is cut short so the job is checked as that window opens.  Every
+    interval gets +/- *jitter* randomisation so many runners don't poll in
+    lockstep.
+    """
+
+    initial_s: float = float(os.environ.get("POLL_INITIAL_S", "3"))
+    base_s: float = float(os.environ.get("POLL_BASE_S", "5"))
+    factor: float = 1.5
+    max_s: float = float(os.environ.get("POLL_MAX_INTERVAL_S", "60"))
+    near_s: float = float(os.environ.get("POLL_NEAR_ETA_S", "5"))
+    near_fraction: float = 0.15
+    jitter: float = 0.2
+
+    def next_interval(self, checks: int, elapsed_s: float, eta_s: Optional[float] = None) -> float:
+        """Seconds until the next check of a job checked *checks* times, *elapsed_s* after it was watched."""
+        if checks == 0:
+            return self.initial_s
+        interval = min(self.max_s, self.base_s * self.factor ** (checks - 1))
+        if eta_s:
+            window = max(2 * self.near_s, eta_s * self.near_fraction)
+            remaining = eta_s - elapsed_s
+            if abs(remaining) <= window:
+                interval = self.near_s
+            elif remaining > window:
+                interval = min(interval, remaining - window)
+        interval *= 1 + random.uniform(-self.jitter, self.jitter)
+        return max(1.0, interval)
+
+
+class _Watch:
+    def __init__(self, job_type: str):
+        self.future: concurrent.futures.Future = concurrent.futures.Future()
+        self.job_type = job_type
+        self.started = time.monotonic()
+        self.checks = 0
+        self.next_check = self.started
+        self.last_pending = self.started  # last time the job was seen still running
+        self.event_driven = False  # completion is signalled by a NotificationFeed
+
+
+class StatusPoller:
+    """
+    Poll the status of every watched job in one background thread.
+
+    *session* is an authenticated requests.Session for the gateway at
+    *api_url* (e.g. the geostudio SDK client's session and api_url).  Each
+    job is checked according to *policy*; *history* is an optional
+    JsonStateFile in which the duration of finished jobs is learned per job
+    type to predict the next run's completion time.  *feed* is an optional
+    NotificationFeed that signals completion of the kinds it supports.
+    *on_record* is called as on_record(kind, id, record) with every status
+    record fetched for a watched job (e.g. to time its state changes).  With
+    *cancel_on_timeout*, jobs whose wait() times out are cancelled on the
+    gateway where it supports that.
+    """
+
+    def __init__(
+        self,
+        session: requests.Session,
+        api_url: str,
+        policy: Optional[PollPolicy] = None,
+        history=None,
+        feed=None,
+        on_record: Optional[Callable[[str, str, dict], None]] = None,
+        page_size: int = 50,
+        max_pages: int = 2,
+        cancel_on_timeout: bool = False,
+    ):
+        self.session = session
+        self.api_url = api_url.rstrip("/") + "/"
+        self.policy = policy or PollPolicy()
+        self.history = history
+        self.feed = feed
+        self.on_record = on_record
+        self.page_size = page_size
+        self.max_pages = max_pages
+        self.cancel_on_timeout = cancel_on_timeout
+        self.cycles = 0
+        self.api_calls = 0
+        self._watched: Dict[Tuple[str, str], _Watch] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "StatusPoller":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="studio-status-poller", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling and cancel every outstanding future."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+        with self._lock:
+            for watch in self._watched.values():
+                watch.future.cancel()
+            self._watched.clear()
+
+    def expected_duration(self, job_type: str) -> Optional[float]:
+        """Learned duration in seconds of *job_type* jobs, or None without history."""
+        record = self.history.get(f"poll-eta:{job_type}") if self.history is not None else None
+        return record["mean_s"] if record else None
+
+    def _learn(self, job_type: str, duration_s: float) -> None:
+        if self.history is None:
+            return
+        key = f"poll-eta:{job_type}"
+        record = self.history.get(key) or {"mean_s": duration_s, "runs": 0}
+        # exponentially weighted, so the estimate follows cluster changes
+        mean_s = duration_s if record["runs"] == 0 else 0.7 * record["mean_s"] + 0.3 * duration_s
+        self.history.set(key, {"mean_s": round(mean_s, 1), "runs": record["runs"] + 1, "last_s": round(duration_s, 1)})
+
+    def watch(self, kind: str, resource_id: str, job_type: Optional[str] = None) -> concurrent.futures.Future:
+        """
+        Return a Future resolved with the job's record once it reaches a
+        terminal status.  *job_type* (default: *kind*) groups jobs whose
+        durations are comparable, e.g. "tune:burn-scars", for ETA learning.
+        Watching the same job twice returns the same Future; cancelling the
+        Future stops watching it.
+        """
+        if kind not in ENDPOINTS:
+            raise ValueError(f"Unknown job kind {kind!r}; choose from {', '.join(ENDPOINTS)}")
+        key = (kind, str(resource_id))
+        with self._lock:
+            watch = self._watched.get(key)
+            new = watch is None or watch.future.done()
+            if new:
+                watch = _Watch(job_type or kind)
+                watch.next_check = watch.started + self.policy.next_interval(0, 0.0)
+                watch.event_driven = self.feed is not None and self.feed.supports(kind)
+                self._watched[key] = watch
+        if new and watch.event_driven:
+            self.feed.follow(self, kind, key[1], watch.future)
+        self._wake.set()
+        return watch.future
+
+    def check_now(self, kind: str, resource_id: str) -> None:
+        """Check a job in the next cycle, e.g. because a completion event arrived."""
+        with self._lock:
+            watch = self._watched.get((kind, str(resource_id)))
+            if watch is not None:
+                # back on the normal schedule in case the status lags the event
+                watch.event_driven = False
+                watch.next_check = time.monotonic()
+        self._wake.set()
+
+    def unfollow(self, kind: str, resource_id: str) -> None:
+        """Put a job whose notifications are unavailable back on the normal polling schedule."""
+        with self._lock:
+            watch = self._watched.get((kind, str(resource_id)))
+            if watch is None or not watch.event_driven:
+                return
+            watch.event_driven = False
+            now = time.monotonic()
+            eta = self.expected_duration(watch.job_type)
+            interval = self.policy.next_interval(watch.checks, now - watch.started, eta)
+            watch.next_check = min(watch.next_check, now + interval)
+        self._wake.set()
+
+    def wait(
+        self,
+        kind: str,
+        resource_id: str,
+        timeout: Optional[float] = None,
+        on_timeout: Optional[Callable[[], None]] = None,
+        job_type: Optional[str] = None,
+    ) -> dict:
+        """
+        Block until the job finishes and return its record.  After *timeout*
+        seconds stop watching the job, call *on_timeout* (e.g. to collect
+        diagnostics while the job's pods still exist), cancel the job on the
+        gateway if cancel_on_timeout is set, and raise TimeoutError.
+        """
+        future = self.watch(kind, resource_id, job_type=job_type)
+        try:
+            return future.result(timeout=timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            if on_timeout is not None:
+                on_timeout()
+            if self.cancel_on_timeout:
+                cancelled, detail = self.cancel_job(kind, resource_id)
+                print(f"  {'🛑' if cancelled else '⚠️ '} Cancel {kind} {resource_id}: {detail}")
+            raise TimeoutError(f"{kind} {resource_id} did not finish within {timeout}s") from None
+
+    def cancel_job(self, kind: str, resource_id: str) -> Tuple[bool, str]:
+        """Ask the gateway to cancel a job; returns (cancelled, detail)."""
+        endpoint = CANCEL_ENDPOINTS.get(kind)
+        if endpoint is None:
+            return False, f"the gateway has no cancel endpoint for {kind}s; it keeps running"
+        try:
+            self.api_calls += 1
+            resp = self.session.post(urljoin(self.api_url, endpoint.format(id=resource_id)))
+        except requests.exceptions.RequestException as exc:
+            return False, f"{type(exc).__name__}: {exc}"
+        if not resp.ok:
+            return False, f"{resp.status_code} - {resp.text[:300]}"
+        return True, "cancelled"
+
+    # ------------------------------------------------------------------
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._lock:
+                due = min((w.next_check for w in self._watched.values() if not w.future.done()), default=None)
+            # sleep until the next job is due, or until a new job is watched
+            timeout = None if due is None else max(0.0, due - time.monotonic())
+            self._wake.wait(timeout)
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if due is None or time.monotonic() < due:
+                continue
+            try:
+                self.poll_once()
+            except Exception as exc:  # never let the poller thread die
+                print(f"  ⚠️  Status poller cycle failed: {exc}")
+
+    def _outstanding(self) -> Dict[str, List[str]]:
+        """{kind: [ids]} of every watched job, for kinds where at least one job is due."""
+        now = time.monotonic()
+        with self._lock:
+            for key in [k for k, w in self._watched.items() if w.future.done()]:
+                del self._watched[key]
+            outstanding: Dict[str, List[str]] = {}
+            due_kinds = {kind for (kind, _), w in self._watched.items() if w.next_check <= now}
+            for kind, resource_id in self._watched:
+                if kind in due_kinds:
+                    outstanding.setdefault(kind, []).append(resource_id)
+            return outstanding
+
+    def _get(self, endpoint: str, params: Optional[dict] = None) -> dict:
+        self.api_calls += 1
+        resp = self.session.get(urljoin(self.api_url, endpoint), params=params)
+        resp.raise_for_status()
+        return resp.json()
+
+    def _scan(self, kind: str, wanted: List[str]) -> Dict[str, dict]:
+        """Return {id: record} for the wanted jobs found in the first pages of the list endpoint."""
+        list_endpoint = ENDPOINTS[kind][0]
+        remaining = set(wanted)
+        found: Dict[str, dict] = {}
+        for page in range(self.max_pages):
+            body = self._get(list_endpoint, params={"limit": self.page_size, "skip": page * self.page_size})
+            records = body.get("results") or []
+            for record in records:
+                record_id = str(record.get("id"))
+                if record_id in remaining:
+                    found[record_id] = record
+                    remaining.discard(record_id)
+            if not remaining or len(records) < self.page_size:
+                break
+        return found
+
+    def _update(self, kind: str, resource_id: str, record: dict, now: float) -> None:
+        """Resolve a finished job, or schedule the next check of a job that was due."""
+        if self.on_record is not None:
+            self.on_record(kind, resource_id, record)
+        with self._lock:
+            watch = self._watched.get((kind, resource_id))
+            if watch is None:
+                return
+            elapsed = time.monotonic() - watch.started
+            if not is_terminal(kind, record.get("status")):
+                watch.last_pending = now
+                if watch.next_check <= now:
+                    watch.checks += 1
+                    if watch.event_driven:
+                        # the feed signals completion; this check only catches missed events
+                        interval = self.policy.max_s
+                    else:
+                        eta = self.expected_duration(watch.job_type)
+                        interval = self.policy.next_interval(watch.checks, elapsed, eta)
+                    watch.next_check = now + interval
+                return
+            del self._watched[(kind, resource_id)]
+        if not watch.future.done():
+            watch.future.set_result(record)
+            # it finished somewhere between the last two checks
+            self._learn(watch.job_type, (watch.last_pending + now) / 2 - watch.started)
+
+    def poll_once(self) -> None:
+        """Run one poll cycle over every kind with a job due for a check."""
+        self.cycles += 1
+        if self.feed is not None and self.feed.read_cursor(self):
+            self.api_calls += 1
+        now = time.monotonic()
+        for kind, wanted in self._outstanding().items():
+            try:
+                records = self._scan(kind, wanted)
+            except (requests.exceptions.RequestException, ValueError) as exc:
+                print(f"  ⚠️  Could not list {kind} statuses: {exc}")
+                records = {}
+            for resource_id in wanted:
+                record = records.get(resource_id)
+                if record is None:
+                    with self._lock:
+                        watch = self._watched.get((kind, resource_id))
+                    if watch is None or watch.next_check > now:
+                        continue
+                    # straggler not in the first pages: fetch it on its own
+                    try:
+                        record = self._get(ENDPOINTS[kind][1].format(id=resource_id))
+                    except (requests.exceptions.RequestException, ValueError) as exc:
+                        print(f"  ⚠️  Could not fetch {kind} {resource_id}: {exc}")
+                        watch.next_check = now + self.policy.next_interval(watch.checks, now - watch.started)
+                        continue
+                self._update(kind, resource_id, record, now)
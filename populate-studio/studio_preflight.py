@@ -0,0 +1,116 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_preflight.py - Pre-flight validation of Studio payloads before real submission.
+
+Runs cheap checks concurrently and reports every failure in one table:
+  - gateway dry-runs (/v2/inference/dry-run, /v2/submit-tune/dry-run)
+  - reachability of the remote files a payload points at (checkpoints,
+    configs, dataset archives, inference input URLs)
+
+so that a typo is caught before a dataset download or GPU job has started.
+"""
+
+import concurrent.futures
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+DRY_RUN_ENDPOINTS = {
+    "inference": "v2/inference/dry-run",
+    "tune": "v2/submit-tune/dry-run",
+}
+
+# A check returns (ok, detail)
+Check = Callable[[], Tuple[bool, str]]
+
+
+@dataclass
+class PreflightResult:
+    name: str
+    ok: bool
+    detail: str
+
+
+def _error_detail(resp: requests.Response, limit: int = 300) -> str:
+    """Summarise a failed gateway response, flattening FastAPI validation errors."""
+    try:
+        body = resp.json()
+    except ValueError:
+        return f"{resp.status_code} - {resp.text[:limit]}"
+    detail = body.get("detail", body) if isinstance(body, dict) else body
+    if isinstance(detail, list):
+        detail = "; ".join(
+            f"{'.'.join(str(p) for p in d.get('loc', []))}: {d.get('msg')}" if isinstance(d, dict) else str(d)
+            for d in detail
+        )
+    return f"{resp.status_code} - {str(detail)[:limit]}"
+
+
+def dry_run(session: requests.Session, api_url: str, kind: str, payload: dict) -> Tuple[bool, str]:
+    """
+    POST *payload* to the gateway dry-run endpoint for *kind* ("inference" or
+    "tune").  *api_url* is the gateway base URL, e.g.
+    https://localhost:4180/studio-gateway/.
+    """
+    resp = session.post(urljoin(api_url.rstrip("/") + "/", DRY_RUN_ENDPOINTS[kind]), json=payload)
+    if resp.ok:
+        return True, f"{resp.status_code} - dry-run accepted"
+    return False, _error_detail(resp)
+
+
+def check_urls(urls: Iterable[str], session: requests.Session = None, timeout: int = 30) -> Tuple[bool, str]:
+    """
+    Check that every URL is reachable (HEAD, falling back to a streamed GET
+    when HEAD is not allowed).  Uses a plain session so gateway credentials
+    are never sent to third-party hosts.
+    """
+    session = session or requests.Session()
+    failures = []
+    checked = 0
+    for url in urls:
+        if not url:
+            continue
+        checked += 1
+        try:
+            resp = session.head(url, allow_redirects=True, timeout=timeout)
+            if resp.status_code in (403, 405, 501):
+                resp = session.get(url, stream=True, allow_redirects=True, timeout=timeout)
+                resp.close()
+            if not resp.ok:
+                failures.append(f"{url} -> {resp.status_code}")
+        except requests.exceptions.RequestException as exc:
+            failures.append(f"{url} -> {type(exc).__name__}")
+    if failures:
+        return False, "; ".join(failures)
+    return True, f"{checked} URL(s) reachable"
+
+
+def run_preflight(checks: Dict[str, Check], concurrency: int = 8) -> List[PreflightResult]:
+    """Run all *checks* concurrently and return their results in input order."""
+    results: Dict[str, PreflightResult] = {}
+
+    def _run(name: str, check: Check) -> PreflightResult:
+        try:
+            ok, detail = check()
+        except Exception as exc:
+            ok, detail = False, f"{type(exc).__name__}: {exc}"
+        return PreflightResult(name=name, ok=ok, detail=detail)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+        futures = [executor.submit(_run, name, check) for name, check in checks.items()]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            results[result.name] = result
+    return [results[name] for name in checks]
+
+
+def format_table(results: List[PreflightResult]) -> str:
+    """Render results as a markdown table (readable in a terminal and in GitHub summaries)."""
+    lines = ["| Check | Result | Detail |", "|-------|--------|--------|"]
+    for r in results:
+        detail = r.detail.replace("|", "\\|").replace("\n", " ")
+        lines.append(f"| {r.name} | {'✅' if r.ok else '❌'} | {detail} |")
+    return "\n".join(lines)
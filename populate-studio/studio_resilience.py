@@ -0,0 +1,281 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_resilience.py - Client-side resilience for Studio gateway calls.
+
+Provides a requests transport adapter that wraps every call with:
+  - retries with exponential backoff and full jitter, honouring Retry-After
+    on 429/503 responses; non-idempotent calls (POST, PATCH) are only replayed
+    when the server cannot have processed them (connect errors, 429, 503 with
+    Retry-After), so submissions are never duplicated.  Any other 5xx on a
+    POST (e.g. 502/504 during a gateway rollout) is returned to the caller,
+    which has to check whether the resource was created before resubmitting
+    (populate-studio.py does so by name through studio_index.NameIndex)
+  - a token-bucket rate limiter per endpoint (method + path with IDs folded)
+  - a circuit breaker per host that pauses new requests while the gateway is
+    clearly down, then lets a single trial request through
+
+Mount it on any requests.Session (including the geostudio SDK client's
+session) with mount_resilience().
+
+Defaults can be tuned with environment variables:
+    STUDIO_MAX_RETRIES            - retries per request (default 5)
+    STUDIO_RETRY_BASE_DELAY_S     - first backoff delay (default 1)
+    STUDIO_RETRY_MAX_DELAY_S      - backoff / Retry-After cap (default 60)
+    STUDIO_RATE_LIMIT             - requests/second per endpoint, 0 = off (default 0)
+    STUDIO_BREAKER_THRESHOLD      - consecutive failures that open the breaker (default 5)
+    STUDIO_BREAKER_RESET_S        - seconds the breaker stays open (default 30)
+"""
+
+import email.utils
+import os
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+RETRYABLE_STATUS = frozenset({429, 502, 503, 504})
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+
+# Path segments that look like IDs (UUIDs or long hex/number runs) are folded
+# into "{id}" so e.g. every GET /v2/inference/<id> shares one rate limiter.
+_ID_SEGMENT = re.compile(r"^(?:[0-9a-fA-F-]{32,36}|\d+|[0-9a-fA-F]{16,})$")
+
+
+def _not_sent(exc: Exception) -> bool:
+    """True if the connection failed before any of the request reached the server."""
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    reason = exc.args[0] if exc.args else None
+    if isinstance(reason, MaxRetryError):
+        reason = reason.reason
+    return isinstance(reason, NewConnectionError)
+
+
+def endpoint_key(method: str, url: str) -> str:
+    """Return "METHOD /path/{id}" for a request, used to group limits and metrics."""
+    path = urlsplit(url).path
+    segments = ["{id}" if _ID_SEGMENT.match(s) else s for s in path.split("/")]
+    return f"{method.upper()} {'/'.join(segments)}"
+
+
+@dataclass
+class RetryPolicy:
+    max_retries: int = int(os.environ.get("STUDIO_MAX_RETRIES", "5"))
+    base_delay_s: float = float(os.environ.get("STUDIO_RETRY_BASE_DELAY_S", "1"))
+    max_delay_s: float = float(os.environ.get("STUDIO_RETRY_MAX_DELAY_S", "60"))
+    retry_status: FrozenSet[int] = field(default_factory=lambda: RETRYABLE_STATUS)
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for the given (0-based) retry attempt."""
+        return random.uniform(0, min(self.max_delay_s, self.base_delay_s * (2 ** attempt)))
+
+    def retry_after(self, response: requests.Response) -> Optional[float]:
+        """Seconds requested by a Retry-After header (delta or HTTP date), capped."""
+        value = response.headers.get("Retry-After")
+        if not value:
+            return None
+        try:
+            delay = float(value)
+        except ValueError:
+            try:
+                delay = email.utils.parsedate_to_datetime(value).timestamp() - time.time()
+            except (TypeError, ValueError):
+                return None
+        return min(max(delay, 0.0), self.max_delay_s)
+
+
+class TokenBucket:
+    """Thread-safe token bucket: *rate* tokens per second, bursts up to *capacity*."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity or max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Block until a token is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    Opens after *failure_threshold* consecutive failures.  While open, callers
+    of before_request() wait until *reset_timeout_s* has passed; then one
+    trial request is let through (half-open).  A success closes the breaker,
+    a failure re-opens it, and release() hands the trial to the next caller
+    when the outcome says nothing about the host.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half-open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_s: float = 30.0, name: str = ""):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self.name = name
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._cond = threading.Condition()
+
+    def before_request(self) -> None:
+        with self._cond:
+            while True:
+                if self.state == self.CLOSED:
+                    return
+                if self.state == self.OPEN:
+                    remaining = self._opened_at + self.reset_timeout_s - time.monotonic()
+                    if remaining <= 0:
+                        self.state = self.HALF_OPEN
+                        return
+                    self._cond.wait(timeout=remaining)
+                else:
+                    # a trial request is in flight; wait for its outcome
+                    self._cond.wait(timeout=self.reset_timeout_s)
+
+    def record_success(self) -> None:
+        with self._cond:
+            self._failures = 0
+            if self.state != self.CLOSED:
+                print(f"  ✅ Gateway {self.name} recovered – resuming requests")
+            self.state = self.CLOSED
+            self._cond.notify_all()
+
+    def release(self) -> None:
+        """Give up a half-open trial without a verdict, so another request can take it."""
+        with self._cond:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+            self._cond.notify_all()
+
+    def record_failure(self) -> None:
+        with self._cond:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(
+                        f"  ⚠️  Gateway {self.name} looks unavailable – pausing requests for "
+                        f"{self.reset_timeout_s:g}s"
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._cond.notify_all()
+
+
+class ResilientAdapter(HTTPAdapter):
+    """HTTPAdapter applying RetryPolicy, per-endpoint TokenBuckets and a per-host CircuitBreaker."""
+
+    def __init__(
+        self,
+        retry_policy: Optional[RetryPolicy] = None,
+        rate_limit: Optional[float] = None,
+        breaker_threshold: Optional[int] = None,
+        breaker_reset_s: Optional[float] = None,
+        **kwargs,
+    ):
+        kwargs.setdefault("max_retries", 0)  # retries are handled in send()
+        super().__init__(**kwargs)
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.rate_limit = float(os.environ.get("STUDIO_RATE_LIMIT", "0")) if rate_limit is None else rate_limit
+        self.breaker_threshold = (
+            int(os.environ.get("STUDIO_BREAKER_THRESHOLD", "5")) if breaker_threshold is None else breaker_threshold
+        )
+        self.breaker_reset_s = (
+            float(os.environ.get("STUDIO_BREAKER_RESET_S", "30")) if breaker_reset_s is None else breaker_reset_s
+        )
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._registry_lock = threading.Lock()
+
+    def _bucket(self, key: str) -> Optional[TokenBucket]:
+        if self.rate_limit <= 0:
+            return None
+        with self._registry_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate_limit)
+            return self._buckets[key]
+
+    def _breaker(self, url: str) -> CircuitBreaker:
+        host = urlsplit(url).netloc
+        with self._registry_lock:
+            if host not in self._breakers:
+                self._breakers[host] = CircuitBreaker(self.breaker_threshold, self.breaker_reset_s, name=host)
+            return self._breakers[host]
+
+    def send(self, request, **kwargs):
+        method = (request.method or "GET").upper()
+        bucket = self._bucket(endpoint_key(method, request.url))
+        breaker = self._breaker(request.url)
+        # Streamed bodies (open files, generators) cannot be replayed
+        replayable = request.body is None or isinstance(request.body, (bytes, str))
+        policy = self.retry_policy
+        attempt = 0
+        while True:
+            breaker.before_request()
+            if bucket:
+                bucket.acquire()
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+                breaker.record_failure()
+                # a non-idempotent call is only replayed if it never reached the server
+                safe = method in IDEMPOTENT_METHODS or _not_sent(exc)
+                if not (safe and replayable) or attempt >= policy.max_retries:
+                    raise
+                delay = policy.backoff(attempt)
+            except BaseException:
+                breaker.release()
+                raise
+            else:
+                if response.status_code not in policy.retry_status:
+                    breaker.record_success()
+                    return response
+                if response.status_code == 429:
+                    # the host is answering, it just wants us to slow down
+                    breaker.record_success()
+                else:
+                    breaker.record_failure()
+                # 429, and 503 with Retry-After, mean the request was turned away unprocessed;
+                # a 502/504 on a non-idempotent call may already have been applied
+                rejected = response.status_code == 429 or (
+                    response.status_code == 503 and "Retry-After" in response.headers
+                )
+                safe = method in IDEMPOTENT_METHODS or rejected
+                if not (safe and replayable) or attempt >= policy.max_retries:
+                    return response
+                delay = policy.retry_after(response)
+                if delay is None:
+                    delay = policy.backoff(attempt)
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+
+def mount_resilience(
+    session: requests.Session,
+    pool_maxsize: int = 10,
+    **adapter_kwargs,
+) -> ResilientAdapter:
+    """Mount a ResilientAdapter for http:// and https:// on *session* and return it."""
+    adapter = ResilientAdapter(pool_connections=1, pool_maxsize=max(pool_maxsize, 1), **adapter_kwargs)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return adapter
@@ -0,0 +1,64 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_state.py - Small JSON state store used by the Studio tooling to
+remember what it has already created, so that re-runs can skip work.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+def sha256_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the hex sha256 digest of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class JsonStateFile:
+    """
+    A dict of records persisted to a JSON file.
+
+    Every update is written straight back to disk (via a temporary file and
+    an atomic rename) so that an interrupted run keeps everything recorded so
+    far.  Safe to use from several threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._records: Dict[str, Any] = {}
+        if os.path.isfile(path):
+            with open(path, "r") as fh:
+                self._records = json.load(fh)
+
+    def get(self, key: str, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._records.get(key, default)
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._records[key] = value
+            self._save()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            if self._records.pop(key, None) is not None:
+                self._save()
+
+    def items(self):
+        with self._lock:
+            return list(self._records.items())
+
+    def _save(self) -> None:
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as fh:
+            json.dump(self._records, fh, indent=2, sort_keys=True)
+        os.replace(tmp_path, self.path)
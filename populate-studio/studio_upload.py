@@ -0,0 +1,223 @@
+# © Copyright IBM Corporation 2025
+# SPDX-License-Identifier: Apache-2.0
+"""
+studio_upload.py - Upload local checkpoints, configs and dataset archives
+through the gateway file share (GET /v2/file-share) so payloads can refer to
+files that only exist on the operator's machine (e.g. air-gapped clusters).
+
+The gateway hands out one presigned PUT URL and one presigned GET URL per
+object.  The presigned PUT does not support multipart uploads, so a file is
+streamed in a single request in fixed-size chunks (constant memory), and
+several files are uploaded in parallel by the caller.  Uploads are resumable
+at the file level:
+
+  - object names are derived from the file's sha256, so the same content
+    always lands on the same object
+  - before uploading, the object is probed through the download URL; an
+    object that is already complete (same size and MD5 ETag) is not sent again
+  - digests are remembered in a JsonStateFile keyed by path, mtime and size,
+    so multi-GB files are not re-hashed on every run
+
+After the PUT the object is probed again and its size (and MD5, for simple
+ETags) must match the local file.
+"""
+
+import hashlib
+import os
+import re
+import time
+from typing import Optional, Tuple
+from urllib.parse import urljoin
+
+import requests
+
+from studio_resilience import RetryPolicy
+
+FILE_SHARE_ENDPOINT = "v2/file-share"
+
+# object_name must match ^[a-zA-Z0-9-_]+.[a-z]+$ and be 6-60 characters
+_UNSAFE_CHARS = re.compile(r"[^a-zA-Z0-9_-]")
+
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+DEFAULT_UPLOAD_ATTEMPTS = 3
+
+
+class UploadError(RuntimeError):
+    pass
+
+
+def is_local_reference(value) -> bool:
+    """True for a file:// URL or a value without a URL scheme (i.e. a path)."""
+    if not isinstance(value, str) or not value:
+        return False
+    return value.startswith("file://") or "://" not in value
+
+
+def resolve_local_path(value: str, base_dir: str = ".") -> str:
+    """
+    Resolve a payload file reference to an absolute path: file:// URLs and
+    absolute paths as-is, relative paths against *base_dir* (usually the
+    directory of the payload file) and then the current directory.
+    """
+    path = os.path.expanduser(value[len("file://"):] if value.startswith("file://") else value)
+    if os.path.isabs(path):
+        return path
+    candidate = os.path.abspath(os.path.join(base_dir, path))
+    return candidate if os.path.exists(candidate) else os.path.abspath(path)
+
+
+def file_digests(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[str, str]:
+    """Return the hex (sha256, md5) digests of a file in a single read pass."""
+    sha256, md5 = hashlib.sha256(), hashlib.md5()
+    with open(path, "rb") as fh:
+        for chunk in iter(lambda: fh.read(chunk_size), b""):
+            sha256.update(chunk)
+            md5.update(chunk)
+    return sha256.hexdigest(), md5.hexdigest()
+
+
+def object_name_for(path: str, sha256: str) -> str:
+    """Content-addressed file-share object name, e.g. "flood_model-3f2a9c01d4e5b6a7.ckpt"."""
+    stem, ext = os.path.splitext(os.path.basename(path))
+    ext = re.sub(r"[^a-z]", "", ext.lower()) or "bin"
+    stem = _UNSAFE_CHARS.sub("-", stem)[:40] or "file"
+    return f"{stem}-{sha256[:16]}.{ext[:8]}"
+
+
+class _ChunkedReader:
+    """File wrapper that streams in fixed-size chunks and reports progress."""
+
+    def __init__(self, fh, size: int, label: str, chunk_size: int):
+        self._fh = fh
+        self._size = size
+        self._label = label
+        self._chunk_size = chunk_size
+        self._sent = 0
+        self._next_report = 0.25
+
+    def __len__(self):
+        return self._size
+
+    def read(self, amt: int = -1) -> bytes:
+        chunk = self._fh.read(self._chunk_size if amt is None or amt < 0 else min(amt, self._chunk_size))
+        self._sent += len(chunk)
+        if self._size and self._sent / self._size >= self._next_report:
+            print(f"  ⬆️  {self._label}: {self._sent * 100 // self._size}% of {self._size / 1e6:.1f} MB")
+            self._next_report += 0.25
+        return chunk
+
+
+def remote_object_info(url: str, session: Optional[requests.Session] = None) -> Optional[Tuple[int, str]]:
+    """
+    Return (size, etag) of the object behind a presigned download URL, or
+    None if it does not exist.  Presigned URLs are signed for GET only, so a
+    one-byte ranged GET is used instead of HEAD.
+    """
+    session = session or requests.Session()
+    resp = session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=60)
+    resp.close()
+    if resp.status_code in (403, 404):
+        return None
+    resp.raise_for_status()
+    content_range = resp.headers.get("Content-Range", "")
+    if resp.status_code == 206 and "/" in content_range:
+        size = int(content_range.rsplit("/", 1)[1])
+    else:
+        size = int(resp.headers.get("Content-Length") or -1)
+    return size, resp.headers.get("ETag", "").strip('"')
+
+
+def _matches(info: Optional[Tuple[int, str]], size: int, md5: str) -> bool:
+    if info is None or info[0] != size:
+        return False
+    etag = info[1]
+    # multipart / encrypted ETags are not an MD5 of the content; size must do
+    return "-" in etag or len(etag) != 32 or etag.lower() == md5
+
+
+def upload_local_file(
+    gateway: requests.Session,
+    api_url: str,
+    path: str,
+    state=None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    attempts: int = DEFAULT_UPLOAD_ATTEMPTS,
+) -> str:
+    """
+    Upload *path* through the gateway file share (unless an identical object
+    is already there) and return a download URL for it.  *gateway* is the
+    authenticated gateway session; object-store URLs are called with a
+    plain session so the API key is never sent to them.  *state* is an
+    optional JsonStateFile used to cache digests between runs.
+    """
+    if not os.path.isfile(path):
+        raise UploadError(f"Local file not found: {path}")
+    stat = os.stat(path)
+    state_key = f"upload:{path}"
+    record = state.get(state_key) if state is not None else None
+    if record and record.get("mtime_ns") == stat.st_mtime_ns and record.get("size") == stat.st_size:
+        sha256, md5 = record["sha256"], record["md5"]
+    else:
+        print(f"  🔢 Hashing {path} ({stat.st_size / 1e6:.1f} MB)...")
+        sha256, md5 = file_digests(path, chunk_size)
+    object_name = object_name_for(path, sha256)
+
+    resp = gateway.get(urljoin(api_url.rstrip("/") + "/", FILE_SHARE_ENDPOINT), params={"object_name": object_name})
+    if not resp.ok:
+        raise UploadError(f"file-share URL request for {object_name} failed: {resp.status_code} - {resp.text}")
+    links = resp.json()
+    upload_url, download_url = links["upload_url"], links["download_url"]
+
+    store = requests.Session()
+    store.verify = gateway.verify  # local deployments use the same self-signed certificates
+    if _matches(remote_object_info(download_url, store), stat.st_size, md5):
+        print(f"  ⏭  {os.path.basename(path)} already uploaded as {object_name}")
+    else:
+        policy = RetryPolicy(max_retries=attempts - 1)
+        for attempt in range(attempts):
+            try:
+                with open(path, "rb") as fh:
+                    put = store.put(
+                        upload_url,
+                        data=_ChunkedReader(fh, stat.st_size, os.path.basename(path), chunk_size),
+                        headers={"Content-Type": "application/octet-stream"},
+                        timeout=(30, 600),
+                    )
+                if put.ok:
+                    break
+                error = f"{put.status_code} - {put.text[:300]}"
+                retryable = put.status_code in policy.retry_status
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as exc:
+                error, retryable = f"{type(exc).__name__}: {exc}", True
+            if not retryable or attempt == attempts - 1:
+                raise UploadError(f"Upload of {path} failed: {error}")
+            delay = policy.backoff(attempt)
+            print(f"  ⚠️  Upload of {os.path.basename(path)} failed ({error}); retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+        if not _matches(remote_object_info(download_url, store), stat.st_size, md5):
+            raise UploadError(f"Checksum/size verification failed for {object_name} after upload")
+        print(f"  ✅ Uploaded {os.path.basename(path)} as {object_name} (size and checksum verified)")
+
+    if state is not None:
+        state.set(state_key, {
+            "mtime_ns": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "sha256": sha256,
+            "md5": md5,
+            "object_name": object_name,
+        })
+    return download_url
+
+
+def upload_payload_files(gateway, api_url, payload: dict, fields, base_dir: str = ".", state=None) -> dict:
+    """
+    Upload every local file referenced by *fields* of *payload* and return a
+    copy with those fields rewritten to the resulting download URLs.
+    """
+    payload = dict(payload)
+    for field in fields:
+        value = payload.get(field)
+        if is_local_reference(value):
+            payload[field] = upload_local_file(gateway, api_url, resolve_local_path(value, base_dir), state=state)
+    return payload